@@ -0,0 +1,62 @@
+"""
+Login activity of franchise students.
+
+Every franchise student has a ``StudentActivity`` row, created and moved
+between franchises along with their ``UserFranchise``. Logins stamp
+``last_seen`` at most once per ``COALESCE_SECONDS``: a cache key skips the
+database entirely for repeat logins, and the UPDATE itself only matches rows
+older than the window, so concurrent workers write once between them.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import StudentActivity
+
+COALESCE_SECONDS = 60 * 60
+
+
+def _cache_key(user_id):
+    return f'application.activity.{user_id}'
+
+
+def record_login(user_id, now=None):
+    """
+    Stamp ``last_seen`` unless it was stamped within the coalescing window; return whether it was.
+    """
+    if not cache.add(_cache_key(user_id), True, COALESCE_SECONDS):
+        return False
+    now = now or timezone.now()
+    return bool(
+        StudentActivity.objects.filter(user_id=user_id)
+        .filter(Q(last_seen__isnull=True) | Q(last_seen__lt=now - timedelta(seconds=COALESCE_SECONDS)))
+        .update(last_seen=now)
+    )
+
+
+def sync_student(user_franchise):
+    """
+    Create or re-file the activity row of a franchise student.
+    """
+    activity, created = StudentActivity.objects.get_or_create(
+        user_id=user_franchise.user_id,
+        defaults={'franchise_id': user_franchise.franchise_id, 'last_seen': user_franchise.user.last_login},
+    )
+    if not created and activity.franchise_id != user_franchise.franchise_id:
+        StudentActivity.objects.filter(pk=activity.pk).update(franchise_id=user_franchise.franchise_id)
+
+
+def inactive_students(days=2, franchise_id=None, now=None):
+    """
+    Return activity rows of students not seen for ``days``, never-seen students first.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    students = StudentActivity.objects.filter(Q(last_seen__isnull=True) | Q(last_seen__lt=cutoff))
+    if franchise_id is not None:
+        students = students.filter(franchise_id=franchise_id)
+    return students.select_related('user__profile', 'user__userfranchise__batch', 'franchise').order_by(
+        F('last_seen').asc(nulls_first=True), 'user_id'
+    )
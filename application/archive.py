@@ -0,0 +1,235 @@
+"""
+Archival of settled batches to cold tables.
+
+A batch is settled once every installment of every student in it is paid. When
+its last due date and last payment are both older than a threshold, its
+student fee records, installments, payments and installment templates are
+copied to the ``Archived*`` tables and deleted from the hot ones, so the
+overdue and reminder queries no longer scan them. Rows keep their primary
+keys, which lets ``restore_batch`` put them back unchanged.
+
+Each chunk of students is moved in its own transaction, which locks the
+chunk's installments and checks again that they are still settled: a payment
+reversed or a schedule edited since the batch was selected stops the run and
+leaves the rest of the batch in the hot tables. The batch's ``archived_at``
+flag is set before the first chunk and cleared after the last restored one;
+an interrupted run is finished by running it again. Reports and rollups read
+the archive tables too, so archived batches keep their totals and history.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import (
+    ArchivedInstallment,
+    ArchivedInstallmentTemplate,
+    ArchivedPayment,
+    ArchivedStudentFeeManagement,
+    BatchFeeManagement,
+    Installment,
+    InstallmentTemplate,
+    Payment,
+    StudentFeeManagement,
+)
+
+DEFAULT_OLDER_THAN_DAYS = 365
+DEFAULT_CHUNK_SIZE = 200
+
+INSTALLMENTS = 'studentfeemanagement__installments'
+
+INSTALLMENT_FIELDS = [
+    'due_date', 'amount', 'payed_amount', 'status', 'payment_date', 'repayment_period_days', 'version',
+]
+PAYMENT_FIELDS = ['payment_date', 'amount', 'method', 'idempotency_key', 'created_at']
+
+
+def _copy(source, model, fields, **extra):
+    return model(id=source.id, **{field: getattr(source, field) for field in fields}, **extra)
+
+
+def _cutoff(older_than_days, today):
+    return (today or timezone.now().date()) - timedelta(days=older_than_days)
+
+
+def settled_batches(older_than_days=DEFAULT_OLDER_THAN_DAYS, today=None):
+    """
+    Return the batch fee setups whose hot installments are all paid and older than the threshold.
+    """
+    cutoff = _cutoff(older_than_days, today)
+    return (
+        BatchFeeManagement.objects
+        .annotate(
+            installment_count=Count(f'{INSTALLMENTS}__id'),
+            open_count=Count(f'{INSTALLMENTS}__id', filter=~Q(**{f'{INSTALLMENTS}__status': 'paid'})),
+            last_due=Max(f'{INSTALLMENTS}__due_date'),
+            last_paid=Max(f'{INSTALLMENTS}__payment_date'),
+        )
+        .filter(installment_count__gt=0, open_count=0, last_due__lt=cutoff)
+        .filter(Q(last_paid__isnull=True) | Q(last_paid__lt=cutoff))
+    )
+
+
+def _archive_students(student_fee_ids, cutoff):
+    """
+    Move one chunk of students; return ``False`` without moving anything if it is no longer settled.
+    """
+    installments = list(
+        Installment.objects.select_for_update().filter(student_fee_management_id__in=student_fee_ids)
+    )
+    if any(
+        installment.status != 'paid' or installment.due_date >= cutoff
+        or (installment.payment_date is not None and installment.payment_date >= cutoff)
+        for installment in installments
+    ):
+        return False
+    student_fees = list(StudentFeeManagement.objects.filter(pk__in=student_fee_ids))
+    payments = list(Payment.objects.filter(installment__student_fee_management_id__in=student_fee_ids))
+
+    ArchivedStudentFeeManagement.objects.bulk_create([
+        ArchivedStudentFeeManagement(
+            id=student_fee.id,
+            user_franchise_id=student_fee.user_franchise_id,
+            batch_fee_management_id=student_fee.batch_fee_management_id,
+            remaining_amount=student_fee.remaining_amount,
+            version=student_fee.version,
+            registration_date=student_fee.registration_date,
+        )
+        for student_fee in student_fees
+    ])
+    ArchivedInstallment.objects.bulk_create([
+        _copy(installment, ArchivedInstallment, INSTALLMENT_FIELDS,
+              student_fee_management_id=installment.student_fee_management_id)
+        for installment in installments
+    ])
+    ArchivedPayment.objects.bulk_create([
+        _copy(payment, ArchivedPayment, PAYMENT_FIELDS, installment_id=payment.installment_id)
+        for payment in payments
+    ])
+
+    Payment.objects.filter(pk__in=[payment.pk for payment in payments]).delete()
+    Installment.objects.filter(pk__in=[installment.pk for installment in installments]).delete()
+    StudentFeeManagement.objects.filter(pk__in=student_fee_ids).delete()
+    return True
+
+
+def _restore_students(student_fee_ids):
+    student_fees = list(ArchivedStudentFeeManagement.objects.filter(pk__in=student_fee_ids))
+    installments = list(ArchivedInstallment.objects.filter(student_fee_management_id__in=student_fee_ids))
+    payments = list(ArchivedPayment.objects.filter(installment__student_fee_management_id__in=student_fee_ids))
+
+    StudentFeeManagement.objects.bulk_create([
+        StudentFeeManagement(
+            id=student_fee.id,
+            user_franchise_id=student_fee.user_franchise_id,
+            batch_fee_management_id=student_fee.batch_fee_management_id,
+            remaining_amount=student_fee.remaining_amount,
+            version=student_fee.version,
+            registration_date=student_fee.registration_date,
+        )
+        for student_fee in student_fees
+    ])
+    Installment.objects.bulk_create([
+        _copy(installment, Installment, INSTALLMENT_FIELDS,
+              student_fee_management_id=installment.student_fee_management_id)
+        for installment in installments
+    ])
+    # Payments are append-only. A raw insert, as ``loaddata`` does, keeps the
+    # archived ``created_at`` instead of stamping ``auto_now_add`` again.
+    for payment in payments:
+        _copy(payment, Payment, PAYMENT_FIELDS, installment_id=payment.installment_id).save_base(
+            raw=True, force_insert=True,
+        )
+
+    ArchivedStudentFeeManagement.objects.filter(pk__in=student_fee_ids).delete()
+
+
+def _chunks(ids, chunk_size):
+    for start in range(0, len(ids), chunk_size):
+        yield ids[start:start + chunk_size]
+
+
+def archive_batch(
+    fee_management, chunk_size=DEFAULT_CHUNK_SIZE, older_than_days=DEFAULT_OLDER_THAN_DAYS, today=None, verify=None,
+):
+    """
+    Move a batch's fee records to the archive tables; return the number of students archived.
+
+    If a chunk is found unsettled the run stops there, ``archived_at`` is
+    cleared and the students moved so far stay archived until the batch is
+    restored or archived again. ``verify``, if given, is called before the
+    batch is flagged and last in every transaction, so it can stop the run by
+    raising.
+    """
+    verify = verify or (lambda: None)
+    cutoff = _cutoff(older_than_days, today)
+    verify()
+    fee_management.archived_at = timezone.now()
+    BatchFeeManagement.objects.filter(pk=fee_management.pk).update(archived_at=fee_management.archived_at)
+
+    student_fee_ids = list(
+        StudentFeeManagement.objects.filter(batch_fee_management=fee_management)
+        .order_by('pk').values_list('pk', flat=True)
+    )
+    archived = 0
+    for chunk in _chunks(student_fee_ids, chunk_size):
+        with transaction.atomic():
+            if not _archive_students(chunk, cutoff):
+                fee_management.archived_at = None
+                BatchFeeManagement.objects.filter(pk=fee_management.pk).update(archived_at=None)
+                return archived
+            verify()
+        archived += len(chunk)
+
+    with transaction.atomic():
+        templates = list(InstallmentTemplate.objects.filter(batch_fee_management=fee_management))
+        ArchivedInstallmentTemplate.objects.bulk_create([
+            _copy(template, ArchivedInstallmentTemplate, ['amount', 'repayment_period_days'],
+                  batch_fee_management_id=template.batch_fee_management_id)
+            for template in templates
+        ])
+        InstallmentTemplate.objects.filter(pk__in=[template.pk for template in templates]).delete()
+        verify()
+    return archived
+
+
+def restore_batch(fee_management, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Move a batch's archived fee records back to the hot tables; return the number of students restored.
+    """
+    with transaction.atomic():
+        templates = list(ArchivedInstallmentTemplate.objects.filter(batch_fee_management=fee_management))
+        InstallmentTemplate.objects.bulk_create([
+            _copy(template, InstallmentTemplate, ['amount', 'repayment_period_days'],
+                  batch_fee_management_id=template.batch_fee_management_id)
+            for template in templates
+        ])
+        ArchivedInstallmentTemplate.objects.filter(pk__in=[template.pk for template in templates]).delete()
+
+    student_fee_ids = list(
+        ArchivedStudentFeeManagement.objects.filter(batch_fee_management=fee_management)
+        .order_by('pk').values_list('pk', flat=True)
+    )
+    for chunk in _chunks(student_fee_ids, chunk_size):
+        with transaction.atomic():
+            _restore_students(chunk)
+
+    fee_management.archived_at = None
+    BatchFeeManagement.objects.filter(pk=fee_management.pk).update(archived_at=None)
+    return len(student_fee_ids)
+
+
+def archive_settled_batches(
+    older_than_days=DEFAULT_OLDER_THAN_DAYS, chunk_size=DEFAULT_CHUNK_SIZE, today=None, verify=None,
+):
+    """
+    Archive every settled batch; return ``(batches, students)`` archived.
+    """
+    batches = students = 0
+    for fee_management in list(settled_batches(older_than_days, today)):
+        students += archive_batch(fee_management, chunk_size, older_than_days, today, verify)
+        if fee_management.archived_at is not None:
+            batches += 1
+    return batches, students
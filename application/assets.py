@@ -0,0 +1,174 @@
+"""
+Build the single, content-hashed stylesheet bundle for the app's pages.
+
+Every stylesheet under ``static/css`` was written for one page and they reuse
+the same selectors with different values, so each file is scoped to its page
+before the files are concatenated: rules are prefixed with
+``:where(.page-<name>)``, which matches only on pages whose ``<body>``
+carries that class and adds no specificity, so each page cascades exactly as
+it did with its own stylesheet. The result is minified and written to
+``static/dist`` under a name containing its content hash, so ``collectstatic``
+ships it with the other static files and it can be cached forever.
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+STATIC_ROOT = Path(__file__).resolve().parent / 'static'
+SOURCE_DIR = STATIC_ROOT / 'css'
+BUNDLE_DIR = STATIC_ROOT / 'dist'
+MANIFEST_PATH = BUNDLE_DIR / 'manifest.json'
+BUNDLE_NAME = 'application.css'
+
+# Stylesheets of pages rendered by the app, in bundle order
+STYLESHEETS = [
+    'batch_create.css',
+    'batch_fee_management.css',
+    'batch_students.css',
+    'edit_student_details.css',
+    'franchise_edit.css',
+    'franchise_management.css',
+    'franchise_register.css',
+    'franchise_report.css',
+    'homepage.css',
+    'student_fee_management.css',
+    'user_register_course.css',
+]
+
+COMMENT = re.compile(r'/\*.*?\*/', re.S)
+WHITESPACE = re.compile(r'\s+')
+COMBINATOR_SPACE = re.compile(r'\s*([>+~,])\s*')
+
+
+def page_class(stylesheet_name):
+    """
+    Return the body class scoping a stylesheet, e.g. ``page-franchise-report``.
+    """
+    return 'page-' + Path(stylesheet_name).stem.replace('_', '-')
+
+
+def _split_top_level(text, separator):
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        if char == separator and depth == 0:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return parts
+
+
+def _scope_selector(selector, scope):
+    selector = WHITESPACE.sub(' ', selector).strip()
+    if selector == '*':
+        return f':where(.{scope}),:where(.{scope}) *'
+    if selector == 'body' or selector.startswith(('body.', 'body:', 'body[', 'body ')):
+        return f'body:where(.{scope}){selector[4:]}'
+    if selector in ('html', ':root'):
+        return selector
+    return f':where(.{scope}) {selector}'
+
+
+def _minify_selectors(selectors, scope):
+    scoped = ','.join(_scope_selector(selector, scope) for selector in _split_top_level(selectors, ','))
+    return COMBINATOR_SPACE.sub(r'\1', scoped)
+
+
+def _minify_declarations(body):
+    declarations = []
+    for declaration in _split_top_level(body, ';'):
+        prop, _, value = declaration.partition(':')
+        prop, value = prop.strip(), WHITESPACE.sub(' ', value).strip()
+        if prop and value:
+            declarations.append(f'{prop}:{value}')
+    return ';'.join(declarations)
+
+
+def _read_block(css, start):
+    """
+    Return ``(content, end)`` for the block whose ``{`` is at ``start``.
+    """
+    depth = 0
+    for index in range(start, len(css)):
+        if css[index] == '{':
+            depth += 1
+        elif css[index] == '}':
+            depth -= 1
+            if depth == 0:
+                return css[start + 1:index], index + 1
+    raise ValueError("Unbalanced braces in stylesheet")
+
+
+def scope_css(css, scope):
+    """
+    Return ``css`` minified with every rule scoped to pages with the ``scope`` body class.
+
+    Supports plain rules and one level of ``@media``; other at-rules are kept
+    unscoped.
+    """
+    css = COMMENT.sub('', css)
+    output = []
+    position = 0
+    while True:
+        brace = css.find('{', position)
+        if brace == -1:
+            break
+        prelude = css[position:brace].strip()
+        content, position = _read_block(css, brace)
+        if prelude.startswith('@media'):
+            output.append(f'{WHITESPACE.sub(" ", prelude)}{{{scope_css(content, scope)}}}')
+        elif prelude.startswith('@'):
+            output.append(f'{WHITESPACE.sub(" ", prelude)}{{{WHITESPACE.sub(" ", content).strip()}}}')
+        else:
+            declarations = _minify_declarations(content)
+            if declarations:
+                output.append(f'{_minify_selectors(prelude, scope)}{{{declarations}}}')
+    return ''.join(output)
+
+
+def build_bundle(source_dir=SOURCE_DIR, bundle_dir=BUNDLE_DIR, stylesheets=None):
+    """
+    Write the hashed bundle and its manifest; return the bundle's file name.
+
+    Bundles from earlier builds are removed.
+    """
+    parts = [
+        scope_css((Path(source_dir) / name).read_text(encoding='utf-8'), page_class(name))
+        for name in stylesheets or STYLESHEETS
+    ]
+    css = '\n'.join(parts) + '\n'
+    digest = hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]
+    bundle_dir = Path(bundle_dir)
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+    for old in bundle_dir.glob('application.*.css'):
+        old.unlink()
+    file_name = f'application.{digest}.css'
+    (bundle_dir / file_name).write_text(css, encoding='utf-8')
+    (bundle_dir / MANIFEST_PATH.name).write_text(
+        json.dumps({BUNDLE_NAME: file_name}, indent=2) + '\n', encoding='utf-8'
+    )
+    load_manifest.cache_clear()
+    return file_name
+
+
+@lru_cache(maxsize=None)
+def load_manifest():
+    try:
+        return json.loads(MANIFEST_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def bundle_file(name=BUNDLE_NAME):
+    """
+    Return the hashed file name of a built bundle, or ``None`` if it has not been built.
+    """
+    return load_manifest().get(name)
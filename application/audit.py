@@ -0,0 +1,127 @@
+"""
+Append-only audit trail of installment and fee changes.
+
+Each change is stored as one ``AuditEntry`` holding a JSON diff of the fields
+it changed, rather than a row per field. ``record`` hands the entry to
+``transaction.on_commit``, so entries for a rolled-back change are dropped.
+Views wrapped in ``audited`` collect their committed entries and write them
+with a single ``bulk_create`` once the view returns. Outside such a view or
+other ``buffered`` block, each entry is saved as soon as its transaction
+commits.
+
+Entries are read per student or per batch through the
+``(student, created_at)`` and ``(batch, created_at)`` indexes.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AuditEntry
+
+# Committed entries waiting to be written, and who is making the changes.
+_buffer = ContextVar('application_audit_buffer', default=None)
+_actor = ContextVar('application_audit_actor', default=None)
+
+
+def snapshot(instance, fields):
+    """
+    Return ``{field: value}`` for ``fields`` of ``instance``.
+    """
+    return {field: getattr(instance, field) for field in fields}
+
+
+def diff(old, new):
+    """
+    Return ``{field: [old, new]}`` for every field whose value differs.
+    """
+    return {
+        field: [old.get(field), new.get(field)]
+        for field in sorted(old.keys() | new.keys())
+        if old.get(field) != new.get(field)
+    }
+
+
+def record(model, object_id, changes, batch_id, student_id=None, action='update', actor=None):
+    """
+    Queue an audit entry, written once the current transaction commits.
+
+    Updates with no changed field are ignored. ``actor`` defaults to the user
+    of the current request.
+    """
+    if action == 'update' and not changes:
+        return None
+    actor = actor if actor is not None else _actor.get()
+    entry = AuditEntry(
+        actor_id=actor.pk if actor is not None and actor.is_authenticated else None,
+        batch_id=batch_id,
+        student_id=student_id,
+        model=model,
+        object_id=object_id,
+        action=action,
+        changes=changes,
+        created_at=timezone.now(),
+    )
+    buffer = _buffer.get()
+    transaction.on_commit(entry.save if buffer is None else lambda: buffer.append(entry))
+    return entry
+
+
+def record_changes(model, before, after, batch_id, student_id=None):
+    """
+    Record creates, updates and deletes between two ``{pk: snapshot}`` mappings.
+    """
+    for pk in sorted(before.keys() | after.keys()):
+        if pk not in before:
+            record(model, pk, diff({}, after[pk]), batch_id, student_id, action='create')
+        elif pk not in after:
+            record(model, pk, diff(before[pk], {}), batch_id, student_id, action='delete')
+        else:
+            record(model, pk, diff(before[pk], after[pk]), batch_id, student_id)
+
+
+def flush(entries):
+    if entries:
+        AuditEntry.objects.bulk_create(entries)
+    entries.clear()
+
+
+@contextmanager
+def buffered(actor=None):
+    """
+    Collect entries committed inside the block and write them together at the end.
+
+    Entries only reach the buffer once their change has committed, so they are
+    written even if the block later raises.
+    """
+    entries = []
+    buffer_token = _buffer.set(entries)
+    actor_token = _actor.set(actor)
+    try:
+        yield entries
+    finally:
+        _buffer.reset(buffer_token)
+        _actor.reset(actor_token)
+        flush(entries)
+
+
+def audited(view_func):
+    """
+    Write a view's audit entries, attributed to the request's user, with one insert after it returns.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        with buffered(actor=getattr(request, 'user', None)):
+            return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def for_student(student_id):
+    return AuditEntry.objects.filter(student_id=student_id).order_by('-created_at', '-id')
+
+
+def for_batch(batch_id):
+    return AuditEntry.objects.filter(batch_id=batch_id).order_by('-created_at', '-id')
@@ -0,0 +1,71 @@
+"""
+Optimistic concurrency helpers for fee and installment rows.
+
+Rows that cashiers edit concurrently carry a ``version`` column. Writers read a
+row, compute the new values and then update it only if ``version`` is still the
+one they read, bumping it in the same statement. A writer that loses the race
+gets ``StaleRecordError`` and either retries from a fresh read or reports the
+conflict to the user.
+"""
+
+import random
+from functools import wraps
+from time import sleep
+
+from django.db import OperationalError
+from django.db.models import F
+
+MAX_ATTEMPTS = 8
+BASE_DELAY = 0.01
+
+
+class StaleRecordError(Exception):
+    """
+    Raised when a row was changed by someone else since it was read.
+    """
+
+
+def compare_and_swap(instance, **changes):
+    """
+    Write ``changes`` to ``instance`` only if its version is unchanged in the database.
+
+    On success the instance is updated in place, including its new version.
+    """
+    model = type(instance)
+    updated = model.objects.filter(pk=instance.pk, version=instance.version).update(
+        version=F('version') + 1, **changes
+    )
+    if not updated:
+        raise StaleRecordError(f"{model.__name__} {instance.pk} was modified by another user.")
+    for field, value in changes.items():
+        setattr(instance, field, value)
+    instance.version += 1
+    return instance
+
+
+def retry_on_conflict(func=None, *, attempts=MAX_ATTEMPTS, retry_stale=True):
+    """
+    Re-run ``func`` on deadlocks, lock timeouts and (optionally) lost CAS races.
+
+    The wrapped function must open its own transaction so every attempt starts
+    from a clean read; do not call it from inside an outer ``atomic`` block.
+    Backoff is exponential with jitter so competing writers spread out.
+    """
+    retryable = (OperationalError, StaleRecordError) if retry_stale else (OperationalError,)
+
+    def decorator(inner):
+        @wraps(inner)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, attempts + 1):
+                try:
+                    return inner(*args, **kwargs)
+                except retryable:
+                    if attempt == attempts:
+                        raise
+                    sleep(BASE_DELAY * (2 ** (attempt - 1)) * (1 + random.random()))
+            return None
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
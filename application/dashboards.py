@@ -0,0 +1,53 @@
+"""
+Independent queries behind the homepage, runnable one after another or concurrently.
+
+The page declares its queries as a ``{context name: callable}`` mapping. The
+sync view evaluates them in order with ``run``; the async view starts them all
+at once with ``gather``. Django's async ORM methods (``acount`` and friends)
+all run on the one thread-sensitive worker, so they would still execute one
+after another; ``gather`` instead gives each query its own worker thread and
+therefore its own database connection, which is closed again afterwards
+according to ``CONN_MAX_AGE``.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import close_old_connections
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+from . import kpis
+from .models import Franchise
+
+
+def homepage_queries():
+    return {
+        'total_franchises': Franchise.objects.count,
+        'total_students': User.objects.count,
+        'total_courses': CourseOverview.objects.count,
+        'kpis': kpis.homepage_kpis,
+    }
+
+
+def run(queries):
+    return {name: query() for name, query in queries.items()}
+
+
+def _on_worker_connection(query):
+    def run_query():
+        try:
+            return query()
+        finally:
+            close_old_connections()
+    return run_query
+
+
+async def gather(queries):
+    """
+    Run ``queries`` concurrently, each on its own thread and connection.
+    """
+    results = await asyncio.gather(*(
+        sync_to_async(_on_worker_connection(query), thread_sensitive=False)() for query in queries.values()
+    ))
+    return dict(zip(queries, results))
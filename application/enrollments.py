@@ -0,0 +1,74 @@
+"""
+Shared cache of whether a student is enrolled in a batch's course.
+
+Statuses are cached per ``(user_id, course_id)`` in the default Django cache,
+so every worker shares them. Pages listing many students fill the cache for
+all of them with ``enrollment_statuses``, one query for the misses. After
+every committed ``CourseEnrollment`` change the status is read again and
+written with ``set``, while readers only ``add`` the statuses they looked up,
+so a reader that read the old status just before the commit cannot put it
+back. Two changes to one enrollment committing at the same moment can still
+leave the older status cached until the entry expires.
+"""
+
+from common.djangoapps.student.models import CourseEnrollment
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+DEFAULT_TIMEOUT = 60 * 60
+
+
+def cache_timeout():
+    return getattr(settings, 'APPLICATION_ENROLLMENT_CACHE_SECONDS', DEFAULT_TIMEOUT)
+
+
+def cache_key(user_id, course_id):
+    return f'application.enrolled.{user_id}.{course_id}'
+
+
+def enrollment_statuses(pairs):
+    """
+    Return ``{(user_id, course_id): enrolled}`` for ``(user_id, course_id)`` pairs.
+    """
+    pairs = {(user_id, str(course_id)) for user_id, course_id in pairs}
+    keys = {cache_key(*pair): pair for pair in pairs}
+    cached = cache.get_many(keys)
+    statuses = {keys[key]: value for key, value in cached.items()}
+    missing = pairs - statuses.keys()
+    if missing:
+        enrolled = {
+            (user_id, str(course_id))
+            for user_id, course_id in CourseEnrollment.objects.filter(
+                user_id__in={user_id for user_id, _ in missing},
+                course_id__in={course_id for _, course_id in missing},
+                is_active=True,
+            ).values_list('user_id', 'course_id')
+        }
+        found = {pair: pair in enrolled for pair in missing}
+        cache_statuses(found)
+        statuses.update(found)
+    return statuses
+
+
+def cache_statuses(statuses):
+    """
+    Cache statuses read from the database without replacing entries written since.
+    """
+    timeout = cache_timeout()
+    for pair, enrolled in statuses.items():
+        cache.add(cache_key(*pair), enrolled, timeout)
+
+
+def is_enrolled(user_id, course_id):
+    return enrollment_statuses([(user_id, course_id)])[(user_id, str(course_id))]
+
+
+def refresh(user_id, course_id):
+    """
+    Cache the committed status once the current transaction commits.
+    """
+    def store():
+        enrolled = CourseEnrollment.objects.filter(user_id=user_id, course_id=course_id, is_active=True).exists()
+        cache.set(cache_key(user_id, course_id), enrolled, cache_timeout())
+    transaction.on_commit(store)
@@ -0,0 +1,93 @@
+"""
+Batch fee and discount changes.
+
+A student's remaining amount is the batch's remaining amount (fees less
+discount) minus what the student has paid, so a fee or discount change moves
+every balance in the batch. They are all rewritten by one UPDATE that reads
+each student's paid total through a correlated subquery, in the same
+transaction as the change, its ``BatchFeeChange`` audit row and its outbox
+event.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import audit, outbox
+from .models import Batch, BatchFeeChange, BatchFeeManagement, Installment, StudentFeeManagement
+from .money import MoneyField
+
+MONEY = MoneyField()
+
+
+def propagate_remaining_amount(fee_management_id, remaining_amount):
+    """
+    Set every student's balance in the batch to ``remaining_amount`` less their paid total.
+
+    Returns the number of students updated. Must run inside the caller's transaction.
+    """
+    paid = (
+        Installment.objects.filter(student_fee_management=OuterRef('pk'))
+        .order_by()
+        .values('student_fee_management')
+        .annotate(total=Sum('payed_amount'))
+        .values('total')
+    )
+    return StudentFeeManagement.objects.filter(batch_fee_management_id=fee_management_id).update(
+        remaining_amount=Value(remaining_amount, output_field=MONEY) - Coalesce(
+            Subquery(paid, output_field=MONEY), Value(Decimal('0'), output_field=MONEY)
+        ),
+        version=F('version') + 1,
+    )
+
+
+def change_batch_fees(fee_management, fees=None, discount=None, changed_by=None):
+    """
+    Change a batch's fees and/or discount and move every student balance with it.
+
+    Arguments left as ``None`` keep their current value. Returns the
+    ``BatchFeeChange`` audit row, or ``None`` if nothing changed.
+    """
+    with transaction.atomic():
+        # Old values come from the locked row; ``fee_management`` may hold unsaved form data.
+        current = BatchFeeManagement.objects.select_for_update().select_related('batch').get(pk=fee_management.pk)
+        old_fees, old_discount = current.batch.fees, current.discount
+        new_fees = old_fees if fees is None else fees
+        new_discount = old_discount if discount is None else discount
+        if new_fees == old_fees and new_discount == old_discount:
+            return None
+
+        remaining_amount = new_fees - new_discount
+        Batch.objects.filter(pk=current.batch_id).update(fees=new_fees)
+        BatchFeeManagement.objects.filter(pk=current.pk).update(
+            discount=new_discount, remaining_amount=remaining_amount
+        )
+        students_updated = propagate_remaining_amount(current.pk, remaining_amount)
+        change = BatchFeeChange.objects.create(
+            batch_fee_management=current,
+            changed_by=changed_by,
+            old_fees=old_fees,
+            new_fees=new_fees,
+            old_discount=old_discount,
+            new_discount=new_discount,
+            students_updated=students_updated,
+        )
+        outbox.publish(outbox.BATCH_FEES_CHANGED, {
+            'batch_id': current.batch_id,
+            'fees': new_fees,
+            'discount': new_discount,
+            'remaining_amount': remaining_amount,
+            'students_updated': students_updated,
+        })
+        audit.record(
+            'batch_fee_management', current.pk,
+            audit.diff({'fees': old_fees, 'discount': old_discount}, {'fees': new_fees, 'discount': new_discount}),
+            current.batch_id, actor=changed_by,
+        )
+
+    fee_management.batch.fees = new_fees
+    fee_management.discount = new_discount
+    fee_management.remaining_amount = remaining_amount
+    return change
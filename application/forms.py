@@ -116,8 +116,9 @@ class InstallmentForm(forms.ModelForm):
 class EditInstallmentForm(forms.ModelForm):
     class Meta:
         model = Installment
-        fields = ['amount', 'payed_amount', 'repayment_period_days']  # Added payed_amount field
+        fields = ['amount', 'payed_amount', 'repayment_period_days', 'version']  # Added payed_amount field
         widgets = {
+            'version': forms.HiddenInput(),
             'amount': forms.NumberInput(attrs={'step': '0.01', 'min': '0.01', 'required': 'required'}),
             'payed_amount': forms.NumberInput(attrs={'step': '0.01', 'min': '0', 'required': 'required'}),
             'repayment_period_days': forms.NumberInput(attrs={'min': '1', 'required': 'required'}),
@@ -138,7 +139,7 @@ class EditInstallmentForm(forms.ModelForm):
 class PaymentForm(forms.ModelForm):
     class Meta:
         model = Payment
-        fields = ['payment_date', 'amount']
+        fields = ['payment_date', 'amount', 'method']
         widgets = {
             'payment_date': forms.DateInput(attrs={'type': 'date'}),
         }
@@ -0,0 +1,108 @@
+"""
+Financial KPIs for the homepage, cached and refreshed in the background.
+
+``compute`` runs two aggregate queries: collections from the ``Payment``
+ledger, and outstanding and overdue balances grouped by franchise, from which
+the totals and the top franchises are taken. ``homepage_kpis`` serves the
+cached result; once it is older than ``APPLICATION_KPI_FRESH_SECONDS`` the
+stale copy is still returned while one background thread recomputes it, so
+only a cold cache makes a request wait. The ``refresh_homepage_kpis``
+command keeps the cache warm from cron.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import Installment, Payment
+from .reports import BATCH_PATH, USER_PATH, outstanding
+
+log = logging.getLogger(__name__)
+
+CACHE_KEY = 'application.homepage_kpis'
+REFRESH_LOCK_KEY = 'application.homepage_kpis.refreshing'
+DEFAULT_FRESH_SECONDS = 60
+# Stale values are served for this long while a refresh is attempted.
+STALE_SECONDS = 60 * 60
+TOP_FRANCHISES = 5
+
+
+def fresh_seconds():
+    return getattr(settings, 'APPLICATION_KPI_FRESH_SECONDS', DEFAULT_FRESH_SECONDS)
+
+
+def compute(today=None):
+    """
+    Return the homepage KPIs as of ``today``.
+    """
+    today = today or timezone.now().date()
+    collected = Payment.objects.filter(payment_date__gte=today.replace(day=1), payment_date__lte=today).aggregate(
+        collected_month=Sum('amount'),
+        collected_today=Sum('amount', filter=Q(payment_date=today)),
+    )
+
+    overdue = Q(due_date__lt=today)
+    franchises = list(
+        Installment.objects.exclude(status='paid')
+        .values(franchise_id=f'{BATCH_PATH}__franchise_id', name=f'{BATCH_PATH}__franchise__name')
+        .annotate(
+            outstanding=Sum(outstanding()),
+            overdue=Sum(outstanding(), filter=overdue),
+            overdue_students=Count(f'{USER_PATH}_id', filter=overdue, distinct=True),
+        )
+        .order_by('-outstanding', 'franchise_id')
+    )
+    zero = Decimal('0')
+    return {
+        'collected_month': collected['collected_month'] or zero,
+        'collected_today': collected['collected_today'] or zero,
+        # A student belongs to one franchise, so per-franchise counts add up.
+        'outstanding': sum((row['outstanding'] or zero for row in franchises), zero),
+        'overdue': sum((row['overdue'] or zero for row in franchises), zero),
+        'overdue_students': sum(row['overdue_students'] for row in franchises),
+        'top_franchises': [
+            {'franchise_id': row['franchise_id'], 'name': row['name'], 'outstanding': row['outstanding']}
+            for row in franchises[:TOP_FRANCHISES]
+        ],
+    }
+
+
+def refresh():
+    """
+    Recompute the KPIs and store them; return them.
+    """
+    kpis = compute()
+    cache.set(CACHE_KEY, {'computed_at': time.time(), 'kpis': kpis}, fresh_seconds() + STALE_SECONDS)
+    return kpis
+
+
+def _refresh_in_background():
+    try:
+        refresh()
+    except Exception:  # pylint: disable=broad-except
+        log.exception("Refreshing homepage KPIs failed")
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+        close_old_connections()
+
+
+def homepage_kpis():
+    """
+    Return the cached KPIs, computing them inline only when nothing is cached.
+    """
+    cached = cache.get(CACHE_KEY)
+    if cached is None:
+        return refresh()
+    if time.time() - cached['computed_at'] > fresh_seconds() and cache.add(REFRESH_LOCK_KEY, True, 5 * 60):
+        # The copied context keeps the caller's read-replica routing.
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(_refresh_in_background,), daemon=True).start()
+    return cached['kpis']
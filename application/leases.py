@@ -0,0 +1,187 @@
+"""
+Database leases so a scheduled job runs on one LMS worker at a time.
+
+Every worker runs the same cron entries, so each job first takes the lease
+named after it from the ``JobLease`` table. Taking a lease is a single
+conditional ``UPDATE`` that only matches an expired lease, so exactly one
+worker wins on any backend, SQLite included, without holding a transaction
+open. The winner's lease lasts ``ttl`` seconds and a heartbeat thread renews
+it every third of that while the job runs; a crashed worker stops renewing
+and its lease is free again within ``ttl``.
+
+Each acquisition increments the lease's ``token``. A holder that paused past
+its expiry (a long GC, a frozen VM) calls ``Lease.verify`` at the end of each
+transaction that commits work and finds out from the token that another
+worker has taken over since, instead of writing on top of it. Inside a
+transaction ``verify`` also locks the lease row, so a takeover waits until
+the checked writes have committed.
+"""
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import JobLease
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 30
+
+
+class LeaseLost(Exception):
+    """
+    Raised when a lease expired and may have been taken by another worker.
+    """
+
+
+def default_ttl():
+    return getattr(settings, 'APPLICATION_LEASE_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+class Lease:
+    """
+    A lease held on ``name`` by ``owner`` with fencing token ``token``.
+    """
+
+    def __init__(self, name, owner, token, ttl):
+        self.name = name
+        self.owner = owner
+        self.token = token
+        self.ttl = ttl
+        self.lost = threading.Event()
+
+    def _held(self):
+        return JobLease.objects.filter(name=self.name, owner=self.owner, token=self.token)
+
+    def renew(self):
+        """
+        Extend the lease by ``ttl`` from now; raise ``LeaseLost`` if it has already expired.
+        """
+        now = timezone.now()
+        if not self._held().filter(expires_at__gt=now).update(expires_at=now + timedelta(seconds=self.ttl)):
+            self.lost.set()
+            raise LeaseLost(f"Lease {self.name} (token {self.token}) expired.")
+
+    def verify(self):
+        """
+        Raise ``LeaseLost`` unless the lease is still held and unexpired.
+        """
+        held = self._held().filter(expires_at__gt=timezone.now())
+        if transaction.get_connection().in_atomic_block:
+            held = held.select_for_update()
+        if self.lost.is_set() or held.values_list('token', flat=True).first() is None:
+            self.lost.set()
+            raise LeaseLost(f"Lease {self.name} (token {self.token}) is no longer held.")
+
+    def release(self):
+        """
+        Expire the lease now so the next worker need not wait out the ttl.
+        """
+        self._held().update(owner='', expires_at=timezone.now())
+
+    def __repr__(self):
+        return f"Lease({self.name!r}, owner={self.owner!r}, token={self.token})"
+
+
+def acquire(name, ttl=None, owner=None):
+    """
+    Take the lease on ``name`` for ``ttl`` seconds; return a ``Lease``, or ``None`` if it is held.
+    """
+    ttl = ttl or default_ttl()
+    owner = owner or worker_id()
+    now = timezone.now()
+    JobLease.objects.bulk_create([JobLease(name=name, expires_at=now)], ignore_conflicts=True)
+    taken = JobLease.objects.filter(name=name, expires_at__lte=now).update(
+        owner=owner, token=F('token') + 1, acquired_at=now, expires_at=now + timedelta(seconds=ttl),
+    )
+    if not taken:
+        return None
+    # Nobody else can take the lease before it expires, so the token read here is ours.
+    token = JobLease.objects.filter(name=name, owner=owner).values_list('token', flat=True).first()
+    if token is None:
+        return None
+    return Lease(name, owner, token, ttl)
+
+
+def holder(name):
+    """
+    Return the owner of an unexpired lease on ``name``, or ``None``.
+    """
+    return JobLease.objects.filter(name=name, expires_at__gt=timezone.now()).values_list('owner', flat=True).first()
+
+
+class Heartbeat(threading.Thread):
+    """
+    Renew ``lease`` every third of its ttl until stopped or the lease is lost.
+    """
+
+    def __init__(self, lease):
+        super().__init__(name=f'lease-heartbeat-{lease.name}', daemon=True)
+        self.lease = lease
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.lease.ttl / 3):
+                try:
+                    self.lease.renew()
+                except LeaseLost:
+                    log.error("Lost lease %s (token %s) while running", self.lease.name, self.lease.token)
+                    return
+                except Exception:  # pylint: disable=broad-except
+                    # A missed renewal is retried on the next beat; the ttl leaves room for two.
+                    log.exception("Renewing lease %s failed", self.lease.name)
+        finally:
+            close_old_connections()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def exclusive(name=None, ttl=None):
+    """
+    Decorate a management command's ``handle`` so only one worker runs it at a time.
+
+    The lease is named after the command unless ``name`` is given. While
+    ``handle`` runs the lease is kept alive by a heartbeat and available as
+    ``self.lease``; commands pass ``self.lease.verify`` to the work they run
+    so every committing step checks the lease, and a lost lease ends the
+    command with a ``CommandError``. When another worker holds the lease the
+    command prints who and returns without running.
+    """
+    def decorator(handle):
+        @wraps(handle)
+        def wrapper(self, *args, **options):
+            lease_name = name or self.__module__.rsplit('.', 1)[-1]
+            lease = acquire(lease_name, ttl)
+            if lease is None:
+                self.stdout.write(f"{lease_name} is already running on {holder(lease_name) or 'another worker'}.")
+                return None
+            self.lease = lease
+            heartbeat = Heartbeat(lease)
+            heartbeat.start()
+            try:
+                return handle(self, *args, **options)
+            except LeaseLost as exc:
+                raise CommandError(f"{exc} Stopping; another worker may have taken over.") from exc
+            finally:
+                heartbeat.stop()
+                if not lease.lost.is_set():
+                    lease.release()
+        return wrapper
+    return decorator
@@ -0,0 +1,28 @@
+"""
+Move fully settled batches to the archive tables.
+"""
+
+from django.core.management.base import BaseCommand
+
+from application.archive import DEFAULT_CHUNK_SIZE, DEFAULT_OLDER_THAN_DAYS, archive_settled_batches
+from application.leases import exclusive
+
+
+class Command(BaseCommand):
+    help = "Archive the fee records of batches whose installments are all paid and older than a threshold."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=DEFAULT_OLDER_THAN_DAYS,
+            help="Only archive batches whose last due date and payment are at least this old.",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Students moved per transaction.",
+        )
+
+    @exclusive()
+    def handle(self, *args, **options):
+        batches, students = archive_settled_batches(
+            options['older_than_days'], options['chunk_size'], verify=self.lease.verify,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {students} students in {batches} batches."))
@@ -0,0 +1,29 @@
+"""
+Backfill fee snapshots for a historical date range.
+"""
+
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from application.rollups import DEFAULT_CHUNK_DAYS, rollup_range
+
+
+class Command(BaseCommand):
+    help = (
+        "Write DailyBatchSnapshot rows for every day in a range, in date-chunked passes. Rows for days "
+        "before yesterday are rebuilt from today's installments and marked approximate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, required=True, help="First day, as YYYY-MM-DD.")
+        parser.add_argument('--end', type=date.fromisoformat, help="Last day, as YYYY-MM-DD. Defaults to yesterday.")
+        parser.add_argument('--chunk-days', type=int, default=DEFAULT_CHUNK_DAYS)
+
+    def handle(self, *args, **options):
+        end = options['end'] or timezone.now().date() - timedelta(days=1)
+        if options['start'] > end:
+            raise CommandError("--start must not be after --end.")
+        written = rollup_range(options['start'], end, chunk_days=options['chunk_days'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} snapshots."))
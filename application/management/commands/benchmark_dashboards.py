@@ -0,0 +1,59 @@
+"""
+Compare the latency of the sync and async homepage views through Django's ASGI handler.
+"""
+
+import asyncio
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the homepage through its sync and async views, in-process over ASGI, and print "
+        "wall-clock latency for each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help="Superuser to request the pages as.")
+        parser.add_argument('--requests', type=int, default=20, help="Requests per view.")
+        parser.add_argument('--concurrency', type=int, default=1, help="Requests in flight at once.")
+        parser.add_argument('--host', default='localhost', help="Host header; must be in ALLOWED_HOSTS.")
+
+    async def _measure(self, client, url, requests, concurrency, host):
+        latencies = []
+
+        async def fetch():
+            started = time.perf_counter()
+            response = await client.get(url, headers={'Host': host})
+            if response.status_code != 200:
+                raise CommandError(f"{url} returned {response.status_code}")
+            latencies.append(time.perf_counter() - started)
+
+        await fetch()  # warm up connections and template caches
+        latencies.clear()
+        for start in range(0, requests, concurrency):
+            await asyncio.gather(*(fetch() for _ in range(min(concurrency, requests - start))))
+        return latencies
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'], is_superuser=True)
+        except User.DoesNotExist as exc:
+            raise CommandError(f"No superuser named {options['username']}.") from exc
+        client = AsyncClient()
+        client.force_login(user)
+
+        for variant in ('homepage', 'homepage_async'):
+            url = reverse(f'application:{variant}')
+            latencies = asyncio.run(self._measure(
+                client, url, options['requests'], options['concurrency'], options['host'],
+            ))
+            self.stdout.write(
+                f"{variant}: mean {statistics.mean(latencies) * 1000:.1f} ms, "
+                f"p50 {statistics.median(latencies) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms"
+            )
@@ -0,0 +1,49 @@
+"""
+Compare the peak memory of loading the reminders page as model instances and as slim rows.
+"""
+
+import gc
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.http import QueryDict
+
+from application import reminders, rows
+
+
+def peak_memory(load):
+    """
+    Return ``(result length, peak bytes allocated)`` while ``load()`` runs.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = load()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return len(result), peak
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the overdue reminders once as model instances, as the reminders view used to, "
+        "and once as ReminderRow objects, and print the peak memory of each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10000, help="Overdue installments to load.")
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        installments = reminders.reminder_queryset(QueryDict()).order_by('due_date', 'pk')
+        reminder_columns = rows.ReminderRow.columns(reminders.BATCH_PATH)
+
+        count, model_peak = peak_memory(lambda: list(installments.select_related(
+            'student_fee_management__user_franchise__user', reminders.BATCH_PATH,
+        )[:limit]))
+        _, row_peak = peak_memory(lambda: rows.build(rows.ReminderRow, installments[:limit], *reminder_columns))
+        self.stdout.write(
+            f"reminders: {count} rows, models {model_peak / 1024:.0f} KiB, rows {row_peak / 1024:.0f} KiB "
+            f"({row_peak / model_peak if model_peak else 0:.0%})"
+        )
@@ -0,0 +1,79 @@
+"""
+Measure student search latency against the search table.
+"""
+
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from application.models import StudentSearchEntry
+from application.search import RESULT_LIMIT, search_queryset, search_students
+
+
+def sample_queries(samples, seed):
+    """
+    Return ``(kind, query)`` prefixes of randomly picked search entries.
+    """
+    bounds = StudentSearchEntry.objects.order_by('user_id').values_list('user_id', flat=True)
+    first, last = bounds.first(), bounds.last()
+    if first is None:
+        return []
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(samples):
+        entry = StudentSearchEntry.objects.filter(user_id__gte=rng.randint(first, last)).order_by('user_id').first()
+        candidates = [
+            ('username', entry.username[:3]),
+            ('name', entry.full_name[:4]),
+            ('email', entry.email[:5]),
+            ('phone', entry.phone[:4]),
+        ]
+        queries.extend((kind, query) for kind, query in candidates if len(query) >= 2)
+    return queries
+
+
+class Command(BaseCommand):
+    help = (
+        "Run prefix searches for username, name, e-mail and phone prefixes of random students and "
+        "print p50, p95 and max latency per kind, failing if the overall p95 is over --target-ms."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=200, help="Students to take query prefixes from.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for picking students.")
+        parser.add_argument('--target-ms', type=float, default=50.0, help="p95 latency target in milliseconds.")
+        parser.add_argument('--explain', action='store_true', help="Print the query plan for one query of each kind.")
+
+    def handle(self, *args, **options):
+        queries = sample_queries(options['samples'], options['seed'])
+        if not queries:
+            raise CommandError("The search table is empty; run rebuild_student_search first.")
+        self.stdout.write(f"{StudentSearchEntry.objects.count()} students, {len(queries)} queries.")
+
+        latencies = {}
+        for kind, query in queries:
+            started = time.perf_counter()
+            search_students(query, limit=RESULT_LIMIT)
+            latencies.setdefault(kind, []).append((time.perf_counter() - started) * 1000)
+
+        for kind, timings in latencies.items():
+            self.stdout.write(f"{kind}: {self._summary(timings)}")
+            if options['explain']:
+                query = next(query for query_kind, query in queries if query_kind == kind)
+                self.stdout.write(search_queryset(query).select_related('user')[:RESULT_LIMIT].explain())
+        overall = [timing for timings in latencies.values() for timing in timings]
+        self.stdout.write(f"all: {self._summary(overall)}")
+        if self._p95(overall) > options['target_ms']:
+            raise CommandError(f"p95 {self._p95(overall):.1f} ms is over the {options['target_ms']:.0f} ms target.")
+
+    @staticmethod
+    def _p95(timings):
+        return statistics.quantiles(timings, n=20, method='inclusive')[-1] if len(timings) > 1 else timings[0]
+
+    def _summary(self, timings):
+        return (
+            f"p50 {statistics.median(timings):.1f} ms, p95 {self._p95(timings):.1f} ms, "
+            f"max {max(timings):.1f} ms"
+        )
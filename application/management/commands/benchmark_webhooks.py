@@ -0,0 +1,71 @@
+"""
+Measure webhook delivery throughput against a local HTTP receiver.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from application.webhooks import ConnectionPool, encode
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare events per second for one new connection per event, one pooled request per event "
+        "and pooled batches. Touches no database tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=2000)
+        parser.add_argument('--batch-size', type=int, default=50)
+
+    def _run(self, url, events, batch_size, pooled):
+        endpoint = SimpleNamespace(name='benchmark', secret='benchmark')
+        pool = ConnectionPool()
+        started = time.perf_counter()
+        try:
+            for start in range(0, len(events), batch_size):
+                body, headers = encode(endpoint, events[start:start + batch_size])
+                pool.post(url, body, headers)
+                if not pooled:
+                    pool.close()
+        finally:
+            pool.close()
+        return len(events) / (time.perf_counter() - started)
+
+    def handle(self, *args, **options):
+        events = [
+            {'id': number, 'type': 'payment.recorded', 'created_at': '2026-01-01T00:00:00+00:00',
+             'payload': {'payment_id': number, 'amount': '1500.00', 'method': 'upi'}}
+            for number in range(options['events'])
+        ]
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _Receiver)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_port}/hook'
+        try:
+            results = [
+                ("New connection per event", self._run(url, events, 1, pooled=False)),
+                ("Pooled, one event per request", self._run(url, events, 1, pooled=True)),
+                (f"Pooled, batches of {options['batch_size']}", self._run(url, events, options['batch_size'], True)),
+            ]
+        finally:
+            server.shutdown()
+            server.server_close()
+        for label, rate in results:
+            self.stdout.write(f"{label}: {rate:,.0f} events/s")
@@ -0,0 +1,15 @@
+"""
+Build the content-hashed stylesheet bundle.
+"""
+
+from django.core.management.base import BaseCommand
+
+from application.assets import build_bundle
+
+
+class Command(BaseCommand):
+    help = "Scope, concatenate and minify the page stylesheets into static/dist/application.<hash>.css."
+
+    def handle(self, *args, **options):
+        file_name = build_bundle()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {file_name}."))
@@ -0,0 +1,45 @@
+"""
+Send outbox events to the subscribed webhook endpoints.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from application.leases import exclusive
+from application.models import WebhookDeadLetter
+from application.webhooks import ConnectionPool, dispatch, redeliver
+
+
+class Command(BaseCommand):
+    help = (
+        "POST the outbox events queued by drain_outbox to every active WebhookEndpoint, "
+        "in batches over kept-alive connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting once caught up.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to wait between polls with --loop.")
+        parser.add_argument(
+            '--redeliver-dead-letters', action='store_true', help="Retry dead-lettered batches before dispatching.",
+        )
+
+    @exclusive()
+    def handle(self, *args, **options):
+        pool = ConnectionPool()
+        try:
+            if options['redeliver_dead_letters']:
+                dead_letters = WebhookDeadLetter.objects.filter(redelivered_at__isnull=True).select_related('endpoint')
+                redelivered = sum(redeliver(dead_letter, pool) for dead_letter in dead_letters.order_by('pk'))
+                self.stdout.write(f"Redelivered {redelivered} dead-lettered batches.")
+            while True:
+                for name, (delivered, dead_lettered) in dispatch(pool).items():
+                    if delivered or dead_lettered:
+                        self.stdout.write(f"{name}: delivered {delivered}, dead-lettered {dead_lettered} events.")
+                if not options['loop']:
+                    return
+                if self.lease.lost.is_set():
+                    raise CommandError("Lost the lease to another worker; stopping.")
+                time.sleep(options['interval'])
+        finally:
+            pool.close()
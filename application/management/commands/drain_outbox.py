@@ -0,0 +1,38 @@
+"""
+Deliver fee integration events from the outbox to the configured sinks.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from application.leases import exclusive
+from application.outbox import DEFAULT_BATCH_SIZE, DEFAULT_MAX_ATTEMPTS, drain, load_sinks
+
+
+class Command(BaseCommand):
+    help = "Send undelivered OutboxEvent rows, in order, to the APPLICATION_OUTBOX_SINKS sinks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            '--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+            help="Mark an event failed once a sink has rejected it this many times.",
+        )
+        parser.add_argument(
+            '--loop', action='store_true', help="Keep polling instead of exiting once the outbox is empty.",
+        )
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to wait between polls with --loop.")
+
+    @exclusive()
+    def handle(self, *args, **options):
+        sinks = load_sinks()
+        while True:
+            delivered = drain(sinks, batch_size=options['batch_size'], max_attempts=options['max_attempts'])
+            if delivered:
+                self.stdout.write(f"Delivered {delivered} events.")
+            if not options['loop']:
+                return
+            if self.lease.lost.is_set():
+                raise CommandError("Lost the lease to another worker; stopping.")
+            time.sleep(options['interval'])
@@ -0,0 +1,47 @@
+"""
+Import a day's payment receipts into the payment ledger.
+"""
+
+import csv
+from decimal import InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from application.payments import parse_receipt, post_payments
+
+
+class Command(BaseCommand):
+    help = (
+        "Post receipts from a CSV file with columns installment_id, amount and optionally "
+        "payment_date, method and idempotency_key. Receipts already in the ledger are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with one receipt per row.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as receipts_file:
+                receipts = list(csv.DictReader(receipts_file))
+        except OSError as exc:
+            raise CommandError(f"Cannot read receipts: {exc}") from exc
+
+        missing = {'installment_id', 'amount'} - set(receipts[0] if receipts else ())
+        if receipts and missing:
+            raise CommandError(f"Missing columns: {', '.join(sorted(missing))}")
+
+        for line, receipt in enumerate(receipts, start=2):
+            try:
+                parse_receipt(receipt)
+            except InvalidOperation as exc:
+                raise CommandError(f"Invalid amount on line {line}: {receipt['amount']!r}") from exc
+            except ValueError as exc:
+                raise CommandError(f"Invalid receipt on line {line}: {exc}") from exc
+
+        try:
+            payments = post_payments(receipts)
+        except ValueError as exc:
+            raise CommandError(f"Cannot post receipts: {exc}") from exc
+        self.stdout.write(self.style.SUCCESS(
+            f"Posted {len(payments)} of {len(receipts)} receipts."
+        ))
@@ -0,0 +1,17 @@
+"""
+Daily job marking installments past their due date as overdue.
+"""
+
+from django.core.management.base import BaseCommand
+
+from application.leases import exclusive
+from application.reminders import mark_overdue
+
+
+class Command(BaseCommand):
+    help = "Set pending installments past their due date to overdue and publish installment.overdue events."
+
+    @exclusive()
+    def handle(self, *args, **options):
+        marked = mark_overdue(verify=self.lease.verify)
+        self.stdout.write(self.style.SUCCESS(f"Marked {marked} installments overdue."))
@@ -0,0 +1,18 @@
+"""
+Rebuild the student search table from franchise students.
+"""
+
+from django.core.management.base import BaseCommand
+
+from application.search import REBUILD_CHUNK_SIZE, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild StudentSearchEntry rows for every user with a UserFranchise, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=REBUILD_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} students."))
@@ -0,0 +1,17 @@
+"""
+Recompute the cached homepage KPIs, for cron between page views.
+"""
+
+from django.core.management.base import BaseCommand
+
+from application.kpis import refresh
+from application.leases import exclusive
+
+
+class Command(BaseCommand):
+    help = "Recompute the homepage financial KPIs and store them in the cache."
+
+    @exclusive()
+    def handle(self, *args, **options):
+        kpis = refresh()
+        self.stdout.write(self.style.SUCCESS(f"Outstanding {kpis['outstanding']}, overdue {kpis['overdue']}."))
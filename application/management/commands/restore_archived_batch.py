@@ -0,0 +1,26 @@
+"""
+Bring an archived batch's fee records back to the hot tables.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from application.archive import DEFAULT_CHUNK_SIZE, restore_batch
+from application.models import BatchFeeManagement
+
+
+class Command(BaseCommand):
+    help = "Restore the archived fee records of one batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('batch_no', help="Batch number, as shown on the franchise report.")
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Students moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            fee_management = BatchFeeManagement.objects.get(batch__batch_no=options['batch_no'])
+        except BatchFeeManagement.DoesNotExist as exc:
+            raise CommandError(f"No fee setup for batch {options['batch_no']}.") from exc
+        students = restore_batch(fee_management, options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Restored {students} students."))
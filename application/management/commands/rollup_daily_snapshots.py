@@ -0,0 +1,22 @@
+"""
+Nightly job writing the previous day's fee snapshots.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from application.leases import exclusive
+from application.rollups import rollup_day
+
+
+class Command(BaseCommand):
+    help = "Write DailyBatchSnapshot rows for one day (yesterday by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help="Day to roll up, as YYYY-MM-DD.")
+
+    @exclusive()
+    def handle(self, *args, **options):
+        written = rollup_day(options['date'], verify=self.lease.verify)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} snapshots."))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0026_installment_repayment_period_days'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='installment',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='studentfeemanagement',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
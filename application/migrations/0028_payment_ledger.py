@@ -0,0 +1,99 @@
+# Generated by Django 4.2.20 on 2026-10-19 10:03
+
+import uuid
+
+import application.models
+from django.db import migrations, models
+from django.db.models import Sum
+import django.db.models.deletion
+import django.utils.timezone
+
+CHUNK_SIZE = 1000
+
+
+def fill_idempotency_keys(apps, schema_editor):
+    Payment = apps.get_model('application', 'Payment')
+    for payment in Payment.objects.filter(idempotency_key__isnull=True).only('id').iterator():
+        Payment.objects.filter(pk=payment.pk).update(idempotency_key=uuid.uuid4().hex)
+
+
+def seed_opening_payments(apps, schema_editor):
+    """
+    Record what each installment had been paid before the ledger as one opening ``adjustment`` payment.
+
+    Only the part not already covered by ``Payment`` rows is seeded, dated on
+    the installment's payment date (its due date if none was recorded), so
+    sums over the ledger match ``payed_amount``.
+    """
+    Installment = apps.get_model('application', 'Installment')
+    Payment = apps.get_model('application', 'Payment')
+    last_pk = 0
+    while True:
+        rows = list(
+            Installment.objects.filter(pk__gt=last_pk, payed_amount__gt=0)
+            .order_by('pk')
+            .values_list('pk', 'payed_amount', 'payment_date', 'due_date')[:CHUNK_SIZE]
+        )
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        ledger = dict(
+            Payment.objects.filter(installment_id__in=[row[0] for row in rows])
+            .values('installment_id')
+            .annotate(total=Sum('amount'))
+            .values_list('installment_id', 'total')
+        )
+        Payment.objects.bulk_create([
+            Payment(
+                installment_id=pk,
+                amount=payed_amount - ledger.get(pk, 0),
+                payment_date=payment_date or due_date,
+                method='adjustment',
+                idempotency_key=f'opening-{pk}',
+            )
+            for pk, payed_amount, payment_date, due_date in rows
+            if payed_amount > ledger.get(pk, 0)
+        ])
+
+
+def remove_opening_payments(apps, schema_editor):
+    Payment = apps.get_model('application', 'Payment')
+    Payment.objects.filter(method='adjustment', idempotency_key__startswith='opening-').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0027_installment_version_studentfeemanagement_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='installment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='application.installment'),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='method',
+            field=models.CharField(choices=[('cash', 'Cash'), ('upi', 'UPI'), ('card', 'Card'), ('bank_transfer', 'Bank Transfer'), ('cheque', 'Cheque'), ('adjustment', 'Adjustment')], default='cash', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='idempotency_key',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(fill_idempotency_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='payment',
+            name='idempotency_key',
+            field=models.CharField(default=application.models.new_idempotency_key, max_length=64, unique=True),
+        ),
+        migrations.RunPython(seed_opening_payments, remove_opening_payments),
+    ]
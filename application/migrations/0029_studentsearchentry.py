@@ -0,0 +1,30 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('application', '0028_payment_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchEntry',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('display_name', models.CharField(blank=True, max_length=255)),
+                ('username', models.CharField(db_index=True, max_length=150)),
+                ('full_name', models.CharField(blank=True, db_index=True, max_length=255)),
+                ('last_name', models.CharField(blank=True, db_index=True, max_length=150)),
+                ('email', models.CharField(blank=True, db_index=True, max_length=254)),
+                ('phone', models.CharField(blank=True, db_index=True, max_length=20)),
+                ('batch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='application.batch')),
+                ('franchise', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='application.franchise')),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.20 on 2026-10-19 12:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0029_studentsearchentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBatchSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('students', models.PositiveIntegerField(default=0)),
+                ('collected', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('overdue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_snapshots', to='application.batch')),
+                ('franchise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='application.franchise')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailybatchsnapshot',
+            constraint=models.UniqueConstraint(fields=('batch', 'date'), name='unique_daily_batch_snapshot'),
+        ),
+        migrations.AddIndex(
+            model_name='dailybatchsnapshot',
+            index=models.Index(fields=['franchise', 'date'], name='snapshot_franchise_date_idx'),
+        ),
+    ]
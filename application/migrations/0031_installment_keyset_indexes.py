@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-19 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0030_dailybatchsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='installment',
+            index=models.Index(fields=['due_date', 'id'], name='installment_due_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='installment',
+            index=models.Index(fields=['amount', 'id'], name='installment_amount_id_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.20 on 2026-10-19 15:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0031_installment_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='batchfeemanagement',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedStudentFeeManagement',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('remaining_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('batch_fee_management', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_student_fees', to='application.batchfeemanagement')),
+                ('user_franchise', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archived_fee_management', to='application.userfranchise')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedInstallmentTemplate',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('repayment_period_days', models.PositiveIntegerField()),
+                ('batch_fee_management', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_installment_templates', to='application.batchfeemanagement')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedInstallment',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('due_date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('payed_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('overdue', 'Overdue')], default='pending', max_length=10)),
+                ('payment_date', models.DateField(blank=True, null=True)),
+                ('repayment_period_days', models.PositiveIntegerField(default=0)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('student_fee_management', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='installments', to='application.archivedstudentfeemanagement')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedPayment',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('payment_date', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('method', models.CharField(choices=[('cash', 'Cash'), ('upi', 'UPI'), ('card', 'Card'), ('bank_transfer', 'Bank Transfer'), ('cheque', 'Cheque'), ('adjustment', 'Adjustment')], default='cash', max_length=20)),
+                ('idempotency_key', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField()),
+                ('installment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='application.archivedinstallment')),
+            ],
+        ),
+    ]
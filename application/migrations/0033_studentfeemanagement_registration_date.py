@@ -0,0 +1,59 @@
+# Generated by Django 4.2.20 on 2026-10-19 16:20
+
+from django.db import migrations, models
+
+CHUNK_SIZE = 1000
+
+
+def backfill_registration_dates(apps, schema_editor):
+    """
+    Copy each student's enrollment date onto their fee record, one chunk of records at a time.
+    """
+    StudentFeeManagement = apps.get_model('application', 'StudentFeeManagement')
+    CourseEnrollment = apps.get_model('student', 'CourseEnrollment')
+    last_pk = 0
+    while True:
+        rows = list(
+            StudentFeeManagement.objects.filter(pk__gt=last_pk, registration_date__isnull=True)
+            .order_by('pk')
+            .values_list('pk', 'user_franchise__user_id', 'batch_fee_management__batch__course_id')[:CHUNK_SIZE]
+        )
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        enrolled = {
+            (user_id, str(course_id)): created.date()
+            for user_id, course_id, created in CourseEnrollment.objects.filter(
+                user_id__in={user_id for _, user_id, _ in rows}
+            ).values_list('user_id', 'course_id', 'created')
+        }
+        updates = [
+            StudentFeeManagement(pk=pk, registration_date=enrolled[(user_id, str(course_id))])
+            for pk, user_id, course_id in rows
+            if (user_id, str(course_id)) in enrolled
+        ]
+        StudentFeeManagement.objects.bulk_update(updates, ['registration_date'])
+
+
+class Migration(migrations.Migration):
+    # Each backfill chunk commits on its own instead of holding one long transaction.
+    atomic = False
+
+    dependencies = [
+        ('application', '0032_archive_tables'),
+        ('student', '__first__'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentfeemanagement',
+            name='registration_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedstudentfeemanagement',
+            name='registration_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_registration_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.20 on 2026-10-19 17:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('application', '0033_studentfeemanagement_registration_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchFeeChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+                ('old_fees', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('new_fees', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('old_discount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('new_discount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('students_updated', models.PositiveIntegerField(default=0)),
+                ('batch_fee_management', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fee_changes', to='application.batchfeemanagement')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
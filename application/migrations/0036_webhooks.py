@@ -0,0 +1,43 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:05
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0035_outboxevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('url', models.URLField()),
+                ('event_types', models.JSONField(blank=True, default=list)),
+                ('secret', models.CharField(blank=True, help_text='Signs each payload with HMAC-SHA256 when set.', max_length=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('batch_size', models.PositiveIntegerField(default=50)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5)),
+                ('timeout', models.PositiveSmallIntegerField(default=10, help_text='Seconds')),
+                ('last_event_id', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WebhookDeadLetter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('events', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('attempts', models.PositiveSmallIntegerField()),
+                ('error', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('redelivered_at', models.DateTimeField(blank=True, null=True)),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dead_letters', to='application.webhookendpoint')),
+            ],
+        ),
+    ]
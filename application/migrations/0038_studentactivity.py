@@ -0,0 +1,62 @@
+# Generated by Django 4.2.20 on 2026-10-19 19:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+CHUNK_SIZE = 1000
+
+
+def backfill_student_activity(apps, schema_editor):
+    """
+    Create an activity row for every franchise student from ``auth_user.last_login``, one chunk at a time.
+    """
+    UserFranchise = apps.get_model('application', 'UserFranchise')
+    StudentActivity = apps.get_model('application', 'StudentActivity')
+    last_pk = 0
+    while True:
+        rows = list(
+            UserFranchise.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'user_id', 'franchise_id', 'user__last_login')[:CHUNK_SIZE]
+        )
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        StudentActivity.objects.bulk_create(
+            [
+                StudentActivity(user_id=user_id, franchise_id=franchise_id, last_seen=last_login)
+                for _, user_id, franchise_id, last_login in rows
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+    # Each backfill chunk commits on its own instead of holding one long transaction.
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('application', '0037_auditentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentActivity',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='activity', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_seen', models.DateTimeField(blank=True, null=True)),
+                ('franchise', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='application.franchise')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='studentactivity',
+            index=models.Index(fields=['franchise', 'last_seen'], name='activity_franchise_seen_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentactivity',
+            index=models.Index(fields=['last_seen'], name='activity_last_seen_idx'),
+        ),
+        migrations.RunPython(backfill_student_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 4.2.20 on 2026-10-19 20:10
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, Max, Min
+from django.db.models.functions import Cast, Round
+
+import application.money
+
+CHUNK_SIZE = 10000
+
+# model: ([money fields], max_digits of the old DecimalFields)
+MONEY_FIELDS = {
+    'batch': (['fees'], 10),
+    'batchfeemanagement': (['discount', 'remaining_amount', 'installment_amount'], 10),
+    'studentfeemanagement': (['remaining_amount'], 10),
+    'installment': (['amount', 'payed_amount'], 10),
+    'batchfeechange': (['old_fees', 'new_fees', 'old_discount', 'new_discount'], 10),
+    'installmenttemplate': (['amount'], 10),
+    'dailybatchsnapshot': (['collected', 'outstanding', 'overdue'], 12),
+    'payment': (['amount'], 10),
+    'archivedstudentfeemanagement': (['remaining_amount'], 10),
+    'archivedinstallment': (['amount', 'payed_amount'], 10),
+    'archivedinstallmenttemplate': (['amount'], 10),
+    'archivedpayment': (['amount'], 10),
+}
+# Fields without a default; they get one while both columns exist so either can be added to a filled table.
+REQUIRED_FIELDS = {
+    ('installment', 'amount'), ('batchfeechange', 'old_fees'), ('batchfeechange', 'new_fees'),
+    ('batchfeechange', 'old_discount'), ('batchfeechange', 'new_discount'), ('installmenttemplate', 'amount'),
+    ('payment', 'amount'), ('archivedinstallment', 'amount'), ('archivedinstallmenttemplate', 'amount'),
+    ('archivedpayment', 'amount'),
+}
+
+
+def _chunks(model):
+    bounds = model.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return
+    for start in range(bounds['low'], bounds['high'] + 1, CHUNK_SIZE):
+        yield model.objects.filter(pk__gte=start, pk__lt=start + CHUNK_SIZE)
+
+
+def decimal_to_paise(apps, schema_editor):
+    """
+    Copy each rupee column into its paise column with one UPDATE per chunk of rows.
+    """
+    for model_name, (fields, _) in MONEY_FIELDS.items():
+        model = apps.get_model('application', model_name)
+        for chunk in _chunks(model):
+            chunk.update(**{
+                f'{field}_paise': Cast(Round(F(field) * 100), models.BigIntegerField()) for field in fields
+            })
+
+
+def paise_to_decimal(apps, schema_editor):
+    for model_name, (fields, _) in MONEY_FIELDS.items():
+        model = apps.get_model('application', model_name)
+        for chunk in _chunks(model):
+            rows = list(chunk.values_list('pk', *[f'{field}_paise' for field in fields]))
+            model.objects.bulk_update(
+                [
+                    model(pk=row[0], **{
+                        field: Decimal(int(paise)).scaleb(-2) for field, paise in zip(fields, row[1:])
+                    })
+                    for row in rows
+                ],
+                fields,
+            )
+
+
+def _decimal(max_digits):
+    return models.DecimalField(max_digits=max_digits, decimal_places=2, default=0)
+
+
+class Migration(migrations.Migration):
+    # Each copy chunk commits on its own instead of holding one long transaction.
+    atomic = False
+
+    dependencies = [
+        ('application', '0038_studentactivity'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(model_name='installment', name='installment_amount_id_idx'),
+        *[
+            migrations.AlterField(model_name=model_name, name=field, field=_decimal(MONEY_FIELDS[model_name][1]))
+            for model_name, field in sorted(REQUIRED_FIELDS)
+        ],
+        *[
+            migrations.AddField(
+                model_name=model_name, name=f'{field}_paise', field=application.money.MoneyField(default=0),
+            )
+            for model_name, (fields, _) in MONEY_FIELDS.items() for field in fields
+        ],
+        migrations.RunPython(decimal_to_paise, paise_to_decimal),
+        *[
+            migrations.RemoveField(model_name=model_name, name=field)
+            for model_name, (fields, _) in MONEY_FIELDS.items() for field in fields
+        ],
+        *[
+            migrations.RenameField(model_name=model_name, old_name=f'{field}_paise', new_name=field)
+            for model_name, (fields, _) in MONEY_FIELDS.items() for field in fields
+        ],
+        *[
+            migrations.AlterField(model_name=model_name, name=field, field=application.money.MoneyField())
+            for model_name, field in sorted(REQUIRED_FIELDS)
+        ],
+        migrations.AddIndex(
+            model_name='installment',
+            index=models.Index(fields=['amount', 'id'], name='installment_amount_id_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.20 on 2026-10-19 22:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+CHUNK_SIZE = 1000
+
+
+def queue_pending_events(apps, schema_editor):
+    """
+    Queue the events after each endpoint's old cursor as ``WebhookDelivery`` rows.
+    """
+    OutboxEvent = apps.get_model('application', 'OutboxEvent')
+    WebhookDelivery = apps.get_model('application', 'WebhookDelivery')
+    WebhookEndpoint = apps.get_model('application', 'WebhookEndpoint')
+    for endpoint in WebhookEndpoint.objects.all():
+        events = OutboxEvent.objects.filter(id__gt=endpoint.last_event_id)
+        if endpoint.event_types:
+            events = events.filter(event_type__in=endpoint.event_types)
+        last_pk = endpoint.last_event_id
+        while True:
+            event_ids = list(events.filter(id__gt=last_pk).order_by('id').values_list('id', flat=True)[:CHUNK_SIZE])
+            if not event_ids:
+                break
+            last_pk = event_ids[-1]
+            WebhookDelivery.objects.bulk_create(
+                [WebhookDelivery(endpoint_id=endpoint.pk, event_id=event_id) for event_id in event_ids],
+                ignore_conflicts=True,
+            )
+
+
+def restore_cursors(apps, schema_editor):
+    OutboxEvent = apps.get_model('application', 'OutboxEvent')
+    WebhookEndpoint = apps.get_model('application', 'WebhookEndpoint')
+    last_id = OutboxEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    for endpoint in WebhookEndpoint.objects.all():
+        first_pending = endpoint.deliveries.order_by('event_id').values_list('event_id', flat=True).first()
+        endpoint.last_event_id = first_pending - 1 if first_pending else last_id
+        endpoint.save(update_fields=['last_event_id'])
+
+
+class Migration(migrations.Migration):
+    # Each chunk of queued deliveries commits on its own.
+    atomic = False
+
+    dependencies = [
+        ('application', '0041_outbox_retries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookDelivery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='application.webhookendpoint')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='application.outboxevent')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='webhookdelivery',
+            constraint=models.UniqueConstraint(fields=('endpoint', 'event'), name='unique_webhook_delivery'),
+        ),
+        migrations.AddField(
+            model_name='webhookendpoint',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(queue_pending_events, restore_cursors),
+        migrations.RemoveField(
+            model_name='webhookendpoint',
+            name='last_event_id',
+        ),
+    ]
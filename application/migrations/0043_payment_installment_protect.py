@@ -0,0 +1,19 @@
+# Generated by Django 4.2.20 on 2026-10-19 22:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0042_webhookdelivery'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='installment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='payments', to='application.installment'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-19 22:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('application', '0043_payment_installment_protect'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailybatchsnapshot',
+            name='approximate',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,7 +1,13 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.contrib.auth.models import User
+from common.djangoapps.student.models import CourseEnrollment
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
+from .money import MoneyField
+
 class Franchise(models.Model):
     name = models.CharField(max_length=255)
     coordinator = models.CharField(max_length=255)
@@ -27,7 +33,7 @@ class UserFranchise(models.Model):
 
 class Batch(models.Model):
     batch_no = models.CharField(max_length=50, unique=True)
-    fees = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    fees = MoneyField(default=0)
     course = models.ForeignKey(CourseOverview, on_delete=models.CASCADE, related_name='batches')
     franchise = models.ForeignKey(Franchise, on_delete=models.CASCADE, related_name='batches')
 
@@ -37,10 +43,11 @@ class Batch(models.Model):
 
 class BatchFeeManagement(models.Model):
     batch = models.OneToOneField(Batch, on_delete=models.CASCADE, related_name='fee_management')
-    discount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    remaining_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    installment_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    discount = MoneyField(default=0)
+    remaining_amount = MoneyField(default=0)
+    installment_amount = MoneyField(default=0)
     repayment_period_days = models.PositiveIntegerField(default=30)
+    archived_at = models.DateTimeField(blank=True, null=True)  # Set while the batch's records are archived
 
     def save(self, *args, **kwargs):
         self.remaining_amount = self.batch.fees - self.discount
@@ -53,11 +60,21 @@ class BatchFeeManagement(models.Model):
 class StudentFeeManagement(models.Model):
     user_franchise = models.OneToOneField(UserFranchise, on_delete=models.CASCADE, related_name='fee_management')
     batch_fee_management = models.ForeignKey(BatchFeeManagement, on_delete=models.CASCADE)
-    remaining_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    remaining_amount = MoneyField(default=0)
+    version = models.PositiveIntegerField(default=0)  # Bumped on every compare-and-swap update
+    # Day the student enrolled in the batch's course; anchors the installment schedule.
+    # Kept in sync with CourseEnrollment by application.signals.
+    registration_date = models.DateField(blank=True, null=True)
 
     def save(self, *args, **kwargs):
         if not self.remaining_amount:
             self.remaining_amount = self.batch_fee_management.remaining_amount
+        if self._state.adding and self.registration_date is None:
+            enrolled = CourseEnrollment.objects.filter(
+                user_id=self.user_franchise.user_id,
+                course_id=self.batch_fee_management.batch.course_id,
+            ).values_list('created', flat=True).first()
+            self.registration_date = enrolled.date() if enrolled else None
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -72,29 +89,364 @@ class Installment(models.Model):
     ]
     student_fee_management = models.ForeignKey(StudentFeeManagement, on_delete=models.CASCADE, related_name='installments')
     due_date = models.DateField()
-    amount = models.DecimalField(max_digits=10, decimal_places=2)
-    payed_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # New field for partial payment
+    amount = MoneyField()
+    payed_amount = MoneyField(default=0)  # New field for partial payment
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     payment_date = models.DateField(blank=True, null=True)
     repayment_period_days = models.PositiveIntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)  # Bumped on every compare-and-swap update
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the fee reminder lists
+            models.Index(fields=['due_date', 'id'], name='installment_due_date_id_idx'),
+            models.Index(fields=['amount', 'id'], name='installment_amount_id_idx'),
+        ]
 
     def __str__(self):
         return f"Installment {self.id} for {self.student_fee_management} - {self.status}"
 
 
+class BatchFeeChange(models.Model):
+    """
+    Audit record of a batch fee or discount change and the student balances it moved.
+
+    Written by ``application.fees`` in the same transaction as the change.
+    """
+    batch_fee_management = models.ForeignKey(BatchFeeManagement, on_delete=models.CASCADE, related_name='fee_changes')
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    changed_at = models.DateTimeField(auto_now_add=True)
+    old_fees = MoneyField()
+    new_fees = MoneyField()
+    old_discount = MoneyField()
+    new_discount = MoneyField()
+    students_updated = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Fee change for {self.batch_fee_management_id} at {self.changed_at}"
+
+
 class InstallmentTemplate(models.Model):
     batch_fee_management = models.ForeignKey(BatchFeeManagement, on_delete=models.CASCADE, related_name='installment_templates')
-    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    amount = MoneyField()
     repayment_period_days = models.PositiveIntegerField()
 
     def __str__(self):
         return f"Installment Template: ${self.amount} every {self.repayment_period_days} days"
 
 
+class DailyBatchSnapshot(models.Model):
+    """
+    End-of-day fee figures for one batch, written by ``application.rollups``.
+
+    Franchise trends are sums of these rows, so trend charts never scan
+    installments or payments.
+    """
+    date = models.DateField()
+    franchise = models.ForeignKey(Franchise, on_delete=models.CASCADE, related_name='+')
+    batch = models.ForeignKey(Batch, on_delete=models.CASCADE, related_name='daily_snapshots')
+    students = models.PositiveIntegerField(default=0)
+    collected = MoneyField(default=0)
+    outstanding = MoneyField(default=0)
+    overdue = MoneyField(default=0)
+    # Backfilled from today's installments and fee records rather than recorded on the day.
+    approximate = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['batch', 'date'], name='unique_daily_batch_snapshot'),
+        ]
+        indexes = [
+            models.Index(fields=['franchise', 'date'], name='snapshot_franchise_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Snapshot for {self.batch_id} on {self.date}"
+
+
+class StudentSearchEntry(models.Model):
+    """
+    Normalized copy of a franchise student's searchable fields.
+
+    Values are lower-cased (phone numbers reduced to digits) so lookups can use
+    plain ``startswith`` against the column indexes. Rows are kept in sync by
+    ``application.signals`` and rebuilt with ``rebuild_student_search``.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    franchise = models.ForeignKey(Franchise, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    batch = models.ForeignKey(Batch, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    display_name = models.CharField(max_length=255, blank=True)
+    username = models.CharField(max_length=150, db_index=True)
+    full_name = models.CharField(max_length=255, db_index=True, blank=True)
+    last_name = models.CharField(max_length=150, db_index=True, blank=True)
+    email = models.CharField(max_length=254, db_index=True, blank=True)
+    phone = models.CharField(max_length=20, db_index=True, blank=True)
+
+    def __str__(self):
+        return f"Search entry for {self.username}"
+
+
+def new_idempotency_key():
+    return uuid.uuid4().hex
+
+
 class Payment(models.Model):
-    installment = models.OneToOneField(Installment, on_delete=models.CASCADE, related_name='payment')
+    """
+    Append-only ledger of money received against an installment.
+
+    Rows are never updated; corrections are recorded as new rows with a
+    negative amount. Installment and student totals are maintained from these
+    inserts by ``application.payments``.
+    """
+    METHOD_CHOICES = [
+        ('cash', 'Cash'),
+        ('upi', 'UPI'),
+        ('card', 'Card'),
+        ('bank_transfer', 'Bank Transfer'),
+        ('cheque', 'Cheque'),
+        ('adjustment', 'Adjustment'),
+    ]
+    installment = models.ForeignKey(Installment, on_delete=models.PROTECT, related_name='payments')
+    payment_date = models.DateField()
+    amount = MoneyField()
+    method = models.CharField(max_length=20, choices=METHOD_CHOICES, default='cash')
+    idempotency_key = models.CharField(max_length=64, unique=True, default=new_idempotency_key)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Payments are append-only; record a reversing payment instead.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"Payment for Installment {self.installment_id}"
+
+
+class ArchivedStudentFeeManagement(models.Model):
+    """
+    ``StudentFeeManagement`` row of a settled batch moved out of the hot tables.
+
+    Archive rows keep their original primary keys so ``application.archive``
+    can restore them unchanged.
+    """
+    id = models.IntegerField(primary_key=True)
+    user_franchise = models.OneToOneField(
+        UserFranchise, on_delete=models.CASCADE, related_name='archived_fee_management'
+    )
+    batch_fee_management = models.ForeignKey(
+        BatchFeeManagement, on_delete=models.CASCADE, related_name='archived_student_fees'
+    )
+    remaining_amount = MoneyField(default=0)
+    version = models.PositiveIntegerField(default=0)
+    registration_date = models.DateField(blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived Fee Management for {self.user_franchise.user.username}"
+
+
+class ArchivedInstallment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    student_fee_management = models.ForeignKey(
+        ArchivedStudentFeeManagement, on_delete=models.CASCADE, related_name='installments'
+    )
+    due_date = models.DateField()
+    amount = MoneyField()
+    payed_amount = MoneyField(default=0)
+    status = models.CharField(max_length=10, choices=Installment.STATUS_CHOICES, default='pending')
+    payment_date = models.DateField(blank=True, null=True)
+    repayment_period_days = models.PositiveIntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Archived Installment {self.id} - {self.status}"
+
+
+class ArchivedInstallmentTemplate(models.Model):
+    id = models.IntegerField(primary_key=True)
+    batch_fee_management = models.ForeignKey(
+        BatchFeeManagement, on_delete=models.CASCADE, related_name='archived_installment_templates'
+    )
+    amount = MoneyField()
+    repayment_period_days = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"Archived Installment Template: ${self.amount} every {self.repayment_period_days} days"
+
+
+class ArchivedPayment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    installment = models.ForeignKey(ArchivedInstallment, on_delete=models.CASCADE, related_name='payments')
     payment_date = models.DateField()
-    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    amount = MoneyField()
+    method = models.CharField(max_length=20, choices=Payment.METHOD_CHOICES, default='cash')
+    idempotency_key = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Archived Payment for Installment {self.installment_id}"
+
+
+class OutboxEvent(models.Model):
+    """
+    Integration event written in the same transaction as the change it describes.
+
+    ``application.outbox`` delivers undelivered rows to the configured sinks in
+    id order and then stamps ``delivered_at``. ``delivered_to`` names the sinks
+    that already accepted the event, so a retry only goes to the others; an
+    event still rejected after the last attempt gets ``failed_at`` and is no
+    longer retried until that is cleared.
+    """
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+    delivered_to = models.JSONField(default=list, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    failed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['delivered_at', 'id'], name='outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} event {self.id}"
+
+
+class WebhookEndpoint(models.Model):
+    """
+    External receiver of outbox events, such as an ERP or SMS vendor.
+
+    ``event_types`` lists the event types sent to the endpoint; an empty list
+    subscribes it to every type. Events waiting for it are its ``deliveries``;
+    ``claimed_until`` is set while a dispatcher is sending one of its batches.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    url = models.URLField()
+    event_types = models.JSONField(default=list, blank=True)
+    secret = models.CharField(max_length=100, blank=True, help_text="Signs each payload with HMAC-SHA256 when set.")
+    is_active = models.BooleanField(default=True)
+    batch_size = models.PositiveIntegerField(default=50)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    timeout = models.PositiveSmallIntegerField(default=10, help_text="Seconds")
+    claimed_until = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class WebhookDelivery(models.Model):
+    """
+    Outbox event waiting to be sent to one endpoint.
+
+    ``application.outbox`` inserts a row per subscribed endpoint when it first
+    claims an event, and ``application.webhooks`` deletes it once the event is
+    delivered or dead-lettered.
+    """
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='deliveries')
+    event = models.ForeignKey(OutboxEvent, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['endpoint', 'event'], name='unique_webhook_delivery'),
+        ]
+
+    def __str__(self):
+        return f"Event {self.event_id} for {self.endpoint_id}"
+
+
+class WebhookDeadLetter(models.Model):
+    """
+    Batch of events an endpoint still rejected after ``max_attempts`` deliveries.
+    """
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='dead_letters')
+    events = models.JSONField(encoder=DjangoJSONEncoder)
+    attempts = models.PositiveSmallIntegerField()
+    error = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    redelivered_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Dead letter {self.id} for {self.endpoint}"
+
+
+class AuditEntry(models.Model):
+    """
+    Field-level diff of one change to an installment, a student's fee record or a batch's fee setup.
+
+    ``changes`` maps each changed field to ``[old, new]``. Rows are only ever
+    inserted, by ``application.audit``, and outlive the records they describe,
+    so the student and batch references carry no database constraint.
+    """
+    ACTION_CHOICES = [
+        ('create', 'Create'),
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+    ]
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    batch = models.ForeignKey(
+        Batch, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='audit_entries',
+    )
+    student = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, null=True, blank=True,
+        related_name='+',
+    )
+    model = models.CharField(max_length=30)
+    object_id = models.PositiveIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default='update')
+    changes = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'created_at'], name='audit_student_idx'),
+            models.Index(fields=['batch', 'created_at'], name='audit_batch_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.action} {self.model} {self.object_id} at {self.created_at}"
+
+
+class StudentActivity(models.Model):
+    """
+    When a franchise student last logged in, kept by ``application.activity``.
+
+    ``franchise`` is copied from the student's ``UserFranchise`` so inactivity
+    reports scan the ``(franchise, last_seen)`` index instead of ``auth_user``.
+    ``last_seen`` is written at most once an hour per student and is empty
+    until the first login.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='activity')
+    franchise = models.ForeignKey(Franchise, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    last_seen = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['franchise', 'last_seen'], name='activity_franchise_seen_idx'),
+            models.Index(fields=['last_seen'], name='activity_last_seen_idx'),
+        ]
+
+    def __str__(self):
+        return f"Activity of {self.user_id}: {self.last_seen}"
+
+
+class JobLease(models.Model):
+    """
+    A named lease letting one worker at a time run a scheduled job, kept by ``application.leases``.
+
+    ``token`` grows by one on every acquisition and serves as a fencing token:
+    a holder whose lease expired can tell from it that someone else has run
+    since.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    owner = models.CharField(max_length=200, blank=True)
+    token = models.PositiveBigIntegerField(default=0)
+    acquired_at = models.DateTimeField(blank=True, null=True)
+    expires_at = models.DateTimeField()
 
     def __str__(self):
-        return f"Payment for Installment {self.installment.id}"
+        return f"Lease {self.name} held by {self.owner or 'nobody'} until {self.expires_at}"
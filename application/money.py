@@ -0,0 +1,91 @@
+"""
+Money stored as integer paise.
+
+``MoneyField`` columns hold whole paise in a ``BIGINT``, so sums and
+differences in the database are integer arithmetic with no rounding. In
+Python the values come back as ``Money``, a ``Decimal`` rounded to two places,
+so templates, forms, JSON and existing ``Decimal`` arithmetic keep working
+with rupees. Vectorized code can read the raw paise with ``paise_of`` and
+work on ``int64`` arrays.
+
+Python values mixed into query expressions must be wrapped as
+``Value(amount, output_field=MoneyField())`` so they are converted to paise
+too.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django import forms
+from django.db import models
+from django.db.models import ExpressionWrapper
+
+CENT = Decimal('0.01')
+
+
+class Money(Decimal):
+    """
+    An amount in rupees, always with exactly two decimal places.
+    """
+
+    def __new__(cls, value='0'):
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value))
+        return super().__new__(cls, value.quantize(CENT, rounding=ROUND_HALF_UP))
+
+    @classmethod
+    def from_paise(cls, paise):
+        return super().__new__(cls, Decimal(int(paise)).scaleb(-2))
+
+    @property
+    def paise(self):
+        return int(self.scaleb(2))
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+
+def to_paise(value):
+    """
+    Convert rupees (``Money``, ``Decimal``, ``int``, ``str`` or ``float``) to whole paise.
+    """
+    return value.paise if isinstance(value, Money) else Money(value).paise
+
+
+class MoneyField(models.BigIntegerField):
+    """
+    Rupee amount stored as integer paise and read back as ``Money``.
+    """
+    description = "Amount in rupees, stored as integer paise"
+
+    def from_db_value(self, value, expression, connection):
+        # SUM over BIGINT comes back as a Decimal on some backends.
+        return None if value is None else Money.from_paise(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, Money):
+            return value
+        return Money(value)
+
+    def get_prep_value(self, value):
+        # Skip IntegerField's int() conversion, which would drop the paise.
+        value = models.Field.get_prep_value(self, value)
+        return None if value is None else to_paise(value)
+
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return '' if value is None else str(Money(value))
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{
+            'form_class': forms.DecimalField,
+            'max_digits': 12,
+            'decimal_places': 2,
+            **kwargs,
+        })
+
+
+def paise_of(expression):
+    """
+    Wrap a money expression so it is read as plain integer paise.
+    """
+    return ExpressionWrapper(expression, output_field=models.BigIntegerField())
@@ -0,0 +1,272 @@
+"""
+Transactional outbox for fee integration events.
+
+Code that changes installments or student fee records calls ``publish`` inside
+its own transaction, so an event exists exactly when the change it describes
+was committed and publishing costs one INSERT. The ``drain_outbox`` command
+claims undelivered events in id order, commits the claim and only then hands
+the batch to every configured sink, so no row stays locked while a sink is
+slow. Each event records the sinks that accepted it; one a sink rejects is
+retried later with a growing delay and sent only to the sinks that have not
+taken it yet, and after ``max_attempts`` it is marked failed instead of
+holding back the events behind it. Delivery is at least once and a retried
+event can arrive after newer ones; consumers should de-duplicate on the
+event ``id``. The first claim of an event also queues it, as a
+``WebhookDelivery`` row, for every webhook endpoint subscribed to its type.
+
+Sinks are configured with the ``APPLICATION_OUTBOX_SINKS`` setting, a list of
+``{'class': 'dotted.path', **kwargs}`` dicts, and default to ``LogSink``. An
+optional ``'name'`` key, by default the class path, identifies the sink in
+``delivered_to`` and must differ between sinks of the same class.
+"""
+
+import json
+import logging
+import os
+from datetime import timedelta
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Installment, OutboxEvent, Payment, WebhookDelivery, WebhookEndpoint
+
+log = logging.getLogger(__name__)
+
+PAYMENT_RECORDED = 'payment.recorded'
+INSTALLMENT_PAID = 'installment.paid'
+INSTALLMENT_OVERDUE = 'installment.overdue'
+STUDENT_UNENROLLED = 'student.unenrolled'
+BATCH_FEES_CHANGED = 'batch.fees_changed'
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 10
+DEFAULT_SINKS = [{'class': 'application.outbox.LogSink'}]
+# Seconds a claimed batch is hidden from other drains, in case this one dies while sending.
+CLAIM_SECONDS = 300
+RETRY_BASE_SECONDS = 30
+MAX_RETRY_SECONDS = 3600
+
+
+def publish(event_type, payload):
+    """
+    Record an event; must run inside the transaction making the change.
+    """
+    return OutboxEvent.objects.create(event_type=event_type, payload=payload)
+
+
+def publish_installment_events(event_type, installment_ids):
+    """
+    Record one ``event_type`` event per installment, describing its current state.
+    """
+    rows = (
+        Installment.objects.filter(pk__in=installment_ids)
+        .order_by('pk')
+        .values(
+            'due_date', 'amount', 'payed_amount', 'status', 'payment_date',
+            installment_id=F('id'),
+            student_fee_id=F('student_fee_management_id'),
+            user_id=F('student_fee_management__user_franchise__user_id'),
+            batch_id=F('student_fee_management__batch_fee_management__batch_id'),
+        )
+    )
+    return OutboxEvent.objects.bulk_create([OutboxEvent(event_type=event_type, payload=row) for row in rows])
+
+
+def publish_payment_events(payments):
+    """
+    Record one ``payment.recorded`` event per ledger row in ``payments``.
+    """
+    rows = (
+        Payment.objects.filter(idempotency_key__in=[payment.idempotency_key for payment in payments])
+        .order_by('pk')
+        .values(
+            'installment_id', 'amount', 'payment_date', 'method', 'idempotency_key',
+            payment_id=F('id'),
+            user_id=F('installment__student_fee_management__user_franchise__user_id'),
+            batch_id=F('installment__student_fee_management__batch_fee_management__batch_id'),
+        )
+    )
+    return OutboxEvent.objects.bulk_create([OutboxEvent(event_type=PAYMENT_RECORDED, payload=row) for row in rows])
+
+
+def serialize(event):
+    return {
+        'id': event.id,
+        'type': event.event_type,
+        'created_at': event.created_at.isoformat(),
+        'payload': event.payload,
+    }
+
+
+class LogSink:
+    """
+    Write each event to the application log.
+    """
+
+    def __init__(self, logger_name=__name__):
+        self.logger = logging.getLogger(logger_name)
+
+    def send(self, events):
+        for event in events:
+            self.logger.info("Outbox event %s %s: %s", event['id'], event['type'], json.dumps(event['payload']))
+
+
+class FileSink:
+    """
+    Append events as JSON lines to ``path``, synced to disk before the batch is marked delivered.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, events):
+        with open(self.path, 'a', encoding='utf-8') as handle:
+            for event in events:
+                handle.write(json.dumps(event, cls=DjangoJSONEncoder) + '\n')
+            handle.flush()
+            os.fsync(handle.fileno())
+
+
+class HttpSink:
+    """
+    POST each batch as ``{"events": [...]}`` to ``url``; any non-2xx response fails the batch.
+    """
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, events):
+        body = json.dumps({'events': events}, cls=DjangoJSONEncoder).encode('utf-8')
+        request = Request(self.url, data=body, headers={'Content-Type': 'application/json'}, method='POST')
+        with urlopen(request, timeout=self.timeout):  # raises HTTPError on 4xx and 5xx
+            pass
+
+
+def load_sinks():
+    sinks = []
+    for config in getattr(settings, 'APPLICATION_OUTBOX_SINKS', DEFAULT_SINKS):
+        options = dict(config)
+        path = options.pop('class')
+        name = options.pop('name', path)
+        sink = import_string(path)(**options)
+        sink.name = name
+        sinks.append(sink)
+    return sinks
+
+
+def sink_name(sink):
+    return getattr(sink, 'name', None) or f'{type(sink).__module__}.{type(sink).__qualname__}'
+
+
+def retry_delay(attempts):
+    """
+    Seconds to wait before retrying an event that has failed ``attempts`` times.
+    """
+    return min(MAX_RETRY_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def queue_webhooks(events):
+    """
+    Queue ``events`` for the webhook endpoints subscribed to their types.
+    """
+    endpoints = list(WebhookEndpoint.objects.values_list('pk', 'event_types'))
+    WebhookDelivery.objects.bulk_create(
+        [
+            WebhookDelivery(endpoint_id=endpoint_id, event_id=event.pk)
+            for event in events
+            for endpoint_id, event_types in endpoints
+            if not event_types or event.event_type in event_types
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def claim(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """
+    Return the next due events in id order, hidden from other drains for ``CLAIM_SECONDS``.
+
+    Webhook deliveries are queued in the same transaction, so only events
+    that have committed are queued and none is missed.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(delivered_at__isnull=True, failed_at__isnull=True)
+            .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+            .order_by('id')[:batch_size]
+        )
+        OutboxEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+            next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS)
+        )
+        queue_webhooks([event for event in events if not event.attempts])
+    return events
+
+
+def send(sink, events):
+    """
+    Send ``events`` to ``sink``; return ``{event id: error}`` for the events it rejected.
+
+    A failed batch is sent again one event at a time, so one bad event does
+    not fail the others.
+    """
+    try:
+        sink.send([serialize(event) for event in events])
+    except Exception as exc:  # pylint: disable=broad-except
+        if len(events) == 1:
+            return {events[0].pk: f"{type(exc).__name__}: {exc}"}
+        errors = {}
+        for event in events:
+            errors.update(send(sink, [event]))
+        return errors
+    return {}
+
+
+def drain(sinks=None, batch_size=DEFAULT_BATCH_SIZE, max_batches=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Deliver due events in id order; return the number delivered.
+
+    Sinks are called after the batch's claim has committed, and each event's
+    outcome is recorded on its own row.
+    """
+    sinks = load_sinks() if sinks is None else sinks
+    delivered = batches = 0
+    while max_batches is None or batches < max_batches:
+        events = claim(batch_size)
+        if not events:
+            break
+        errors = {}
+        for sink in sinks:
+            name = sink_name(sink)
+            pending = [event for event in events if name not in event.delivered_to]
+            failed = send(sink, pending) if pending else {}
+            for event in pending:
+                if event.pk in failed:
+                    errors.setdefault(event.pk, []).append(f"{name}: {failed[event.pk]}")
+                else:
+                    event.delivered_to.append(name)
+
+        finished = timezone.now()
+        for event in events:
+            if event.pk not in errors:
+                event.delivered_at = finished
+                delivered += 1
+                continue
+            event.attempts += 1
+            event.last_error = '\n'.join(errors[event.pk])
+            if event.attempts >= max_attempts:
+                event.failed_at = finished
+                log.error("Outbox event %s failed after %s attempts: %s", event.pk, event.attempts, event.last_error)
+            else:
+                event.next_attempt_at = finished + timedelta(seconds=retry_delay(event.attempts))
+        OutboxEvent.objects.bulk_update(
+            events, ['delivered_at', 'delivered_to', 'attempts', 'next_attempt_at', 'last_error', 'failed_at'],
+        )
+        batches += 1
+    return delivered
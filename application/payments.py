@@ -0,0 +1,194 @@
+"""
+Payment posting for installments and student fee balances.
+
+Every payment is an insert into the ``Payment`` ledger. Installment and student
+totals are then moved by the payment amount with single ``UPDATE ... SET x = x + n``
+statements, so posting never reads-modifies-writes a hot row and concurrent
+cashiers cannot overwrite each other.
+"""
+
+from collections import defaultdict
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DateField, F, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import outbox
+from .concurrency import retry_on_conflict
+from .models import Installment, Payment, StudentFeeManagement
+from .money import Money, MoneyField
+
+
+def _check_installments(installment_ids):
+    """
+    Raise ``ValueError`` naming any of ``installment_ids`` that do not exist.
+
+    Checked before the ledger insert because SQLite defers the foreign key check
+    to the end of the transaction.
+    """
+    installment_ids = set(installment_ids)
+    missing = installment_ids - set(Installment.objects.filter(pk__in=installment_ids).values_list('pk', flat=True))
+    if missing:
+        raise ValueError(f"Unknown installment ids: {', '.join(map(str, sorted(missing)))}")
+
+
+def _apply_to_totals(installment_amounts, payment_date):
+    """
+    Move installment and student totals by the given per-installment amounts.
+
+    ``status`` and ``payment_date`` are assigned before ``payed_amount`` so they
+    are computed from the old value on every backend, including MySQL, which
+    evaluates SET assignments left to right. Installments settled by these
+    amounts get an ``installment.paid`` outbox event. A reversal that leaves a
+    fully paid installment short reopens it as pending or overdue; installments
+    a cashier marked paid for less than their amount stay paid.
+    """
+    today = timezone.now().date()
+    student_ids, open_ids = {}, []
+    for pk, student_fee_id, status in Installment.objects.filter(pk__in=installment_amounts).values_list(
+        'pk', 'student_fee_management_id', 'status'
+    ):
+        student_ids[pk] = student_fee_id
+        if status != 'paid':
+            open_ids.append(pk)
+    student_amounts = defaultdict(Money)
+    for installment_id, amount in installment_amounts.items():
+        paise = Value(amount, output_field=MoneyField())
+        settled = Q(payed_amount__gte=F('amount') - paise)
+        reopened = Q(status='paid', payed_amount__gte=F('amount')) & ~settled
+        Installment.objects.filter(pk=installment_id).update(
+            status=Case(
+                When(settled, then=Value('paid')),
+                When(reopened & Q(due_date__lt=today), then=Value('overdue')),
+                When(reopened, then=Value('pending')),
+                default=F('status'),
+            ),
+            payment_date=Case(
+                When(settled, then=Coalesce(F('payment_date'), Value(payment_date))),
+                When(reopened, then=Value(None, output_field=DateField())),
+                default=F('payment_date'),
+            ),
+            payed_amount=F('payed_amount') + paise,
+            version=F('version') + 1,
+        )
+        student_amounts[student_ids[installment_id]] += amount
+    for student_fee_id, amount in student_amounts.items():
+        StudentFeeManagement.objects.filter(pk=student_fee_id).update(
+            remaining_amount=F('remaining_amount') - Value(amount, output_field=MoneyField()),
+            version=F('version') + 1,
+        )
+    settled_ids = Installment.objects.filter(pk__in=open_ids, status='paid').values_list('pk', flat=True)
+    outbox.publish_installment_events(outbox.INSTALLMENT_PAID, list(settled_ids))
+
+
+def record_payment(installment_id, amount, payment_date=None, method='cash', idempotency_key=None):
+    """
+    Insert a ledger row and apply it to the installment and student totals.
+
+    Must run inside the caller's transaction. Posting the same
+    ``idempotency_key`` twice returns the original payment and changes nothing.
+    """
+    _check_installments([installment_id])
+    payment_date = payment_date or timezone.now().date()
+    payment = Payment(
+        installment_id=installment_id,
+        amount=Money(amount),
+        payment_date=payment_date,
+        method=method,
+    )
+    if idempotency_key:
+        payment.idempotency_key = idempotency_key
+    try:
+        with transaction.atomic():
+            payment.save()
+    except IntegrityError:
+        if not idempotency_key:
+            raise
+        return Payment.objects.get(idempotency_key=idempotency_key)
+    _apply_to_totals({installment_id: payment.amount}, payment_date)
+    outbox.publish_payment_events([payment])
+    return payment
+
+
+@retry_on_conflict
+def post_payment(installment_id, amount, payment_date=None, method='cash', idempotency_key=None):
+    """
+    Record a single payment in its own transaction, retrying on lock conflicts.
+    """
+    with transaction.atomic():
+        return record_payment(installment_id, amount, payment_date, method, idempotency_key)
+
+
+def post_payments(receipts):
+    """
+    Post a batch of receipts, such as a day's import, in one transaction.
+
+    ``receipts`` is an iterable of dicts with ``installment_id``, ``amount`` and
+    optionally ``payment_date``, ``method`` and ``idempotency_key``. Receipts
+    whose key is already in the ledger (or repeated within the batch) are
+    skipped. Ledger rows are written with one ``bulk_create`` and totals are
+    moved with one UPDATE per touched installment and student. Returns the
+    created payments. If another import inserts the same key concurrently the
+    batch fails with ``IntegrityError``; re-running it is safe. Receipts for
+    unknown installments fail the whole batch with ``ValueError``.
+    """
+    return _post_payments(list(receipts))
+
+
+def parse_receipt(receipt, today=None):
+    """
+    Return a receipt's ``(installment_id, amount, payment_date, method)``, parsing string values.
+
+    Raises ``ValueError`` for a bad installment id or date and
+    ``decimal.InvalidOperation`` for a bad amount.
+    """
+    payment_date = receipt.get('payment_date') or today or timezone.now().date()
+    if isinstance(payment_date, str):
+        payment_date = date.fromisoformat(payment_date.strip())
+    return (
+        int(receipt['installment_id']),
+        Money(receipt['amount']),
+        payment_date,
+        receipt.get('method') or 'cash',
+    )
+
+
+@retry_on_conflict
+def _post_payments(receipts):
+    today = timezone.now().date()
+    payments = []
+    seen_keys = set()
+    for receipt in receipts:
+        key = receipt.get('idempotency_key')
+        if key:
+            if key in seen_keys:
+                continue
+            seen_keys.add(key)
+        installment_id, amount, payment_date, method = parse_receipt(receipt, today)
+        payment = Payment(
+            installment_id=installment_id,
+            amount=amount,
+            payment_date=payment_date,
+            method=method,
+        )
+        if key:
+            payment.idempotency_key = key
+        payments.append(payment)
+
+    _check_installments(payment.installment_id for payment in payments)
+    with transaction.atomic():
+        existing_keys = set(
+            Payment.objects.filter(idempotency_key__in=seen_keys).values_list('idempotency_key', flat=True)
+        )
+        payments = [payment for payment in payments if payment.idempotency_key not in existing_keys]
+        Payment.objects.bulk_create(payments)
+
+        by_date = defaultdict(lambda: defaultdict(Money))
+        for payment in payments:
+            by_date[payment.payment_date][payment.installment_id] += payment.amount
+        for payment_date, installment_amounts in sorted(by_date.items()):
+            _apply_to_totals(installment_amounts, payment_date)
+        outbox.publish_payment_events(payments)
+    return payments
@@ -0,0 +1,164 @@
+"""
+Filtered, keyset-paginated installment lists for the fee reminders page.
+
+Pages are addressed by a cursor holding the sort value and id of the last row
+shown, so fetching any page is one fixed-size query on the (sort column, id)
+index instead of an OFFSET scan over every overdue installment.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import outbox, rows
+from .models import Installment
+
+PAGE_SIZE = 50
+OVERDUE_CHUNK_SIZE = 500
+DEFAULT_UPCOMING_DAYS = 3
+MAX_UPCOMING_DAYS = 90
+
+BATCH_PATH = 'student_fee_management__user_franchise__batch'
+
+SORT_FIELDS = {
+    'due_date': date.fromisoformat,
+    'amount': Decimal,
+}
+
+
+class InvalidReminderQuery(ValueError):
+    """
+    Raised when a filter, sort or cursor parameter cannot be parsed.
+    """
+
+
+def _parse(params, key, parser):
+    value = params.get(key)
+    if value in (None, ''):
+        return None
+    try:
+        return parser(value)
+    except (ValueError, InvalidOperation) as exc:
+        raise InvalidReminderQuery(f"Invalid value for {key}: {value}") from exc
+
+
+def parse_sort(value):
+    """
+    Return ``(field, descending)`` for a sort parameter such as ``-amount``.
+    """
+    value = value or 'due_date'
+    field = value.lstrip('-')
+    if field not in SORT_FIELDS:
+        raise InvalidReminderQuery(f"Cannot sort by {value}")
+    return field, value.startswith('-')
+
+
+def encode_cursor(installment, field):
+    return f"{getattr(installment, field)}_{installment.pk}"
+
+
+def decode_cursor(cursor, field):
+    value, _, pk = (cursor or '').rpartition('_')
+    try:
+        return SORT_FIELDS[field](value), int(pk)
+    except (ValueError, InvalidOperation) as exc:
+        raise InvalidReminderQuery(f"Invalid cursor: {cursor}") from exc
+
+
+def reminder_queryset(params, kind='overdue', today=None):
+    """
+    Return the unpaid installments of ``kind`` (``overdue`` or ``upcoming``) matching ``params``.
+
+    Supported filters are ``franchise``, ``batch``, ``course``, ``min_amount``,
+    ``max_amount``, ``min_days_overdue``, ``max_days_overdue`` and, for
+    upcoming installments, ``upcoming_days``.
+    """
+    today = today or timezone.now().date()
+    installments = Installment.objects.exclude(status='paid')
+    if kind == 'upcoming':
+        upcoming_days = _parse(params, 'upcoming_days', int)
+        upcoming_days = DEFAULT_UPCOMING_DAYS if upcoming_days is None else upcoming_days
+        upcoming_days = max(0, min(upcoming_days, MAX_UPCOMING_DAYS))
+        installments = installments.filter(due_date__gte=today, due_date__lte=today + timedelta(days=upcoming_days))
+    else:
+        installments = installments.filter(due_date__lt=today)
+        min_days = _parse(params, 'min_days_overdue', int)
+        max_days = _parse(params, 'max_days_overdue', int)
+        if min_days is not None:
+            installments = installments.filter(due_date__lte=today - timedelta(days=min_days))
+        if max_days is not None:
+            installments = installments.filter(due_date__gte=today - timedelta(days=max_days))
+
+    franchise_id = _parse(params, 'franchise', int)
+    batch_id = _parse(params, 'batch', int)
+    course_id = params.get('course')
+    min_amount = _parse(params, 'min_amount', Decimal)
+    max_amount = _parse(params, 'max_amount', Decimal)
+    if franchise_id is not None:
+        installments = installments.filter(**{f'{BATCH_PATH}__franchise_id': franchise_id})
+    if batch_id is not None:
+        installments = installments.filter(**{f'{BATCH_PATH}_id': batch_id})
+    if course_id:
+        installments = installments.filter(**{f'{BATCH_PATH}__course_id': course_id})
+    if min_amount is not None:
+        installments = installments.filter(amount__gte=min_amount)
+    if max_amount is not None:
+        installments = installments.filter(amount__lte=max_amount)
+    return installments
+
+
+def reminder_page(params, kind='overdue', page_size=PAGE_SIZE, today=None):
+    """
+    Return ``(rows, next_cursor)`` for one page of reminders as ``ReminderRow`` objects.
+
+    ``params`` may hold ``sort`` (``due_date``, ``amount``, optionally prefixed
+    with ``-``) and ``cursor`` from a previous page, plus the filters accepted
+    by ``reminder_queryset``. ``next_cursor`` is ``None`` on the last page.
+    """
+    field, descending = parse_sort(params.get('sort'))
+    installments = reminder_queryset(params, kind, today)
+
+    cursor = params.get('cursor')
+    if cursor:
+        value, pk = decode_cursor(cursor, field)
+        lookup = 'lt' if descending else 'gt'
+        installments = installments.filter(
+            Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'pk__{lookup}': pk})
+        )
+
+    ordering = [f'-{field}', '-pk'] if descending else [field, 'pk']
+    page = rows.build(
+        rows.ReminderRow, installments.order_by(*ordering)[:page_size + 1], *rows.ReminderRow.columns(BATCH_PATH)
+    )
+    next_cursor = encode_cursor(page[page_size - 1], field) if len(page) > page_size else None
+    return page[:page_size], next_cursor
+
+
+def mark_overdue(today=None, chunk_size=OVERDUE_CHUNK_SIZE, verify=None):
+    """
+    Move pending installments past their due date to ``overdue``; return how many moved.
+
+    Each chunk is locked, updated and given ``installment.overdue`` outbox
+    events in one transaction, which calls ``verify`` last, if given, so it
+    can abort the chunk by raising.
+    """
+    today = today or timezone.now().date()
+    marked = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                Installment.objects.select_for_update()
+                .filter(status='pending', due_date__lt=today)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not ids:
+                return marked
+            Installment.objects.filter(pk__in=ids).update(status='overdue', version=F('version') + 1)
+            outbox.publish_installment_events(outbox.INSTALLMENT_OVERDUE, ids)
+            if verify:
+                verify()
+        marked += len(ids)
@@ -0,0 +1,145 @@
+"""
+Aggregate fee reports computed in the database.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Case, Count, ExpressionWrapper, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ArchivedInstallment, Batch, Installment, UserFranchise
+from .money import MoneyField
+
+BATCH_PATH = 'student_fee_management__batch_fee_management__batch'
+USER_PATH = 'student_fee_management__user_franchise__user'
+
+AGING_BUCKETS = [
+    ('0-30', 0, 30),
+    ('31-60', 31, 60),
+    ('61-90', 61, 90),
+    ('90+', 91, None),
+]
+
+AGING_LEVELS = {
+    'franchise': {
+        'key': f'{BATCH_PATH}__franchise_id',
+        'label': f'{BATCH_PATH}__franchise__name',
+    },
+    'batch': {
+        'key': f'{BATCH_PATH}_id',
+        'label': f'{BATCH_PATH}__batch_no',
+    },
+    'student': {
+        'key': f'{USER_PATH}_id',
+        'label': f'{USER_PATH}__username',
+    },
+}
+
+MONEY = MoneyField()
+
+
+def outstanding():
+    return ExpressionWrapper(F('amount') - F('payed_amount'), output_field=MONEY)
+
+
+def bucket_field(name):
+    return 'aged_' + name.replace('-', '_').replace('+', '_plus')
+
+
+def aging_report(level='franchise', franchise_id=None, batch_id=None, today=None):
+    """
+    Return outstanding overdue balances per row of ``level`` split into aging buckets.
+
+    All buckets come from one grouped query using conditional sums over
+    ``amount - payed_amount``; a bucket holds installments whose due date is
+    that many days in the past.
+    """
+    today = today or timezone.now().date()
+    group = AGING_LEVELS[level]
+    installments = Installment.objects.filter(due_date__lt=today).exclude(status='paid')
+    if franchise_id is not None:
+        installments = installments.filter(**{f'{BATCH_PATH}__franchise_id': franchise_id})
+    if batch_id is not None:
+        installments = installments.filter(**{f'{BATCH_PATH}_id': batch_id})
+
+    buckets = {}
+    for name, min_days, max_days in AGING_BUCKETS:
+        condition = {'due_date__lte': today - timedelta(days=min_days)}
+        if max_days is not None:
+            condition['due_date__gte'] = today - timedelta(days=max_days)
+        buckets[bucket_field(name)] = Sum(
+            Case(When(then=outstanding(), **condition), default=Value(0), output_field=MONEY)
+        )
+
+    # Students belong to exactly one batch, so carrying the batch and franchise
+    # along for drill-down links does not split any group.
+    columns = {
+        'key': F(group['key']),
+        'label': F(group['label']),
+        'franchise_pk': F(f'{BATCH_PATH}__franchise_id'),
+    }
+    if level == 'student':
+        columns['batch_pk'] = F(f'{BATCH_PATH}_id')
+    rows = (
+        installments
+        .values(**columns)
+        .annotate(total=Sum(outstanding()), **buckets)
+        .order_by('-total')
+    )
+    return list(rows)
+
+
+def batch_fee_summaries(franchise_id, today=None):
+    """
+    Return the franchise's batches annotated with their fee collection status.
+
+    Everything comes from one grouped query: sums run over the batch's
+    installments, and the student count and the amount collected on archived
+    installments are correlated subqueries so that they do not multiply those
+    rows. Archived installments are all paid, so they add nothing outstanding.
+    """
+    today = today or timezone.now().date()
+    installments = 'fee_management__studentfeemanagement__installments'
+    archived_batch = 'student_fee_management__batch_fee_management__batch'
+    archived_collected = (
+        ArchivedInstallment.objects.filter(**{archived_batch: OuterRef('pk')})
+        .order_by()
+        .values(archived_batch)
+        .annotate(total=Sum('payed_amount'))
+        .values('total')
+    )
+    student_count = (
+        UserFranchise.objects.filter(batch=OuterRef('pk'))
+        .order_by()
+        .values('batch')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return (
+        Batch.objects.filter(franchise_id=franchise_id)
+        .select_related('course', 'fee_management')
+        .annotate(
+            student_count=Coalesce(Subquery(student_count, output_field=IntegerField()), 0),
+            total_collected=ExpressionWrapper(
+                Coalesce(Sum(f'{installments}__payed_amount'), Value(0), output_field=MONEY)
+                + Coalesce(Subquery(archived_collected, output_field=MONEY), Value(0), output_field=MONEY),
+                output_field=MONEY,
+            ),
+            total_outstanding=Coalesce(
+                Sum(
+                    ExpressionWrapper(
+                        F(f'{installments}__amount') - F(f'{installments}__payed_amount'), output_field=MONEY
+                    ),
+                    filter=~Q(**{f'{installments}__status': 'paid'}),
+                ),
+                Value(0),
+                output_field=MONEY,
+            ),
+            overdue_count=Count(
+                f'{installments}__id',
+                filter=Q(**{f'{installments}__due_date__lt': today}) & ~Q(**{f'{installments}__status': 'paid'}),
+            ),
+        )
+        .order_by('batch_no')
+    )
@@ -0,0 +1,183 @@
+"""
+Daily fee snapshots per batch for historical trend charts.
+
+For each day and batch a snapshot records the money collected that day, the
+balance still outstanding at the end of the day and the part of it that was
+already overdue. History is processed in date chunks: each chunk costs a fixed
+number of grouped queries no matter how many days it covers, and running
+totals are carried from one chunk to the next instead of being re-scanned.
+
+Collections are read from the ``Payment`` ledger alone. Amounts paid before
+the ledger existed are in it too, as the opening ``adjustment`` payments
+written by migration 0028, so backfilled history starts from real balances.
+Installments and payments of archived batches are read from the archive
+tables as well, so their history does not change when they are archived.
+
+Overdue balances assume payments settle installments in due-date order, which
+``student_fee_management`` enforces. Students, and the installments billed to
+them, count from their ``registration_date``, or from the first day when it is
+unknown. Installment amounts and fee records as they are today are all that is
+stored, so edits, deletions and fee changes made since a day are not undone:
+snapshots written for days before yesterday are marked ``approximate``.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import (
+    ArchivedInstallment,
+    ArchivedPayment,
+    ArchivedStudentFeeManagement,
+    Batch,
+    DailyBatchSnapshot,
+    Installment,
+    Payment,
+    StudentFeeManagement,
+)
+
+DEFAULT_CHUNK_DAYS = 31
+
+INSTALLMENT_BATCH = 'student_fee_management__batch_fee_management__batch_id'
+PAYMENT_BATCH = f'installment__{INSTALLMENT_BATCH}'
+STUDENT_BATCH = 'batch_fee_management__batch_id'
+
+
+def _installments(**filters):
+    return [Installment.objects.filter(**filters), ArchivedInstallment.objects.filter(**filters)]
+
+
+def _payments(**filters):
+    return [Payment.objects.filter(**filters), ArchivedPayment.objects.filter(**filters)]
+
+
+def _student_fees():
+    return [StudentFeeManagement.objects.all(), ArchivedStudentFeeManagement.objects.all()]
+
+
+def _sum_by_batch(querysets, batch_path, amount_field):
+    # The archive tables mirror the hot ones, so both are grouped by the same path.
+    totals = defaultdict(Decimal)
+    for queryset in querysets:
+        for row in queryset.values(batch=F(batch_path)).annotate(total=Sum(amount_field)):
+            totals[row['batch']] += row['total'] or Decimal('0')
+    return totals
+
+
+def _total_by_batch_and_day(querysets, batch_path, date_field, aggregate):
+    totals = defaultdict(Decimal)
+    for queryset in querysets:
+        rows = queryset.values(batch=F(batch_path), day=F(date_field)).annotate(total=aggregate)
+        for row in rows:
+            totals[(row['batch'], row['day'])] += row['total'] or Decimal('0')
+    return totals
+
+
+def _total_as_of(totals_by_day, day):
+    # Rows without a date count from the first day.
+    totals = defaultdict(Decimal)
+    for (batch_id, row_day), total in totals_by_day.items():
+        if row_day is None or row_day <= day:
+            totals[batch_id] += total
+    return totals
+
+
+def rollup_range(start, end, chunk_days=DEFAULT_CHUNK_DAYS, verify=None):
+    """
+    Write snapshots for every batch for each day from ``start`` to ``end`` inclusive.
+
+    Existing snapshots in the range are replaced, so the job can be re-run.
+    Each chunk is written in a transaction that calls ``verify`` last, if
+    given. Returns the number of snapshot rows written.
+    """
+    batches = list(Batch.objects.values_list('pk', 'franchise_id'))
+    exact_from = timezone.now().date() - timedelta(days=1)
+    joined = _total_by_batch_and_day(_student_fees(), STUDENT_BATCH, 'registration_date', Count('pk'))
+    billed_from = _total_by_batch_and_day(
+        _installments(), INSTALLMENT_BATCH, 'student_fee_management__registration_date', Sum('amount'),
+    )
+    students = _total_as_of(joined, start)
+    billed = _total_as_of(billed_from, start)
+    # Running totals as of the end of the day before ``start``.
+    collected_to_date = _sum_by_batch(_payments(payment_date__lt=start), PAYMENT_BATCH, 'amount')
+    due_to_date = _sum_by_batch(_installments(due_date__lt=start), INSTALLMENT_BATCH, 'amount')
+
+    written = 0
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+        collected = _total_by_batch_and_day(
+            _payments(payment_date__range=(chunk_start, chunk_end)),
+            PAYMENT_BATCH, 'payment_date', Sum('amount'),
+        )
+        # An installment counts as overdue from the day after its due date.
+        falling_due = _total_by_batch_and_day(
+            _installments(due_date__range=(chunk_start - timedelta(days=1), chunk_end - timedelta(days=1))),
+            INSTALLMENT_BATCH, 'due_date', Sum('amount'),
+        )
+
+        snapshots = []
+        day = chunk_start
+        while day <= chunk_end:
+            for batch_id, franchise_id in batches:
+                collected_today = collected[(batch_id, day)]
+                collected_to_date[batch_id] += collected_today
+                if day > start:
+                    due_to_date[batch_id] += falling_due[(batch_id, day - timedelta(days=1))]
+                    students[batch_id] += joined.get((batch_id, day), 0)
+                    billed[batch_id] += billed_from.get((batch_id, day), Decimal('0'))
+                snapshots.append(DailyBatchSnapshot(
+                    date=day,
+                    franchise_id=franchise_id,
+                    batch_id=batch_id,
+                    students=int(students[batch_id]),
+                    collected=collected_today,
+                    outstanding=max(billed[batch_id] - collected_to_date[batch_id], Decimal('0')),
+                    overdue=max(due_to_date[batch_id] - collected_to_date[batch_id], Decimal('0')),
+                    approximate=day < exact_from,
+                ))
+            day += timedelta(days=1)
+
+        with transaction.atomic():
+            DailyBatchSnapshot.objects.filter(date__range=(chunk_start, chunk_end)).delete()
+            DailyBatchSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+            if verify:
+                verify()
+        written += len(snapshots)
+        chunk_start = chunk_end + timedelta(days=1)
+    return written
+
+
+def rollup_day(day=None, verify=None):
+    """
+    Write the snapshot for a single day, yesterday by default.
+    """
+    day = day or timezone.now().date() - timedelta(days=1)
+    return rollup_range(day, day, verify=verify)
+
+
+def trend(franchise_id=None, batch_id=None, since=None):
+    """
+    Return per-day totals read only from snapshots, optionally for one franchise or batch.
+
+    A day is ``approximate`` if any of its snapshots is.
+    """
+    snapshots = DailyBatchSnapshot.objects.all()
+    if franchise_id is not None:
+        snapshots = snapshots.filter(franchise_id=franchise_id)
+    if batch_id is not None:
+        snapshots = snapshots.filter(batch_id=batch_id)
+    if since is not None:
+        snapshots = snapshots.filter(date__gte=since)
+    rows = snapshots.values('date').annotate(
+        students=Sum('students'),
+        collected=Sum('collected'),
+        outstanding=Sum('outstanding'),
+        overdue=Sum('overdue'),
+        approximate_rows=Count('pk', filter=Q(approximate=True)),
+    ).order_by('date')
+    return [{**row, 'approximate': row.pop('approximate_rows') > 0} for row in rows]
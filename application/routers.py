@@ -0,0 +1,112 @@
+"""
+Read-replica routing for report and export views.
+
+Views wrapped in ``read_replica`` send their reads to the database alias named
+by the ``APPLICATION_READ_REPLICA`` setting while writes keep going to the
+primary. Only models of this app are rerouted; the host platform's models
+(users, sessions, courses) are left to its own routers. A user who has just
+written something sees their own writes: the ``ReplicaStickinessMiddleware``
+sets a short-lived cookie after every unsafe request, and while it is present
+report views read from the primary. The middleware only acts on this app's
+views, which it tells apart by their URL namespace once the view has run.
+
+Nothing is rerouted when the setting is unset or names an unknown alias.
+"""
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+DEFAULT_STICKY_SECONDS = 10
+STICKY_COOKIE = 'application_read_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+URL_NAMESPACE = 'application'
+
+# Alias reads are routed to in the current request or thread, if any.
+_read_alias = ContextVar('application_read_alias', default=None)
+
+
+def replica_alias():
+    """
+    Return the configured replica alias, or ``None`` if replica reads are disabled.
+    """
+    alias = getattr(settings, 'APPLICATION_READ_REPLICA', None)
+    return alias if alias in settings.DATABASES else None
+
+
+def sticky_seconds():
+    return getattr(settings, 'APPLICATION_REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS)
+
+
+@contextmanager
+def use_replica():
+    """
+    Route reads made inside the block to the replica, if one is configured.
+    """
+    token = _read_alias.set(replica_alias())
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def read_replica(view_func):
+    """
+    Serve a read-only view from the replica unless the user wrote something moments ago.
+    """
+    if asyncio.iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS or STICKY_COOKIE in request.COOKIES:
+                return await view_func(request, *args, **kwargs)
+            # The alias is copied into the threads that sync_to_async runs queries on.
+            with use_replica():
+                return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in SAFE_METHODS or STICKY_COOKIE in request.COOKIES:
+            return view_func(request, *args, **kwargs)
+        with use_replica():
+            return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    """
+    Send this app's reads to the replica inside ``use_replica``; defer to other routers everywhere else.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != 'application':
+            return None
+        return _read_alias.get()
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        aliases = {'default', replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pin a client's report reads to the primary for a short window after it writes to this app.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method in SAFE_METHODS or not replica_alias():
+            return response
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and URL_NAMESPACE in match.namespaces:
+            response.set_cookie(STICKY_COOKIE, '1', max_age=sticky_seconds(), httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,80 @@
+"""
+Slim rows for large report pages.
+
+Report pages only print a few columns, but model instances carry their full
+field state, a ``_state`` object and every ``select_related`` parent. Rows
+here are ``__slots__`` dataclasses filled from ``values_list`` queries with
+just the columns the templates use, so a page of thousands of installments
+costs a few tuples' worth of memory per row.
+"""
+
+from dataclasses import dataclass, field, fields
+from datetime import date
+from decimal import Decimal
+
+from .models import Installment
+
+STATUS_LABELS = dict(Installment.STATUS_CHOICES)
+
+
+def _columns(row_class, **paths):
+    """
+    Return the query paths for ``row_class``'s fields, renamed through ``paths``.
+    """
+    return [paths.get(column.name, column.name) for column in fields(row_class) if column.init]
+
+
+def _full_name(first_name, last_name):
+    return f'{first_name} {last_name}'.strip()
+
+
+@dataclass(slots=True)
+class ReminderRow:
+    """
+    One installment on the fee reminders page.
+    """
+    id: int
+    due_date: date
+    amount: Decimal
+    payed_amount: Decimal
+    status: str
+    user_id: int
+    username: str
+    first_name: str
+    last_name: str
+    batch_no: str | None
+    course_id: object
+    # Filled in by the view from the enrollment cache.
+    is_enrolled: bool = field(default=False, init=False)
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def student_name(self):
+        return _full_name(self.first_name, self.last_name) or self.username
+
+    @property
+    def status_display(self):
+        return STATUS_LABELS.get(self.status, self.status)
+
+    @classmethod
+    def columns(cls, batch_path):
+        user_path = 'student_fee_management__user_franchise__user'
+        return _columns(
+            cls,
+            user_id=f'{user_path}_id',
+            username=f'{user_path}__username',
+            first_name=f'{user_path}__first_name',
+            last_name=f'{user_path}__last_name',
+            batch_no=f'{batch_path}__batch_no',
+            course_id=f'{batch_path}__course_id',
+        )
+
+
+def build(row_class, queryset, *columns):
+    """
+    Evaluate ``queryset`` as a list of ``row_class`` rows read from ``columns``.
+    """
+    return [row_class(*values) for values in queryset.values_list(*columns)]
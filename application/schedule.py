@@ -0,0 +1,117 @@
+"""
+Installment schedules computed with NumPy.
+
+An installment falls due ``repayment_period_days`` after the previous one, the
+first counting from the student's registration date. For a batch that is one
+cumulative sum over the template periods added to a column of registration
+dates, so every student's due dates come out of a single array operation.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+import numpy as np
+from django.db.models import Count, Max, Sum
+
+from .models import Installment, InstallmentTemplate, StudentFeeManagement, UserFranchise
+
+
+def due_dates(registration_dates, periods):
+    """
+    Return a ``(students, installments)`` ``datetime64[D]`` array of due dates.
+
+    ``registration_dates`` may contain ``None`` for students without an
+    enrollment; their rows are ``NaT``.
+    """
+    registered = np.array(
+        [np.datetime64('NaT') if day is None else np.datetime64(day, 'D') for day in registration_dates],
+        dtype='datetime64[D]',
+    )
+    offsets = np.cumsum(np.asarray(periods, dtype=np.int64)).astype('timedelta64[D]')
+    return registered[:, np.newaxis] + offsets[np.newaxis, :]
+
+
+def _to_dates(row):
+    return [None if np.isnat(day) else day.item() for day in row]
+
+
+def student_schedule(registration_date, periods):
+    """
+    Return the due dates for one student as ``datetime.date`` objects.
+    """
+    return _to_dates(due_dates([registration_date], periods)[0])
+
+
+def registration_dates(batch):
+    """
+    Return ``{user_id: registration date}`` for the students of ``batch`` with a fee record.
+    """
+    return dict(
+        StudentFeeManagement.objects.filter(user_franchise__batch=batch)
+        .values_list('user_franchise__user_id', 'registration_date')
+    )
+
+
+def preview_batch(batch, fee_management, templates=None, discount=None):
+    """
+    Return what every student of ``batch`` would owe under a template or discount change.
+
+    ``templates`` is a list of ``(amount, repayment_period_days)`` pairs and
+    defaults to the batch's saved templates; ``discount`` defaults to the saved
+    discount. Nothing is written. For each student the result holds the
+    current installments alongside the proposed schedule; ``unscheduled`` is
+    the part of the batch's remaining amount the templates do not cover.
+    """
+    if templates is None:
+        templates = list(
+            InstallmentTemplate.objects.filter(batch_fee_management=fee_management)
+            .order_by('id').values_list('amount', 'repayment_period_days')
+        )
+    discount = fee_management.discount if discount is None else discount
+    batch_remaining = batch.fees - discount
+    amounts = [Decimal(amount) for amount, _ in templates]
+    scheduled_total = sum(amounts, Decimal('0'))
+
+    students = list(
+        UserFranchise.objects.filter(batch=batch).order_by('user__username').values_list('user_id', 'user__username')
+    )
+    user_ids = [user_id for user_id, _ in students]
+    registered = registration_dates(batch)
+    schedule = due_dates([registered.get(user_id) for user_id in user_ids], [period for _, period in templates])
+
+    current = defaultdict(
+        lambda: {'installments': 0, 'total': Decimal('0'), 'paid': Decimal('0'), 'last_due_date': None}
+    )
+    rows = (
+        Installment.objects.filter(student_fee_management__user_franchise__batch=batch)
+        .values('student_fee_management__user_franchise__user_id')
+        .annotate(
+            installments=Count('id'), total=Sum('amount'), paid=Sum('payed_amount'), last_due_date=Max('due_date'),
+        )
+    )
+    for row in rows:
+        current[row.pop('student_fee_management__user_franchise__user_id')] = row
+
+    preview = []
+    for (user_id, username), dates in zip(students, schedule):
+        existing = current[user_id]
+        remaining = batch_remaining - existing['paid']
+        preview.append({
+            'user_id': user_id,
+            'username': username,
+            'registration_date': registered.get(user_id),
+            'current': existing,
+            'proposed': {
+                'remaining_amount': remaining,
+                'schedule': [
+                    {'due_date': due_date, 'amount': amount} for due_date, amount in zip(_to_dates(dates), amounts)
+                ],
+            },
+        })
+    return {
+        'discount': discount,
+        'remaining_amount': batch_remaining,
+        'unscheduled': batch_remaining - scheduled_total,
+        'templates': [{'amount': amount, 'repayment_period_days': period} for amount, period in templates],
+        'students': preview,
+    }
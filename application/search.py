@@ -0,0 +1,127 @@
+"""
+Prefix search over franchise students.
+
+Searches run against ``StudentSearchEntry`` rather than ``auth_user`` and the
+profile table, which this app does not own and cannot index.
+"""
+
+import re
+
+from common.djangoapps.student.models import UserProfile
+from django.db.models import Q
+
+from .models import StudentSearchEntry, UserFranchise
+
+MIN_QUERY_LENGTH = 2
+RESULT_LIMIT = 20
+REBUILD_CHUNK_SIZE = 1000
+PHONE_QUERY = re.compile(r'\+?[\d\s()-]*\d[\d\s()-]*')
+
+
+def normalize(value):
+    """
+    Lower-case ``value`` and collapse its whitespace, as stored in the search columns.
+    """
+    return ' '.join((value or '').lower().split())
+
+
+def normalize_phone(value):
+    """
+    Reduce a phone number to its digits.
+    """
+    return re.sub(r'\D', '', value or '')
+
+
+def build_entry(user_franchise, profile=None):
+    """
+    Return an unsaved ``StudentSearchEntry`` for a ``UserFranchise`` with its user loaded.
+    """
+    user = user_franchise.user
+    display_name = (profile.name if profile and profile.name else user.get_full_name()) or user.username
+    return StudentSearchEntry(
+        user_id=user.pk,
+        franchise_id=user_franchise.franchise_id,
+        batch_id=user_franchise.batch_id,
+        display_name=display_name[:255],
+        username=normalize(user.username),
+        full_name=normalize(display_name)[:255],
+        last_name=normalize(user.last_name or display_name.rsplit(' ', 1)[-1])[:150],
+        email=normalize(user.email),
+        phone=normalize_phone(profile.phone_number if profile else '')[:20],
+    )
+
+
+def index_student(user_id):
+    """
+    Create, refresh or drop the search entry for one user.
+    """
+    user_franchise = UserFranchise.objects.select_related('user').filter(user_id=user_id).first()
+    if user_franchise is None:
+        StudentSearchEntry.objects.filter(user_id=user_id).delete()
+        return None
+    profile = UserProfile.objects.filter(user_id=user_id).first()
+    entry = build_entry(user_franchise, profile)
+    entry.save()
+    return entry
+
+
+def rebuild_index(chunk_size=REBUILD_CHUNK_SIZE):
+    """
+    Rebuild every search entry in primary-key ordered chunks. Returns the number indexed.
+    """
+    StudentSearchEntry.objects.exclude(
+        user_id__in=UserFranchise.objects.values('user_id')
+    ).delete()
+    indexed = 0
+    last_pk = 0
+    while True:
+        chunk = list(
+            UserFranchise.objects.select_related('user').filter(pk__gt=last_pk).order_by('pk')[:chunk_size]
+        )
+        if not chunk:
+            return indexed
+        profiles = {
+            profile.user_id: profile
+            for profile in UserProfile.objects.filter(user_id__in=[uf.user_id for uf in chunk])
+        }
+        entries = [build_entry(uf, profiles.get(uf.user_id)) for uf in chunk]
+        user_ids = [entry.user_id for entry in entries]
+        StudentSearchEntry.objects.filter(user_id__in=user_ids).delete()
+        StudentSearchEntry.objects.bulk_create(entries)
+        indexed += len(entries)
+        last_pk = chunk[-1].pk
+
+
+def search_queryset(query):
+    """
+    Return the ``StudentSearchEntry`` rows whose fields start with ``query``, or ``None`` if it is too short.
+
+    Digit-only queries match phone numbers and usernames, e-mail-looking
+    queries match e-mails only, so each lookup hits one or two prefix indexes
+    where possible.
+    """
+    term = normalize(query)
+    if len(term) < MIN_QUERY_LENGTH:
+        return None
+    if PHONE_QUERY.fullmatch(term):
+        condition = Q(phone__startswith=normalize_phone(term)) | Q(username__startswith=term)
+    elif '@' in term:
+        condition = Q(email__startswith=term)
+    else:
+        condition = (
+            Q(username__startswith=term)
+            | Q(full_name__startswith=term)
+            | Q(last_name__startswith=term)
+            | Q(email__startswith=term)
+        )
+    return StudentSearchEntry.objects.filter(condition).order_by('username')
+
+
+def search_students(query, limit=RESULT_LIMIT):
+    """
+    Return up to ``limit`` search entries matching ``query``, with their users loaded.
+    """
+    entries = search_queryset(query)
+    if entries is None:
+        return []
+    return list(entries.select_related('user')[:limit])
@@ -18,6 +18,15 @@ def root(*args):
 def plugin_settings(settings):
     print("✔ Application settings loaded!")
     settings.FEATURES['ENABLE_APPLICATION'] = True
+    # Report views read from this database alias when it is configured.
+    settings.APPLICATION_READ_REPLICA = getattr(settings, 'APPLICATION_READ_REPLICA', None)
+    settings.DATABASE_ROUTERS = list(getattr(settings, 'DATABASE_ROUTERS', [])) + [
+        'application.routers.ReadReplicaRouter',
+    ]
+    # Only acts on POSTs to this app's views; everything else passes straight through.
+    settings.MIDDLEWARE = list(settings.MIDDLEWARE) + [
+        'application.routers.ReplicaStickinessMiddleware',
+    ]
 
     
 DATABASES = {
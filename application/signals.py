@@ -0,0 +1,95 @@
+"""
+Signal handlers that keep app-owned denormalized tables in sync.
+"""
+
+from common.djangoapps.student.models import CourseEnrollment, EnrollStatusChange, UserProfile
+from common.djangoapps.student.signals import ENROLL_STATUS_CHANGE
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import activity, enrollments, outbox
+from .models import Batch, StudentActivity, StudentFeeManagement, UserFranchise
+from .search import index_student
+
+
+@receiver(post_save, sender=UserFranchise)
+@receiver(post_delete, sender=UserFranchise)
+def reindex_user_franchise(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    index_student(instance.user_id)
+
+
+@receiver(post_save, sender=UserFranchise)
+def sync_student_activity(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    activity.sync_student(instance)
+
+
+@receiver(post_delete, sender=UserFranchise)
+def drop_student_activity(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    StudentActivity.objects.filter(user_id=instance.user_id).delete()
+
+
+@receiver(user_logged_in)
+def record_student_login(sender, request, user, **kwargs):  # pylint: disable=unused-argument
+    activity.record_login(user.pk)
+
+
+@receiver(post_save, sender=User)
+def reindex_user(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    if not created and UserFranchise.objects.filter(user_id=instance.pk).exists():
+        index_student(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+def reindex_profile(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    if UserFranchise.objects.filter(user_id=instance.user_id).exists():
+        index_student(instance.user_id)
+
+
+def _sync_registration_date(user_id, course_id, enrolled_at):
+    # Most enrollments on the platform are in courses no batch uses.
+    if not Batch.objects.filter(course_id=course_id).exists():
+        return
+    registration_date = enrolled_at.date()
+    StudentFeeManagement.objects.filter(
+        user_franchise__user_id=user_id,
+        batch_fee_management__batch__course_id=course_id,
+    ).exclude(registration_date=registration_date).update(registration_date=registration_date)
+
+
+@receiver(post_save, sender=CourseEnrollment)
+def sync_registration_date(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    # Mode and other changes to an existing enrollment leave the date alone;
+    # reactivations arrive through ENROLL_STATUS_CHANGE.
+    if created:
+        _sync_registration_date(instance.user_id, instance.course_id, instance.created)
+
+
+@receiver(ENROLL_STATUS_CHANGE)
+def sync_reenrollment_date(sender, event=None, user=None, course_id=None, **kwargs):  # pylint: disable=unused-argument
+    if event != EnrollStatusChange.enroll:
+        return
+    enrolled_at = (
+        CourseEnrollment.objects.filter(user=user, course_id=course_id).values_list('created', flat=True).first()
+    )
+    if enrolled_at:
+        _sync_registration_date(user.pk, course_id, enrolled_at)
+
+
+@receiver(post_save, sender=CourseEnrollment)
+@receiver(post_delete, sender=CourseEnrollment)
+def refresh_enrollment_status(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    enrollments.refresh(instance.user_id, instance.course_id)
+
+
+@receiver(ENROLL_STATUS_CHANGE)
+def publish_unenrollment(sender, event=None, user=None, course_id=None, **kwargs):  # pylint: disable=unused-argument
+    if event != EnrollStatusChange.unenroll:
+        return
+    student = (
+        UserFranchise.objects.filter(user=user, batch__course_id=course_id)
+        .values('franchise_id', 'batch_id').first()
+    )
+    if student:
+        outbox.publish(outbox.STUDENT_UNENROLLED, {'user_id': user.pk, 'course_id': str(course_id), **student})
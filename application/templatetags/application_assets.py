@@ -0,0 +1,22 @@
+"""
+Template tags for the app's bundled static assets.
+"""
+
+from django import template
+from django.core.exceptions import ImproperlyConfigured
+from django.templatetags.static import static
+
+from application.assets import BUNDLE_NAME, bundle_file
+
+register = template.Library()
+
+
+@register.simple_tag
+def bundle_url(name=BUNDLE_NAME):
+    """
+    Return the URL of the content-hashed bundle; raise ``ImproperlyConfigured`` if it was not built.
+    """
+    file_name = bundle_file(name)
+    if file_name is None:
+        raise ImproperlyConfigured(f"The {name} bundle has not been built; run the build_assets command.")
+    return static(f'dist/{file_name}')
@@ -5,18 +5,26 @@ app_name = 'application'
 
 urlpatterns = [
     path('home/', views.homepage, name='homepage'),
+    path('home/async/', views.homepage_async, name='homepage_async'),
+    path('students/search/', views.student_search, name='student_search'),
+    path('reports/aging/', views.aging_report, name='aging_report'),
+    path('reports/cash-flow-forecast/', views.cash_flow_forecast, name='cash_flow_forecast'),
+    path('reports/trends/', views.fee_trends, name='fee_trends'),
     path('fee-reminders/', views.fee_reminders, name='fee_reminders'),
     path('franchises/', views.franchise_list, name='franchise_list'),
     path('franchise/register/', views.franchise_register, name='franchise_register'),
     path('franchise/<int:pk>/edit/', views.franchise_edit, name='franchise_edit'),
     path('franchise/<int:pk>/report/', views.franchise_report, name='franchise_report'),
     path('franchise/<int:pk>/batch/add/', views.batch_create, name='batch_create'),
+    path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/edit/', views.batch_edit, name='batch_edit'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/students/', views.batch_students, name='batch_students'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/student/<int:user_pk>/', views.student_detail, name='student_detail'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/student/<int:user_pk>/edit/', views.edit_student_details, name='edit_student_details'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/register/', views.batch_user_register, name='batch_user_register'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/fee-management/', views.batch_fee_management, name='batch_fee_management'),
+    path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/fee-management/what-if/', views.batch_fee_what_if, name='batch_fee_what_if'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/student-fee-management/<int:user_pk>/', views.student_fee_management, name='student_fee_management'),
+    path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/student-fee-management/<int:user_pk>/installment/<int:installment_pk>/', views.update_installment, name='update_installment'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/student-fee-management/<int:user_pk>/print-installment-invoice/<int:installment_pk>/', views.print_installment_invoice, name='print_installment_invoice'),
     path('franchise/<int:franchise_pk>/batch/<int:batch_pk>/student-fee-management/<int:user_pk>/edit-installment/', views.edit_installment_setup, name='edit_installment_setup'),
     path('inactive-users/', views.inactive_users, name='inactive_users'),
@@ -1,44 +1,98 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_POST
 from django.contrib.auth.models import User
-from django.db import models
-from .forms import FranchiseForm, BatchForm, FranchiseUserRegistrationForm, BatchFeeManagementForm, StudentFeeManagementForm, InstallmentForm, EditInstallmentForm, PaymentForm, StudentEditForm
-from .models import Franchise, UserFranchise, Batch, BatchFeeManagement, StudentFeeManagement, Installment, InstallmentTemplate
+from .forms import (
+    BatchFeeManagementForm,
+    BatchForm,
+    EditInstallmentForm,
+    FranchiseForm,
+    FranchiseUserRegistrationForm,
+    StudentEditForm,
+)
+from .models import (
+    ArchivedInstallment,
+    ArchivedStudentFeeManagement,
+    Batch,
+    BatchFeeManagement,
+    Franchise,
+    Installment,
+    InstallmentTemplate,
+    StudentFeeManagement,
+    UserFranchise,
+)
 from django.contrib.auth.decorators import login_required, user_passes_test
-from collections import defaultdict
-from django.db.models import Count
+from django.contrib.auth.views import redirect_to_login
+from functools import wraps
+from asgiref.sync import sync_to_async
+import csv
+import math
+from django.db.models import F, Sum
 from django.urls import reverse
 from django.forms import modelformset_factory
 from datetime import timedelta
+from decimal import Decimal, InvalidOperation
 from django.utils import timezone
-from django.db import OperationalError, transaction
-from time import sleep
-
-from common.djangoapps.student.models import UserProfile
+from django.db import transaction
+from django.contrib import messages
 
 from common.djangoapps.student.models import CourseEnrollment
-from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+from .audit import audited
+from .concurrency import StaleRecordError, compare_and_swap
+from .payments import record_payment
+from .routers import read_replica
+from .search import search_students
+from . import (
+    activity,
+    audit,
+    dashboards,
+    enrollments,
+    fees,
+    forecast,
+    outbox,
+    reminders,
+    reports,
+    rollups,
+    schedule,
+)
 
 
 def superuser_required(view_func):
     return user_passes_test(lambda u: u.is_superuser)(view_func)
 
 
+def async_superuser_required(view_func):
+    """
+    ``login_required`` plus ``superuser_required`` for async views.
+    """
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        # request.user is lazy and loads the session from the database.
+        if not await sync_to_async(lambda: request.user.is_superuser)():
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
 @login_required
 @superuser_required
+@read_replica
 def homepage(request):
-    total_franchises = Franchise.objects.count()
-    total_students = User.objects.count()
-    total_courses = CourseOverview.objects.count()
-
-    return render(request, 'application/homepage.html', {
-        'total_franchises': total_franchises,
-        'total_students': total_students,
-        'total_courses': total_courses
-    })
+    return render(request, 'application/homepage.html', dashboards.run(dashboards.homepage_queries()))
+
+
+@async_superuser_required
+@read_replica
+async def homepage_async(request):
+    context = await dashboards.gather(dashboards.homepage_queries())
+    return await sync_to_async(render)(request, 'application/homepage.html', context)
 
 
 @login_required
 @superuser_required
+@read_replica
 def fee_reminders(request):
     if request.method == 'POST':
         installment_id = request.POST.get('installment_id')
@@ -50,88 +104,222 @@ def fee_reminders(request):
                 ).get(id=installment_id)
                 user = installment.student_fee_management.user_franchise.user
                 batch = installment.student_fee_management.user_franchise.batch
-                course_id = batch.course.id if batch and batch.course else None
+                course_id = batch.course_id if batch else None
                 if course_id:
-                    if CourseEnrollment.is_enrolled(user, course_id):
-                        CourseEnrollment.unenroll(user, course_id)
+                    if enrollments.is_enrolled(user.pk, course_id):
+                        # Atomic so the unenrollment and its outbox event commit together
+                        with transaction.atomic():
+                            CourseEnrollment.unenroll(user, course_id)
             except Installment.DoesNotExist:
                 pass
-        return redirect('application:fee_reminders')
-
-    today = timezone.now().date()
-    three_days_later = today + timedelta(days=3)
-
-    upcoming_installments = Installment.objects.filter(
-        due_date__gte=today,
-        due_date__lte=three_days_later,
-        status='pending'
-    ).select_related('student_fee_management__user_franchise__user', 'student_fee_management__user_franchise__batch')
-
-    overdue_installments = Installment.objects.filter(
-        due_date__lt=today
-    ).exclude(status='paid').select_related('student_fee_management__user_franchise__user', 'student_fee_management__user_franchise__batch')
-
-    overdue_data = []
-    for installment in overdue_installments:
-        user = installment.student_fee_management.user_franchise.user
-        batch = installment.student_fee_management.user_franchise.batch
-        course_id = batch.course.id if batch and batch.course else None
-        is_enrolled = False
-        if course_id:
-            is_enrolled = CourseEnrollment.is_enrolled(user, course_id)
-        overdue_data.append({
-            'installment': installment,
-            'is_enrolled': is_enrolled
-        })
+        return redirect(f"{reverse('application:fee_reminders')}?{request.POST.get('next_query', '')}")
+
+    kind = 'upcoming' if request.GET.get('list') == 'upcoming' else 'overdue'
+    try:
+        page, next_cursor = reminders.reminder_page(request.GET, kind)
+    except reminders.InvalidReminderQuery as exc:
+        messages.error(request, str(exc))
+        page, next_cursor = [], None
+
+    statuses = enrollments.enrollment_statuses((row.user_id, row.course_id) for row in page if row.course_id)
+    for row in page:
+        row.is_enrolled = bool(row.course_id) and statuses[(row.user_id, str(row.course_id))]
+
+    filters = request.GET.copy()
+    filters.pop('cursor', None)
+    next_query = None
+    if next_cursor:
+        next_params = filters.copy()
+        next_params['cursor'] = next_cursor
+        next_query = next_params.urlencode()
+    sort_queries = {}
+    for field in reminders.SORT_FIELDS:
+        sort_params = filters.copy()
+        sort_params['sort'] = f'-{field}' if filters.get('sort') == field else field
+        sort_queries[field] = sort_params.urlencode()
 
     return render(request, 'application/fee_reminders.html', {
-        'upcoming_installments': upcoming_installments,
-        'overdue_data': overdue_data,
+        'list': kind,
+        'rows': page,
+        'filters': filters,
+        'current_query': request.GET.urlencode(),
+        'first_query': filters.urlencode(),
+        'next_query': next_query,
+        'sort_queries': sort_queries,
+        'franchises': Franchise.objects.order_by('name'),
+        'default_upcoming_days': reminders.DEFAULT_UPCOMING_DAYS,
     })
 
 
 @login_required
 @superuser_required
-def inactive_users(request):
-    # Get users who haven't logged in for the last 2 days
-    two_days_ago = timezone.now() - timedelta(days=2)
-    inactive_users = User.objects.filter(
-        models.Q(last_login__isnull=True) | models.Q(last_login__lt=two_days_ago)
-    ).order_by('last_login')
+@read_replica
+def student_search(request):
+    results = []
+    for entry in search_students(request.GET.get('q', '')):
+        url = None
+        if entry.franchise_id and entry.batch_id:
+            url = reverse('application:student_detail', kwargs={
+                'franchise_pk': entry.franchise_id,
+                'batch_pk': entry.batch_id,
+                'user_pk': entry.user_id,
+            })
+        results.append({
+            'user_id': entry.user_id,
+            'username': entry.user.username,
+            'name': entry.display_name,
+            'email': entry.user.email,
+            'phone': entry.phone,
+            'url': url,
+        })
+    return JsonResponse({'results': results})
 
-    # Calculate days since last login for each user
-    user_data = []
-    now = timezone.now()
-    for user in inactive_users:
-        if user.last_login:
-            days_inactive = (now - user.last_login).days
-        else:
-            days_inactive = None  # Never logged in
 
-        # Try to get phone number from user profile
-        try:
-            profile = UserProfile.objects.get(user=user)
-            phone_number = profile.phone_number
-        except UserProfile.DoesNotExist:
-            phone_number = None
+@login_required
+@superuser_required
+@read_replica
+def aging_report(request):
+    franchise = None
+    batch = None
+    level = 'franchise'
+    if request.GET.get('franchise'):
+        franchise = get_object_or_404(Franchise, pk=request.GET['franchise'])
+        level = 'batch'
+    if franchise and request.GET.get('batch'):
+        batch = get_object_or_404(Batch, pk=request.GET['batch'], franchise=franchise)
+        level = 'student'
+
+    rows = reports.aging_report(
+        level,
+        franchise_id=franchise.pk if franchise else None,
+        batch_id=batch.pk if batch else None,
+    )
+    bucket_names = [name for name, _, _ in reports.AGING_BUCKETS]
+    for row in rows:
+        row['amounts'] = [row[reports.bucket_field(name)] or 0 for name in bucket_names]
+
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="aging_{level}.csv"'
+        writer = csv.writer(response)
+        writer.writerow([level, *bucket_names, 'total'])
+        for row in rows:
+            writer.writerow([row['label'], *row['amounts'], row['total']])
+        return response
+
+    return render(request, 'application/aging_report.html', {
+        'level': level,
+        'franchise': franchise,
+        'batch': batch,
+        'bucket_names': bucket_names,
+        'rows': rows,
+    })
 
-        # Get batch from UserFranchise
-        try:
-            user_franchise = UserFranchise.objects.get(user=user)
-            batch = user_franchise.batch
-        except UserFranchise.DoesNotExist:
-            batch = None
 
+@login_required
+@superuser_required
+@read_replica
+def cash_flow_forecast(request):
+    try:
+        weeks = int(request.GET.get('weeks', forecast.DEFAULT_WEEKS))
+        late_lag_days = int(request.GET.get('late_lag_days', forecast.DEFAULT_LATE_LAG_DAYS))
+        default_ratio = float(request.GET.get('default_ratio', forecast.DEFAULT_ON_TIME_RATIO))
+        # Historical ratios per franchise, overridable with ratio_<franchise id>=<0..1>
+        ratios = forecast.on_time_ratios()
+        for key, value in request.GET.items():
+            if key.startswith('ratio_'):
+                ratios[int(key[len('ratio_'):])] = float(value)
+        if late_lag_days < 0 or not all(math.isfinite(ratio) for ratio in [default_ratio, *ratios.values()]):
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'error': 'Invalid forecast parameters.'}, status=400)
+
+    rows = forecast.forecast(
+        weeks=max(1, min(weeks, 104)),
+        ratios=ratios,
+        default_ratio=default_ratio,
+        late_lag_days=late_lag_days,
+    )
+
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="cash_flow_forecast.csv"'
+        writer = csv.writer(response)
+        writer.writerow(['week_start', 'franchise_id', 'course_id', 'expected_amount'])
+        for row in rows:
+            writer.writerow([row['week_start'], row['franchise_id'], row['course_id'], row['expected_amount']])
+        return response
+
+    return JsonResponse({'ratios': ratios, 'forecast': rows})
+
+
+@login_required
+@superuser_required
+@read_replica
+def fee_trends(request):
+    try:
+        days = int(request.GET.get('days', 90))
+        franchise_id = int(request.GET['franchise']) if request.GET.get('franchise') else None
+        batch_id = int(request.GET['batch']) if request.GET.get('batch') else None
+    except ValueError:
+        return JsonResponse({'error': 'Invalid trend parameters.'}, status=400)
+
+    rows = rollups.trend(
+        franchise_id=franchise_id,
+        batch_id=batch_id,
+        since=timezone.now().date() - timedelta(days=days),
+    )
+    return JsonResponse({'trend': rows})
+
+
+@login_required
+@superuser_required
+@read_replica
+def inactive_users(request):
+    try:
+        days = int(request.GET.get('days', 2))
+        franchise_id = int(request.GET['franchise']) if request.GET.get('franchise') else None
+    except ValueError:
+        return HttpResponse('Invalid inactivity parameters.', status=400)
+
+    now = timezone.now()
+    user_data = []
+    for student in activity.inactive_students(days=days, franchise_id=franchise_id, now=now):
+        user = student.user
+        profile = getattr(user, 'profile', None)
+        user_franchise = getattr(user, 'userfranchise', None)
         user_data.append({
             'user': user,
-            'days_inactive': days_inactive,
-            'phone_number': phone_number,
-            'batch': batch,
+            'franchise': student.franchise,
+            'last_seen': student.last_seen,
+            # None means never logged in
+            'days_inactive': (now - student.last_seen).days if student.last_seen else None,
+            'phone_number': profile.phone_number if profile else None,
+            'batch': user_franchise.batch if user_franchise else None,
         })
 
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="inactive_students.csv"'
+        writer = csv.writer(response)
+        writer.writerow(['username', 'email', 'phone', 'franchise', 'batch', 'last_seen', 'days_inactive'])
+        for row in user_data:
+            writer.writerow([
+                row['user'].username,
+                row['user'].email,
+                row['phone_number'] or '',
+                row['franchise'].name if row['franchise'] else '',
+                row['batch'].batch_no if row['batch'] else '',
+                row['last_seen'].isoformat() if row['last_seen'] else '',
+                '' if row['days_inactive'] is None else row['days_inactive'],
+            ])
+        return response
+
     return render(request, 'application/inactive_users.html', {
         'user_data': user_data,
-        'two_days_ago': two_days_ago,
+        'days': days,
+        'franchise_id': franchise_id,
+        'franchises': Franchise.objects.order_by('name'),
     })
 
 
@@ -152,7 +340,7 @@ def franchise_register(request):
             return redirect('application:franchise_list')
     else:
         form = FranchiseForm()
-    
+
     return render(request, 'application/franchise_register.html', {'form': form})
 
 
@@ -160,7 +348,7 @@ def franchise_register(request):
 @superuser_required
 def franchise_edit(request, pk):
     franchise = get_object_or_404(Franchise, pk=pk)
-    
+
     if request.method == "POST":
         form = FranchiseForm(request.POST, instance=franchise)
         if form.is_valid():
@@ -168,42 +356,19 @@ def franchise_edit(request, pk):
             return redirect('application:franchise_list')
     else:
         form = FranchiseForm(instance=franchise)
-    
+
     return render(request, 'application/franchise_edit.html', {'form': form, 'franchise': franchise})
 
 
 @login_required
 @superuser_required
+@read_replica
 def franchise_report(request, pk):
     franchise = get_object_or_404(Franchise, pk=pk)
 
-    student_ids = list(
-        UserFranchise.objects.filter(franchise=franchise).values_list('user_id', flat=True)
-    )
-    enrollments = CourseEnrollment.objects.filter(
-        user_id__in=student_ids,
-        is_active=True
-    )
-
-    course_counts = (
-        enrollments.values('course_id')
-        .annotate(student_count=Count('user_id', distinct=True))
-    )
-    course_student_map = {row['course_id']: row['student_count'] for row in course_counts}
-    courses = list(CourseOverview.objects.filter(id__in=course_student_map.keys()))
-
-    for course in courses:
-        course.student_count = course_student_map.get(course.id, 0)
-
-    users = list(User.objects.filter(id__in=student_ids).order_by('username'))
-
-    batches = Batch.objects.filter(franchise=franchise).select_related('course')
-
     return render(request, 'application/franchise_report.html', {
         'franchise': franchise,
-        'courses': courses,
-        'users': users,
-        'batches': batches,
+        'batches': list(reports.batch_fee_summaries(franchise.pk)),
     })
 
 
@@ -218,10 +383,10 @@ def batch_create(request, pk):
             batch = form.save(commit=False)
             batch.franchise = franchise
             batch.save()
-            
+
             # Create BatchFeeManagement automatically
             BatchFeeManagement.objects.create(batch=batch)
-            
+
             return redirect('application:franchise_report', pk=franchise.pk)
     else:
         form = BatchForm()
@@ -232,6 +397,41 @@ def batch_create(request, pk):
     })
 
 
+@login_required
+@superuser_required
+@audited
+def batch_edit(request, franchise_pk, batch_pk):
+    franchise = get_object_or_404(Franchise, pk=franchise_pk)
+    batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
+    fee_management, _ = BatchFeeManagement.objects.get_or_create(batch=batch)
+
+    if request.method == "POST":
+        old_fees = batch.fees
+        form = BatchForm(request.POST, instance=batch)
+        if form.is_valid():
+            new_fees = form.cleaned_data['fees']
+            if fee_management.archived_at and new_fees != old_fees:
+                form.add_error('fees', "This batch is archived. Restore it to change its fees.")
+            else:
+                with transaction.atomic():
+                    # Fees only change through change_batch_fees, which moves every student balance.
+                    batch.save(update_fields=['batch_no', 'course'])
+                    change = fees.change_batch_fees(fee_management, fees=new_fees, changed_by=request.user)
+                if change:
+                    messages.success(
+                        request, f"Batch saved; updated the balance of {change.students_updated} students."
+                    )
+                return redirect('application:batch_fee_management', franchise_pk=franchise.pk, batch_pk=batch.pk)
+    else:
+        form = BatchForm(instance=batch)
+
+    return render(request, 'application/batch_edit.html', {
+        'form': form,
+        'franchise': franchise,
+        'batch': batch,
+    })
+
+
 @login_required
 @superuser_required
 def batch_students(request, franchise_pk, batch_pk):
@@ -258,42 +458,51 @@ def student_detail(request, franchise_pk, batch_pk, user_pk):
     user_franchise = get_object_or_404(UserFranchise, user=user, franchise=franchise, batch=batch)
 
     fee_management = get_object_or_404(BatchFeeManagement, batch=batch)
-    student_fee, created = StudentFeeManagement.objects.get_or_create(
-        user_franchise=user_franchise,
-        defaults={'batch_fee_management': fee_management}
-    )
-
-    enrollment = CourseEnrollment.objects.get(user=user, course_id=batch.course.id)
-    registration_date = enrollment.created.date()
+    # Settled batches are moved to the archive tables; show those records read-only.
+    student_fee = ArchivedStudentFeeManagement.objects.filter(user_franchise=user_franchise).first()
+    archived = student_fee is not None
+    if not archived:
+        student_fee, created = StudentFeeManagement.objects.get_or_create(
+            user_franchise=user_franchise,
+            defaults={'batch_fee_management': fee_management}
+        )
 
-    if not Installment.objects.filter(student_fee_management=student_fee).exists():
-        templates = InstallmentTemplate.objects.filter(batch_fee_management=fee_management).order_by('id')
-        cumulative_days = 0
-        for template in templates:
-            cumulative_days += template.repayment_period_days
-            due_date = registration_date + timedelta(days=cumulative_days)
+    registration_date = student_fee.registration_date
 
-            Installment.objects.create(
+    # Without an enrollment there is no anchor for the schedule yet.
+    if (
+        not archived and registration_date
+        and not Installment.objects.filter(student_fee_management=student_fee).exists()
+    ):
+        templates = list(InstallmentTemplate.objects.filter(batch_fee_management=fee_management).order_by('id'))
+        due_dates = schedule.student_schedule(
+            registration_date, [template.repayment_period_days for template in templates]
+        )
+        Installment.objects.bulk_create([
+            Installment(
                 student_fee_management=student_fee,
                 due_date=due_date,
                 amount=template.amount,
                 repayment_period_days=template.repayment_period_days
             )
+            for template, due_date in zip(templates, due_dates)
+        ])
 
     if request.method == 'POST':
         action = request.POST.get('action')
         if action == 'enroll':
-            if not CourseEnrollment.is_enrolled(user, batch.course.id):
-                CourseEnrollment.enroll(user, batch.course.id)
+            if not enrollments.is_enrolled(user.pk, batch.course_id):
+                CourseEnrollment.enroll(user, batch.course_id)
         elif action == 'unenroll':
-            if CourseEnrollment.is_enrolled(user, batch.course.id):
-                CourseEnrollment.unenroll(user, batch.course.id)
+            if enrollments.is_enrolled(user.pk, batch.course_id):
+                with transaction.atomic():
+                    CourseEnrollment.unenroll(user, batch.course_id)
         return redirect('application:student_detail', franchise_pk=franchise.pk, batch_pk=batch.pk, user_pk=user.pk)
 
-    existing_installments = Installment.objects.filter(student_fee_management=student_fee).order_by('due_date')
+    existing_installments = student_fee.installments.order_by('due_date')
     installments = [{'installment': inst} for inst in existing_installments]
 
-    is_enrolled = CourseEnrollment.is_enrolled(user, batch.course.id)
+    is_enrolled = enrollments.is_enrolled(user.pk, batch.course_id)
 
     return render(request, 'application/student_detail.html', {
         'franchise': franchise,
@@ -304,6 +513,7 @@ def student_detail(request, franchise_pk, batch_pk, user_pk):
         'student_fee': student_fee,
         'installments': installments,
         'is_enrolled': is_enrolled,
+        'archived': archived,
     })
 
 
@@ -340,12 +550,12 @@ def batch_user_register(request, franchise_pk, batch_pk):
         form = FranchiseUserRegistrationForm(request.POST)
         if form.is_valid():
             user = form.save(franchise=franchise, commit=True)
-            CourseEnrollment.enroll(user, batch.course.id)
-            
+            CourseEnrollment.enroll(user, batch.course_id)
+
             user_franchise = UserFranchise.objects.get(user=user, franchise=franchise)
             user_franchise.batch = batch
             user_franchise.save()
-            
+
             return redirect('application:batch_students', franchise_pk=franchise.pk, batch_pk=batch.pk)
     else:
         form = FranchiseUserRegistrationForm()
@@ -359,41 +569,63 @@ def batch_user_register(request, franchise_pk, batch_pk):
 
 @login_required
 @superuser_required
+@audited
 def batch_fee_management(request, franchise_pk, batch_pk):
     franchise = get_object_or_404(Franchise, pk=franchise_pk)
     batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
 
     fee_management, created = BatchFeeManagement.objects.get_or_create(batch=batch)
 
+    if request.method == "POST" and fee_management.archived_at:
+        messages.error(request, "This batch is archived. Restore it to change its fees.")
+        return redirect('application:batch_fee_management', franchise_pk=franchise.pk, batch_pk=batch.pk)
+
     if request.method == "POST":
         action = request.POST.get("action")
 
         if action == "save_discount":
             form = BatchFeeManagementForm(request.POST, instance=fee_management)
             if form.is_valid():
-                form.save()
+                change = fees.change_batch_fees(
+                    fee_management, discount=form.cleaned_data['discount'], changed_by=request.user
+                )
+                if change:
+                    messages.success(
+                        request, f"Discount saved; updated the balance of {change.students_updated} students."
+                    )
             return redirect('application:batch_fee_management', franchise_pk=franchise.pk, batch_pk=batch.pk)
 
         elif action == "save_installments":
-            InstallmentTemplate.objects.filter(batch_fee_management=fee_management).delete()
-
-            installment_count = 0
-            while f'installment_amount_{installment_count + 1}' in request.POST:
-                installment_count += 1
-                amount = request.POST.get(f'installment_amount_{installment_count}')
-                period = request.POST.get(f'repayment_period_{installment_count}')
-                if amount and period:
-                    InstallmentTemplate.objects.create(
-                        batch_fee_management=fee_management,
-                        amount=amount,
-                        repayment_period_days=period
-                    )
+            templates = InstallmentTemplate.objects.filter(batch_fee_management=fee_management).order_by('id')
+            with transaction.atomic():
+                before = [list(template) for template in templates.values_list('amount', 'repayment_period_days')]
+                templates.delete()
+
+                installment_count = 0
+                while f'installment_amount_{installment_count + 1}' in request.POST:
+                    installment_count += 1
+                    amount = request.POST.get(f'installment_amount_{installment_count}')
+                    period = request.POST.get(f'repayment_period_{installment_count}')
+                    if amount and period:
+                        InstallmentTemplate.objects.create(
+                            batch_fee_management=fee_management,
+                            amount=amount,
+                            repayment_period_days=period
+                        )
+                after = [list(template) for template in templates.values_list('amount', 'repayment_period_days')]
+                audit.record(
+                    'batch_fee_management', fee_management.pk,
+                    audit.diff({'installment_templates': before}, {'installment_templates': after}), batch.pk,
+                )
             return redirect('application:batch_fee_management', franchise_pk=franchise.pk, batch_pk=batch.pk)
 
     else:
         form = BatchFeeManagementForm(instance=fee_management)
 
-    installments = InstallmentTemplate.objects.filter(batch_fee_management=fee_management)
+    if fee_management.archived_at:
+        installments = fee_management.archived_installment_templates.all()
+    else:
+        installments = InstallmentTemplate.objects.filter(batch_fee_management=fee_management)
 
     return render(request, 'application/batch_fee_management.html', {
         'form': form,
@@ -404,8 +636,141 @@ def batch_fee_management(request, franchise_pk, batch_pk):
     })
 
 
+def _parse_templates(params):
+    """
+    Return ``(amount, repayment_period_days)`` pairs from the batch fee form fields, or ``None`` if none were sent.
+    """
+    templates = []
+    count = 1
+    while f'installment_amount_{count}' in params:
+        amount = params[f'installment_amount_{count}']
+        period = params.get(f'repayment_period_{count}')
+        count += 1
+        # Blank rows are skipped, as when the form is saved.
+        if not amount or not period:
+            continue
+        amount, period = Decimal(amount), int(period)
+        if amount < 0 or period < 0:
+            raise ValueError("Installment amounts and periods must not be negative.")
+        templates.append((amount, period))
+    return templates or None
+
+
 @login_required
 @superuser_required
+@read_replica
+def batch_fee_what_if(request, franchise_pk, batch_pk):
+    franchise = get_object_or_404(Franchise, pk=franchise_pk)
+    batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
+    fee_management = get_object_or_404(BatchFeeManagement, batch=batch)
+
+    try:
+        templates = _parse_templates(request.GET)
+        discount = Decimal(request.GET['discount']) if request.GET.get('discount') else None
+    except (KeyError, ValueError, InvalidOperation):
+        return JsonResponse({'error': 'Invalid installment or discount values.'}, status=400)
+
+    preview = schedule.preview_batch(batch, fee_management, templates=templates, discount=discount)
+    return JsonResponse({'batch': batch.batch_no, **preview})
+
+
+INSTALLMENT_AUDIT_FIELDS = ('status', 'payed_amount', 'payment_date')
+INSTALLMENT_SETUP_AUDIT_FIELDS = ('amount', 'repayment_period_days', 'due_date')
+
+
+def _installment_change_error(installment, previous, new_status, new_payed_amount):
+    """
+    Return why ``installment`` cannot take the new status and paid amount, or ``None``.
+    """
+    if new_payed_amount is None:
+        return "Invalid payed amount."
+
+    if new_status not in ['pending', 'paid', 'overdue']:
+        return "Invalid status value."
+
+    if new_payed_amount < 0:
+        return "Payed amount must be greater than or equal to 0."
+
+    # New validation: if status is paid, payed amount must be > 0
+    if new_status == 'paid' and new_payed_amount <= 0:
+        return "Payed amount must be greater than zero to mark as paid."
+
+    # If installment is already paid, status cannot be changed
+    if installment.status == 'paid' and new_status != 'paid':
+        return "Paid installments cannot be changed."
+
+    # Enforce order: can only mark this installment as paid if all previous are paid
+    if new_status == 'paid' and previous is not None and previous.status != 'paid':
+        return "Payments must be marked in order."
+    return None
+
+
+def _apply_installment_change(
+    installment, new_status, new_payed_amount, version=None, method=None, batch_id=None, student_id=None,
+):
+    """
+    Write a validated status and paid amount change; must run inside a transaction.
+
+    The row is only written if it still has ``version`` (the one the form was
+    rendered with), so a concurrent edit by another cashier raises
+    ``StaleRecordError`` instead of being silently overwritten.
+    """
+    if installment.status == 'paid':  # Only update if not already paid
+        return
+    previous_status = installment.status
+    before = audit.snapshot(installment, INSTALLMENT_AUDIT_FIELDS)
+    if version is not None:
+        installment.version = version
+    payment_date = installment.payment_date
+    if new_status == 'paid' and not payment_date:
+        payment_date = timezone.now().date()
+    elif new_status != 'paid':
+        payment_date = None
+    compare_and_swap(installment, status=new_status, payment_date=payment_date)
+    # The paid amount only moves through the payment ledger; the key makes a
+    # resubmitted form post the difference once.
+    difference = new_payed_amount - installment.payed_amount
+    if difference:
+        record_payment(
+            installment.id,
+            difference,
+            payment_date=payment_date,
+            method=(method or 'cash') if difference > 0 else 'adjustment',
+            idempotency_key=f'installment-{installment.id}-v{installment.version - 1}',
+        )
+    if new_status in ('paid', 'overdue') and new_status != previous_status:
+        event_type = outbox.INSTALLMENT_PAID if new_status == 'paid' else outbox.INSTALLMENT_OVERDUE
+        outbox.publish_installment_events(event_type, [installment.id])
+    after = {'status': new_status, 'payed_amount': new_payed_amount, 'payment_date': payment_date}
+    audit.record('installment', installment.id, audit.diff(before, after), batch_id, student_id)
+
+
+def _parse_amount(value):
+    try:
+        return Decimal(value)
+    except (InvalidOperation, TypeError):
+        return None
+
+
+def _archived_redirect(request, user_franchise):
+    if not ArchivedStudentFeeManagement.objects.filter(user_franchise=user_franchise).exists():
+        return None
+    messages.error(request, "This student's fee records are archived. Restore the batch to edit them.")
+    return redirect(
+        'application:student_detail',
+        franchise_pk=user_franchise.franchise_id,
+        batch_pk=user_franchise.batch_id,
+        user_pk=user_franchise.user_id,
+    )
+
+
+def _parse_version(value):
+    return int(value) if (value or '').isdigit() else None
+
+
+@login_required
+@superuser_required
+@audited
 def student_fee_management(request, franchise_pk, batch_pk, user_pk):
     franchise = get_object_or_404(Franchise, pk=franchise_pk)
     batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
@@ -414,88 +779,65 @@ def student_fee_management(request, franchise_pk, batch_pk, user_pk):
     fee_management = get_object_or_404(BatchFeeManagement, batch=batch)
     user_franchise = get_object_or_404(UserFranchise, user=user, franchise=franchise, batch=batch)
 
+    archived_redirect = _archived_redirect(request, user_franchise)
+    if archived_redirect:
+        return archived_redirect
+
     student_fee, created = StudentFeeManagement.objects.get_or_create(
         user_franchise=user_franchise,
         defaults={'batch_fee_management': fee_management}
     )
 
-    enrollment = CourseEnrollment.objects.get(user=user, course_id=batch.course.id)
-    registration_date = enrollment.created.date()
+    registration_date = student_fee.registration_date
 
     if request.method == "POST":
-        existing_installments = Installment.objects.filter(student_fee_management=student_fee).order_by('due_date')
+        existing_installments = list(
+            Installment.objects.filter(student_fee_management=student_fee).order_by('due_date')
+        )
         # Validate that payments are marked in order and paid installments cannot be changed
         error_message = None
-        last_paid_index = -1
+        changes = []
         for i, installment in enumerate(existing_installments):
             status_key = f'status_{installment.id}'
             payed_amount_key = f'payed_amount_{installment.id}'
             if status_key in request.POST and payed_amount_key in request.POST:
                 new_status = request.POST[status_key]
-                try:
-                    new_payed_amount = float(request.POST[payed_amount_key])
-                except ValueError:
-                    error_message = "Invalid payed amount."
-                    break
-
-                if new_status not in ['pending', 'paid', 'overdue']:
-                    error_message = "Invalid status value."
-                    break
-
-                if new_payed_amount < 0:
-                    error_message = "Payed amount must be greater than or equal to 0."
+                new_payed_amount = _parse_amount(request.POST[payed_amount_key])
+                previous = existing_installments[i - 1] if i > 0 else None
+                error_message = _installment_change_error(installment, previous, new_status, new_payed_amount)
+                if error_message:
                     break
-
-                # New validation: if status is paid, payed amount must be > 0
-                if new_status == 'paid' and new_payed_amount <= 0:
-                    error_message = "Payed amount must be greater than zero to mark as paid."
-                    break
-
-                # If installment is already paid, status cannot be changed
-                if installment.status == 'paid' and new_status != 'paid':
-                    error_message = "Paid installments cannot be changed."
-                    break
-
-                # Enforce order: can only mark this installment as paid if all previous are paid
-                if new_status == 'paid':
-                    if i > 0 and existing_installments[i-1].status != 'paid':
-                        error_message = "Payments must be marked in order."
-                        break
-                    last_paid_index = i
+                changes.append((installment, new_status, new_payed_amount))
 
         if error_message:
-            from django.contrib import messages
             messages.error(request, error_message)
         else:
-            # Save changes if no errors
-            for i, installment in enumerate(existing_installments):
-                status_key = f'status_{installment.id}'
-                payed_amount_key = f'payed_amount_{installment.id}'
-                if status_key in request.POST and payed_amount_key in request.POST:
-                    new_status = request.POST[status_key]
-                    try:
-                        new_payed_amount = float(request.POST[payed_amount_key])
-                    except ValueError:
-                        new_payed_amount = 0
-
-                    if new_status in ['pending', 'paid', 'overdue']:
-                        if installment.status != 'paid':  # Only update if not already paid
-                            installment.status = new_status
-                            installment.payed_amount = new_payed_amount
-                            if new_status == 'paid' and not installment.payment_date:
-                                installment.payment_date = timezone.now().date()
-                            elif new_status != 'paid':
-                                installment.payment_date = None
-                            installment.save()
-
-            total_paid = sum(inst.payed_amount for inst in Installment.objects.filter(student_fee_management=student_fee))
-            student_fee.remaining_amount = fee_management.remaining_amount - total_paid
-            student_fee.save()
-
-        return redirect('application:student_fee_management', franchise_pk=franchise.pk, batch_pk=batch.pk, user_pk=user.pk)
+            try:
+                with transaction.atomic():
+                    for installment, new_status, new_payed_amount in changes:
+                        _apply_installment_change(
+                            installment,
+                            new_status,
+                            new_payed_amount,
+                            version=_parse_version(request.POST.get(f'version_{installment.id}')),
+                            method=request.POST.get(f'method_{installment.id}'),
+                            batch_id=batch.pk,
+                            student_id=user.pk,
+                        )
+            except StaleRecordError:
+                messages.error(
+                    request, "These installments were changed by another user. Please review and try again."
+                )
+
+        return redirect(
+            'application:student_fee_management', franchise_pk=franchise.pk, batch_pk=batch.pk, user_pk=user.pk
+        )
 
     existing_installments = Installment.objects.filter(student_fee_management=student_fee).order_by('due_date')
-    installments = [{'installment': installment, 'repayment_period_days': installment.repayment_period_days} for installment in existing_installments]
+    installments = [
+        {'installment': installment, 'repayment_period_days': installment.repayment_period_days}
+        for installment in existing_installments
+    ]
 
     total_paid = sum(installment.payed_amount for installment in existing_installments)
     total_pending = sum(installment.amount - installment.payed_amount for installment in existing_installments)
@@ -512,13 +854,69 @@ def student_fee_management(request, franchise_pk, batch_pk, user_pk):
     })
 
 
+@login_required
+@superuser_required
+@require_POST
+@audited
+def update_installment(request, franchise_pk, batch_pk, user_pk, installment_pk):
+    installment = get_object_or_404(
+        Installment,
+        pk=installment_pk,
+        student_fee_management__user_franchise__user_id=user_pk,
+        student_fee_management__user_franchise__batch_id=batch_pk,
+        student_fee_management__user_franchise__franchise_id=franchise_pk,
+    )
+    previous = Installment.objects.filter(
+        student_fee_management_id=installment.student_fee_management_id,
+        due_date__lt=installment.due_date,
+    ).order_by('-due_date').first()
+
+    new_payed_amount = _parse_amount(request.POST.get('payed_amount', installment.payed_amount))
+    error_message = _installment_change_error(
+        installment, previous, request.POST.get('status'), new_payed_amount
+    )
+    status = 400
+    if not error_message:
+        try:
+            with transaction.atomic():
+                _apply_installment_change(
+                    installment,
+                    request.POST['status'],
+                    new_payed_amount,
+                    version=_parse_version(request.POST.get('version')),
+                    method=request.POST.get('method'),
+                    batch_id=batch_pk,
+                    student_id=user_pk,
+                )
+            status = 200
+        except StaleRecordError:
+            error_message = "This installment was changed by another user. It has been reloaded."
+            status = 409
+
+    installment.refresh_from_db()
+    totals = Installment.objects.filter(
+        student_fee_management_id=installment.student_fee_management_id
+    ).aggregate(
+        total_paid=Sum('payed_amount'),
+        total_pending=Sum(F('amount') - F('payed_amount')),
+    )
+    row = render_to_string('application/partials/installment_row.html', {
+        'installment': installment,
+        'franchise_pk': franchise_pk,
+        'batch_pk': batch_pk,
+        'user_pk': user_pk,
+    }, request=request)
+    return JsonResponse({
+        'error': error_message,
+        'row': row,
+        'total_paid': totals['total_paid'] or 0,
+        'total_pending': totals['total_pending'] or 0,
+    }, status=status)
 
 
-from django.contrib import messages
-from django.forms import modelformset_factory
-
 @login_required
 @superuser_required
+@audited
 def edit_installment_setup(request, franchise_pk, batch_pk, user_pk):
     franchise = get_object_or_404(Franchise, pk=franchise_pk)
     batch = get_object_or_404(Batch, pk=batch_pk, franchise=franchise)
@@ -526,36 +924,46 @@ def edit_installment_setup(request, franchise_pk, batch_pk, user_pk):
 
     fee_management = get_object_or_404(BatchFeeManagement, batch=batch)
     user_franchise = get_object_or_404(UserFranchise, user=user, franchise=franchise, batch=batch)
+    archived_redirect = _archived_redirect(request, user_franchise)
+    if archived_redirect:
+        return archived_redirect
     student_fee = get_object_or_404(StudentFeeManagement, user_franchise=user_franchise)
 
-    # Get registration date
-    enrollment = CourseEnrollment.objects.get(user=user, course_id=batch.course.id)
-    registration_date = enrollment.created.date()
+    registration_date = student_fee.registration_date
 
     # Define the formset - only include editable fields
     EditInstallmentFormSet = modelformset_factory(
-        Installment, 
-        form=EditInstallmentForm, 
-        extra=0, 
+        Installment,
+        form=EditInstallmentForm,
+        extra=0,
         can_delete=True,
-        fields=['amount', 'repayment_period_days']  # Only include editable fields
+        fields=['amount', 'repayment_period_days', 'version']  # Only include editable fields
     )
 
     if request.method == "POST":
         formset = EditInstallmentFormSet(
-            request.POST, 
+            request.POST,
             queryset=Installment.objects.filter(student_fee_management=student_fee)
         )
-        
+
         if formset.is_valid():
             try:
                 with transaction.atomic():
+                    before = {
+                        installment.pk: audit.snapshot(installment, INSTALLMENT_SETUP_AUDIT_FIELDS)
+                        for installment in Installment.objects.filter(student_fee_management=student_fee)
+                    }
                     instances = formset.save(commit=False)
-                    
-                    # Process deleted instances
+
+                    # Process deleted instances, refusing rows edited since the form was rendered
+                    # and rows whose payments are in the ledger
                     for obj in formset.deleted_objects:
-                        obj.delete()
-                    
+                        if obj.payed_amount:
+                            raise ValueError(f"Installment {obj.pk} has payments recorded and cannot be deleted.")
+                        deleted, _ = Installment.objects.filter(pk=obj.pk, version=obj.version).delete()
+                        if not deleted:
+                            raise StaleRecordError(f"Installment {obj.pk} was modified by another user.")
+
                     # First pass: Save all instances with temporary due_date
                     for instance in instances:
                         if not instance.pk:  # New instance
@@ -563,40 +971,52 @@ def edit_installment_setup(request, franchise_pk, batch_pk, user_pk):
                             instance.status = 'pending'
                             # Set a temporary due_date to avoid null constraint
                             instance.due_date = timezone.now().date()
-                        instance.save()
-                    
+                            instance.save()
+                        else:
+                            compare_and_swap(
+                                instance,
+                                amount=instance.amount,
+                                repayment_period_days=instance.repayment_period_days,
+                            )
+
                     # Now recalculate due dates for all installments properly
-                    all_installments = Installment.objects.filter(
+                    all_installments = list(Installment.objects.filter(
                         student_fee_management=student_fee
-                    ).order_by('id')
-                    
-                    cumulative_days = 0
-                    for installment in all_installments:
-                        cumulative_days += installment.repayment_period_days
-                        installment.due_date = registration_date + timedelta(days=cumulative_days)
-                        installment.save()
-                    
+                    ).order_by('id'))
+                    due_dates = schedule.student_schedule(
+                        registration_date, [installment.repayment_period_days for installment in all_installments]
+                    )
+                    for installment, due_date in zip(all_installments, due_dates):
+                        if due_date and installment.due_date != due_date:
+                            compare_and_swap(installment, due_date=due_date)
+                    audit.record_changes('installment', before, {
+                        installment.pk: audit.snapshot(installment, INSTALLMENT_SETUP_AUDIT_FIELDS)
+                        for installment in all_installments
+                    }, batch.pk, user.pk)
+
                     # Calculate total installment amount
                     total_installments = sum(
                         inst.amount for inst in Installment.objects.filter(
                             student_fee_management=student_fee
                         )
                     )
-                    
+
                     # Calculate amount to be added to match remaining amount
                     amount_to_add = fee_management.remaining_amount - total_installments
-                    
+
                     messages.success(request, f'Installments updated successfully! Amount to add: ₹{amount_to_add:.2f}')
-                    return redirect('application:student_fee_management', 
-                                  franchise_pk=franchise.pk, 
-                                  batch_pk=batch.pk, 
-                                  user_pk=user.pk)
-                    
+                    return redirect('application:student_fee_management',
+                                    franchise_pk=franchise.pk,
+                                    batch_pk=batch.pk,
+                                    user_pk=user.pk)
+
+            except StaleRecordError:
+                messages.error(request, 'These installments were changed by another user. Please review and try again.')
             except Exception as e:
                 messages.error(request, f'Error updating installments: {str(e)}')
         else:
             messages.error(request, 'Please correct the errors below.')
-    
+
     else:
         formset = EditInstallmentFormSet(
             queryset=Installment.objects.filter(student_fee_management=student_fee)
@@ -615,7 +1035,6 @@ def edit_installment_setup(request, franchise_pk, batch_pk, user_pk):
         'formset': formset,
         'student_fee': student_fee,
         'fee_management': fee_management,
-        'enrollment': enrollment,
         'total_installment_amount': total_installment_amount,
         'amount_to_add': amount_to_add,
         'amount_to_add_absolute': amount_to_add_absolute,  # Pass absolute value to template
@@ -625,14 +1044,15 @@ def edit_installment_setup(request, franchise_pk, batch_pk, user_pk):
 @login_required
 @superuser_required
 def print_installment_invoice(request, franchise_pk, batch_pk, user_pk, installment_pk):
-    installment = get_object_or_404(
-        Installment.objects.select_related(
-            'student_fee_management__user_franchise__user',
-            'student_fee_management__batch_fee_management__batch__franchise'
-        ),
-        pk=installment_pk,
-        status='paid'
+    related = (
+        'student_fee_management__user_franchise__user',
+        'student_fee_management__batch_fee_management__batch__franchise'
     )
+    installment = Installment.objects.select_related(*related).filter(pk=installment_pk, status='paid').first()
+    if installment is None:
+        installment = get_object_or_404(
+            ArchivedInstallment.objects.select_related(*related), pk=installment_pk, status='paid'
+        )
 
     student_fee = installment.student_fee_management
     user_franchise = student_fee.user_franchise
@@ -642,7 +1062,7 @@ def print_installment_invoice(request, franchise_pk, batch_pk, user_pk, installm
     fee_management = student_fee.batch_fee_management
 
     # Calculate totals
-    all_installments = Installment.objects.filter(student_fee_management=student_fee)
+    all_installments = student_fee.installments.all()
     total_paid = sum(inst.payed_amount for inst in all_installments)
     installment_balance = installment.amount - installment.payed_amount
 
@@ -0,0 +1,214 @@
+"""
+Webhook delivery of outbox events to external endpoints.
+
+The outbox ``drain`` queues every event it claims as a ``WebhookDelivery``
+row for each subscribed endpoint, so an event whose transaction commits after
+a later id was sent is still queued, and each endpoint has its own queue: a
+slow or failing vendor never holds back the others or the drain. The
+dispatcher sends an endpoint's queued events in id order, ``batch_size`` at a
+time as one ``{"events": [...]}`` payload over a kept-alive connection. Failed
+batches are retried with exponential backoff; a batch still failing after
+``max_attempts`` is stored as a ``WebhookDeadLetter``. Either way its
+deliveries are then deleted.
+
+A batch is claimed by setting the endpoint's ``claimed_until`` in a short
+transaction and sent after it commits, so no lock is held during HTTP calls
+and no two dispatchers send to one endpoint at once. A claim left by a
+dispatcher that died expires once every attempt could have timed out.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import time
+from datetime import timedelta
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import urlsplit
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import WebhookDeadLetter, WebhookDelivery, WebhookEndpoint
+from .outbox import serialize
+
+log = logging.getLogger(__name__)
+
+BASE_DELAY = 1.0
+MAX_DELAY = 60.0
+RETRYABLE_STATUSES = {408, 429}
+SIGNATURE_HEADER = 'X-Application-Signature'
+
+
+class ConnectionPool:
+    """
+    One persistent HTTP/1.1 connection per scheme, host and port.
+
+    A connection that errors or that the server closes is dropped and reopened
+    on the next request.
+    """
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self._connections = {}
+
+    def _connection(self, scheme, netloc, timeout):
+        key = (scheme, netloc)
+        if key not in self._connections:
+            connection_class = HTTPSConnection if scheme == 'https' else HTTPConnection
+            self._connections[key] = connection_class(netloc, timeout=timeout)
+        return key, self._connections[key]
+
+    def _drop(self, key):
+        self._connections.pop(key).close()
+
+    def post(self, url, body, headers, timeout=None):
+        """
+        POST ``body`` to ``url`` and return the response status.
+        """
+        parts = urlsplit(url)
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        key, connection = self._connection(parts.scheme, parts.netloc, timeout or self.timeout)
+        try:
+            connection.request('POST', path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, HTTPException):
+            self._drop(key)
+            raise
+        if response.will_close:
+            self._drop(key)
+        return response.status
+
+    def close(self):
+        for key in list(self._connections):
+            self._drop(key)
+
+
+def backoff_delay(attempt, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+    """
+    Seconds to wait before retry number ``attempt`` (1 for the first retry).
+    """
+    return min(max_delay, base_delay * 2 ** (attempt - 1))
+
+
+def encode(endpoint, events):
+    """
+    Return the request body and headers for a batch of serialized events.
+    """
+    body = json.dumps({'events': events}, cls=DjangoJSONEncoder).encode('utf-8')
+    headers = {'Content-Type': 'application/json', 'X-Application-Webhook': endpoint.name}
+    if endpoint.secret:
+        digest = hmac.new(endpoint.secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+        headers[SIGNATURE_HEADER] = f'sha256={digest}'
+    return body, headers
+
+
+def deliver(pool, endpoint, events, sleep=time.sleep, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+    """
+    POST one batch with retries; return ``(attempts, error)``, ``error`` being ``None`` on success.
+
+    Connection errors, 5xx, 408 and 429 responses are retried after an
+    exponential backoff. Any other non-2xx response fails at once.
+    """
+    body, headers = encode(endpoint, events)
+    error = None
+    for attempt in range(1, endpoint.max_attempts + 1):
+        if attempt > 1:
+            sleep(backoff_delay(attempt - 1, base_delay, max_delay))
+        try:
+            status = pool.post(endpoint.url, body, headers, timeout=endpoint.timeout)
+        except (OSError, HTTPException) as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            continue
+        if 200 <= status < 300:
+            return attempt, None
+        error = f"HTTP {status}"
+        if status < 500 and status not in RETRYABLE_STATUSES:
+            return attempt, error
+    return endpoint.max_attempts, error
+
+
+def claim_seconds(endpoint, max_delay=MAX_DELAY):
+    """
+    Seconds a claim lasts: long enough for every attempt to time out and back off.
+    """
+    return endpoint.max_attempts * (endpoint.timeout + max_delay)
+
+
+def claim_batch(endpoint_id, now=None):
+    """
+    Claim an active endpoint's next batch; return ``(endpoint, deliveries)``, ``deliveries`` empty if none.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        endpoint = (
+            WebhookEndpoint.objects.select_for_update(skip_locked=True)
+            .filter(pk=endpoint_id, is_active=True)
+            .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lte=now))
+            .first()
+        )
+        if endpoint is None:
+            return None, []
+        deliveries = list(endpoint.deliveries.select_related('event').order_by('event_id')[:endpoint.batch_size])
+        if deliveries:
+            endpoint.claimed_until = now + timedelta(seconds=claim_seconds(endpoint))
+            WebhookEndpoint.objects.filter(pk=endpoint.pk).update(claimed_until=endpoint.claimed_until)
+    return endpoint, deliveries
+
+
+def dispatch_endpoint(endpoint, pool, sleep=time.sleep, now=None, max_batches=None):
+    """
+    Send every queued batch for ``endpoint``; return ``(delivered, dead_lettered)`` event counts.
+    """
+    endpoint_id = endpoint.pk
+    delivered = dead_lettered = batches = 0
+    while max_batches is None or batches < max_batches:
+        endpoint, deliveries = claim_batch(endpoint_id, now)
+        if not deliveries:
+            break
+        messages = [serialize(delivery.event) for delivery in deliveries]
+        attempts, error = deliver(pool, endpoint, messages, sleep=sleep)
+        with transaction.atomic():
+            if error:
+                WebhookDeadLetter.objects.create(endpoint=endpoint, events=messages, attempts=attempts, error=error)
+                log.warning("Webhook %s dead-lettered %s events after %s attempts: %s",
+                            endpoint.name, len(messages), attempts, error)
+                dead_lettered += len(messages)
+            else:
+                delivered += len(messages)
+            WebhookDelivery.objects.filter(pk__in=[delivery.pk for delivery in deliveries]).delete()
+            WebhookEndpoint.objects.filter(pk=endpoint_id).update(claimed_until=None)
+        batches += 1
+    return delivered, dead_lettered
+
+
+def dispatch(pool=None, sleep=time.sleep, now=None):
+    """
+    Dispatch pending events to every active endpoint; return ``{name: (delivered, dead_lettered)}``.
+    """
+    own_pool = pool is None
+    pool = ConnectionPool() if own_pool else pool
+    try:
+        return {
+            endpoint.name: dispatch_endpoint(endpoint, pool, sleep=sleep, now=now)
+            for endpoint in WebhookEndpoint.objects.filter(is_active=True).order_by('pk')
+        }
+    finally:
+        if own_pool:
+            pool.close()
+
+
+def redeliver(dead_letter, pool, sleep=time.sleep):
+    """
+    Retry a dead-lettered batch; return whether it was delivered.
+    """
+    _, error = deliver(pool, dead_letter.endpoint, dead_letter.events, sleep=sleep)
+    if error:
+        WebhookDeadLetter.objects.filter(pk=dead_letter.pk).update(error=error)
+        return False
+    dead_letter.redelivered_at = timezone.now()
+    WebhookDeadLetter.objects.filter(pk=dead_letter.pk).update(redelivered_at=dead_letter.redelivered_at)
+    return True
@@ -27,9 +27,18 @@ DATABASES = {
         'PASSWORD': '',
         'HOST': '',
         'PORT': '',
-    }
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': 'replica.db',
+    },
 }
 
+DATABASE_ROUTERS = ['application.routers.ReadReplicaRouter']
+
+# Tests that exercise the replica turn it on with the settings fixture.
+APPLICATION_READ_REPLICA = None
+
 INSTALLED_APPS = (
     'django.contrib.admin',
     'django.contrib.auth',
@@ -43,7 +52,7 @@ LOCALE_PATHS = [
     root('application', 'conf', 'locale'),
 ]
 
-ROOT_URLCONF = 'application.urls'
+ROOT_URLCONF = 'test_urls'
 
 SECRET_KEY = 'insecure-secret-key'
 
@@ -51,11 +60,12 @@ MIDDLEWARE = (
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'application.routers.ReplicaStickinessMiddleware',
 )
 
 TEMPLATES = [{
     'BACKEND': 'django.template.backends.django.DjangoTemplates',
-    'APP_DIRS': False,
+    'APP_DIRS': True,
     'OPTIONS': {
         'context_processors': [
             'django.contrib.auth.context_processors.auth',  # this is required for admin
@@ -0,0 +1,9 @@
+"""
+URLs used during tests, mounting the app under its namespace as the LMS plugin does.
+"""
+
+from django.urls import include, path
+
+urlpatterns = [
+    path('', include('application.urls')),
+]
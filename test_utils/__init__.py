@@ -8,3 +8,34 @@ in multiple test modules (i.e. factoryboy factories, base test classes).
 
 So this package is the place to put them.
 """
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from openedx.core.djangoapps.content.course_overviews.tests.factories import CourseOverviewFactory
+
+from application.models import Batch, BatchFeeManagement, Franchise, Installment, StudentFeeManagement, UserFranchise
+
+
+def create_student_fee(username='student', fees=Decimal('1000.00'), installments=(), batch=None):
+    """
+    Create a franchise student with a fee record and the given installment amounts.
+    """
+    if batch is None:
+        franchise = Franchise.objects.create(
+            name='Franchise', coordinator='Coordinator', contact_no='0000000000', email='franchise@example.com'
+        )
+        batch = Batch.objects.create(
+            batch_no=f'B-{username}', fees=fees, course=CourseOverviewFactory.create(), franchise=franchise
+        )
+    fee_management, _ = BatchFeeManagement.objects.get_or_create(batch=batch)
+    user = User.objects.create(username=username, email=f'{username}@example.com')
+    user_franchise = UserFranchise.objects.create(user=user, franchise=batch.franchise, batch=batch)
+    student_fee = StudentFeeManagement.objects.create(
+        user_franchise=user_franchise, batch_fee_management=fee_management
+    )
+    for amount in installments:
+        Installment.objects.create(
+            student_fee_management=student_fee, due_date='2025-01-01', amount=Decimal(amount)
+        )
+    return student_fee
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` student login activity.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.signals import user_logged_in
+from django.core.cache import cache
+from django.utils import timezone
+
+from application.activity import inactive_students, record_login
+from application.models import StudentActivity, UserFranchise
+from test_utils import create_student_fee
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_activity_rows_follow_franchise_students():
+    user_franchise = create_student_fee(username='asha').user_franchise
+
+    activity = StudentActivity.objects.get(user_id=user_franchise.user_id)
+    assert (activity.franchise_id, activity.last_seen) == (user_franchise.franchise_id, None)
+
+    UserFranchise.objects.get(pk=user_franchise.pk).delete()
+    assert not StudentActivity.objects.exists()
+
+
+@pytest.mark.django_db
+def test_logins_are_coalesced_per_hour():
+    user = create_student_fee(username='asha').user_franchise.user
+    now = timezone.now()
+
+    user_logged_in.send(sender=type(user), request=None, user=user)
+    first_seen = StudentActivity.objects.get(user=user).last_seen
+    assert first_seen is not None
+
+    assert not record_login(user.pk, now=now + timedelta(minutes=10))
+    cache.clear()
+    assert not record_login(user.pk, now=now + timedelta(minutes=20))
+    assert StudentActivity.objects.get(user=user).last_seen == first_seen
+
+    cache.clear()
+    assert record_login(user.pk, now=now + timedelta(hours=2))
+
+
+@pytest.mark.django_db
+def test_inactive_students_by_franchise(django_assert_num_queries):
+    never = create_student_fee(username='never')
+    batch = never.batch_fee_management.batch
+    recent = create_student_fee(username='recent', batch=batch)
+    stale = create_student_fee(username='stale', batch=batch)
+    elsewhere = create_student_fee(username='elsewhere')
+    now = timezone.now()
+    StudentActivity.objects.filter(user_id=recent.user_franchise.user_id).update(last_seen=now - timedelta(hours=3))
+    StudentActivity.objects.filter(user_id__in=[stale.user_franchise.user_id, elsewhere.user_franchise.user_id]).update(
+        last_seen=now - timedelta(days=5)
+    )
+
+    with django_assert_num_queries(1):
+        rows = list(inactive_students(days=2, franchise_id=batch.franchise_id, now=now))
+        assert [row.user.username for row in rows] == ['never', 'stale']
+    assert len(inactive_students(days=2, now=now)) == 3
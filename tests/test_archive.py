@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` archival of settled batches.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from application.archive import archive_batch, archive_settled_batches, restore_batch, settled_batches
+from application.models import (
+    ArchivedInstallment,
+    ArchivedPayment,
+    ArchivedStudentFeeManagement,
+    Installment,
+    InstallmentTemplate,
+    Payment,
+    StudentFeeManagement,
+)
+from application.payments import post_payment
+from application.reports import batch_fee_summaries
+from application.rollups import rollup_range
+from test_utils import create_student_fee
+
+TODAY = date(2026, 10, 19)
+
+
+@pytest.fixture
+def settled_fee():
+    student_fee = create_student_fee(username='paid', installments=['300.00', '200.00'])
+    for installment in student_fee.installments.all():
+        post_payment(installment.pk, installment.amount, payment_date=date(2025, 1, 2))
+    InstallmentTemplate.objects.create(
+        batch_fee_management=student_fee.batch_fee_management, amount=Decimal('500.00'), repayment_period_days=30
+    )
+    return student_fee
+
+
+@pytest.mark.django_db
+def test_only_settled_old_batches_are_archived(settled_fee):
+    open_fee = create_student_fee(username='open', installments=['100.00'])
+
+    assert list(settled_batches(today=TODAY)) == [settled_fee.batch_fee_management]
+    assert list(settled_batches(older_than_days=700, today=TODAY)) == []
+
+    assert archive_settled_batches(chunk_size=1, today=TODAY) == (1, 1)
+    assert list(StudentFeeManagement.objects.all()) == [open_fee]
+    assert not Installment.objects.filter(student_fee_management_id=settled_fee.pk).exists()
+    assert not Payment.objects.exists()
+    assert not InstallmentTemplate.objects.exists()
+
+    archived = ArchivedStudentFeeManagement.objects.get(pk=settled_fee.pk)
+    assert archived.user_franchise_id == settled_fee.user_franchise_id
+    assert sorted(archived.installments.values_list('amount', flat=True)) == [Decimal('200.00'), Decimal('300.00')]
+    assert ArchivedPayment.objects.count() == 2
+    archived.batch_fee_management.refresh_from_db()
+    assert archived.batch_fee_management.archived_at is not None
+
+
+@pytest.mark.django_db
+def test_restore_brings_back_identical_rows(settled_fee):
+    installment_ids = sorted(settled_fee.installments.values_list('pk', flat=True))
+    payments = {payment.pk: payment.created_at for payment in Payment.objects.all()}
+    archive_settled_batches(today=TODAY)
+
+    assert restore_batch(settled_fee.batch_fee_management) == 1
+
+    assert not ArchivedStudentFeeManagement.objects.exists()
+    assert not ArchivedInstallment.objects.exists()
+    restored = StudentFeeManagement.objects.get(pk=settled_fee.pk)
+    assert sorted(restored.installments.values_list('pk', flat=True)) == installment_ids
+    assert set(restored.installments.values_list('status', flat=True)) == {'paid'}
+    assert {payment.pk: payment.created_at for payment in Payment.objects.all()} == payments
+    assert InstallmentTemplate.objects.count() == 1
+    restored.batch_fee_management.refresh_from_db()
+    assert restored.batch_fee_management.archived_at is None
+
+
+@pytest.mark.django_db
+def test_batch_that_is_no_longer_settled_stays_hot(settled_fee):
+    [fee_management] = settled_batches(today=TODAY)
+    Installment.objects.filter(student_fee_management=settled_fee).update(status='pending')
+
+    assert archive_batch(fee_management, today=TODAY) == 0
+
+    assert not ArchivedStudentFeeManagement.objects.exists()
+    assert Installment.objects.filter(student_fee_management=settled_fee).count() == 2
+    fee_management.refresh_from_db()
+    assert fee_management.archived_at is None
+
+
+@pytest.mark.django_db
+def test_reports_and_rollups_include_archived_batches(settled_fee):
+    batch = settled_fee.batch_fee_management.batch
+    history = (date(2025, 1, 1), date(2025, 1, 3))
+
+    def snapshots():
+        rollup_range(*history)
+        return list(batch.daily_snapshots.order_by('date').values_list('collected', 'outstanding'))
+
+    [summary] = batch_fee_summaries(batch.franchise_id, today=TODAY)
+    before = snapshots()
+    archive_settled_batches(today=TODAY)
+
+    [archived] = batch_fee_summaries(batch.franchise_id, today=TODAY)
+    assert summary.total_collected == archived.total_collected == Decimal('500.00')
+    assert archived.total_outstanding == Decimal('0.00')
+    assert snapshots() == before
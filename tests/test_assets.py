@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` stylesheet bundle.
+"""
+
+import json
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from application.assets import build_bundle, page_class, scope_css
+from application.templatetags import application_assets
+
+
+def test_page_class():
+    assert page_class('franchise_report.css') == 'page-franchise-report'
+
+
+def test_scope_css_prefixes_rules_without_specificity():
+    css = """
+    /* layout */
+    body { margin: 0; }
+    .navbar, .sidebar-menu > a { color: red; }
+    @media (max-width: 600px) {
+      .navbar { display: none; }
+    }
+    """
+    assert scope_css(css, 'page-home') == (
+        'body:where(.page-home){margin:0}'
+        ':where(.page-home) .navbar,:where(.page-home) .sidebar-menu>a{color:red}'
+        '@media (max-width: 600px){:where(.page-home) .navbar{display:none}}'
+    )
+
+
+def test_scope_css_keeps_keyframes_unscoped():
+    css = '@keyframes spin { from { opacity: 0; } to { opacity: 1; } }'
+    assert scope_css(css, 'page-home') == '@keyframes spin{from { opacity: 0; } to { opacity: 1; }}'
+
+
+def test_build_bundle_hashes_content(tmp_path):
+    source = tmp_path / 'css'
+    source.mkdir()
+    (source / 'a_page.css').write_text('.x { color: red; }')
+    dist = tmp_path / 'dist'
+
+    first = build_bundle(source, dist, ['a_page.css'])
+    assert (dist / first).read_text() == ':where(.page-a-page) .x{color:red}\n'
+    assert json.loads((dist / 'manifest.json').read_text()) == {'application.css': first}
+
+    (source / 'a_page.css').write_text('.x { color: blue; }')
+    second = build_bundle(source, dist, ['a_page.css'])
+    assert second != first
+    assert [path.name for path in dist.glob('application.*.css')] == [second]
+
+
+def test_bundle_url_points_at_static_files(monkeypatch, settings):
+    settings.STATIC_URL = '/static/'
+    monkeypatch.setattr(application_assets, 'bundle_file', lambda name: 'application.0123abcd.css')
+    assert application_assets.bundle_url() == '/static/dist/application.0123abcd.css'
+
+    monkeypatch.setattr(application_assets, 'bundle_file', lambda name: None)
+    with pytest.raises(ImproperlyConfigured, match='build_assets'):
+        application_assets.bundle_url()
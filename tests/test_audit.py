@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` audit trail.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from application import audit
+from application.fees import change_batch_fees
+from application.models import AuditEntry
+from test_utils import create_student_fee
+
+
+def test_diff_keeps_only_changed_fields():
+    old = {'status': 'pending', 'payed_amount': Decimal('0.00'), 'payment_date': None}
+    new = {'status': 'paid', 'payed_amount': Decimal('0.00'), 'payment_date': date(2026, 1, 5)}
+
+    assert audit.diff(old, new) == {'payment_date': [None, date(2026, 1, 5)], 'status': ['pending', 'paid']}
+
+
+@pytest.mark.django_db
+def test_request_entries_are_written_with_one_insert(django_capture_on_commit_callbacks):
+    student_fee = create_student_fee(username='asha', installments=['500.00', '500.00'])
+    user = student_fee.user_franchise.user
+    batch_id = student_fee.batch_fee_management.batch_id
+    first, second = student_fee.installments.order_by('pk')
+
+    with CaptureQueriesContext(connection) as queries:
+        with audit.buffered(actor=user):
+            with django_capture_on_commit_callbacks(execute=True):
+                before = {first.pk: {'amount': Decimal('500.00')}, second.pk: {'amount': Decimal('500.00')}}
+                after = {**before, first.pk: {'amount': Decimal('400.00')}, 99: {'amount': 1}}
+                audit.record_changes('installment', before, after, batch_id, user.pk)
+                change_batch_fees(student_fee.batch_fee_management, discount=Decimal('100.00'), changed_by=user)
+            assert not AuditEntry.objects.exists()
+    sql = [query['sql'] for query in queries.captured_queries]
+    assert len([statement for statement in sql if statement.startswith('INSERT INTO "application_auditentry"')]) == 1
+
+    entries = list(audit.for_batch(batch_id).order_by('pk'))
+    assert [(entry.model, entry.action) for entry in entries] == [
+        ('installment', 'update'), ('installment', 'create'), ('batch_fee_management', 'update'),
+    ]
+    assert entries[0].changes == {'amount': ['500.00', '400.00']}
+    assert entries[2].changes == {'discount': ['0.00', '100.00']}
+    assert {entry.actor_id for entry in entries} == {user.pk}
+    assert list(audit.for_student(user.pk).values_list('object_id', flat=True)) == [99, first.pk]
+
+
+@pytest.mark.django_db
+def test_rolled_back_changes_leave_no_entry(django_capture_on_commit_callbacks):
+    student_fee = create_student_fee(installments=['500.00'])
+    installment = student_fee.installments.get()
+
+    with audit.buffered():
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(ValueError):
+                with transaction.atomic():
+                    audit.record('installment', installment.pk, {'status': ['pending', 'paid']}, 1)
+                    raise ValueError
+            audit.record('installment', installment.pk, {}, 1)
+
+    assert not AuditEntry.objects.exists()
+
+
+@pytest.mark.django_db
+def test_audited_view_attributes_entries_to_the_request_user(django_capture_on_commit_callbacks):
+    student_fee = create_student_fee(installments=['500.00'])
+    user = student_fee.user_franchise.user
+
+    @audit.audited
+    def view(request):
+        with django_capture_on_commit_callbacks(execute=True):
+            audit.record('installment', 1, {'status': ['pending', 'paid']}, student_fee.batch_fee_management.batch_id)
+        assert not AuditEntry.objects.exists()
+        return HttpResponse()
+
+    request = RequestFactory().post('/')
+    request.user = user
+    view(request)
+
+    assert AuditEntry.objects.get().actor_id == user.pk
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Tests for optimistic-concurrency payment posting.
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.db import transaction
+
+from application.concurrency import StaleRecordError, compare_and_swap, retry_on_conflict
+from application.models import Installment, StudentFeeManagement
+from application.payments import post_payment
+from test_utils import create_student_fee
+
+
+@pytest.mark.django_db
+def test_compare_and_swap_rejects_stale_version():
+    student_fee = create_student_fee(installments=['500.00'])
+    first = Installment.objects.get(student_fee_management=student_fee)
+    second = Installment.objects.get(pk=first.pk)
+
+    compare_and_swap(first, payed_amount=Decimal('100.00'))
+    with pytest.raises(StaleRecordError):
+        compare_and_swap(second, payed_amount=Decimal('200.00'))
+
+    first.refresh_from_db()
+    assert first.payed_amount == Decimal('100.00')
+    assert first.version == 1
+
+
+@pytest.mark.django_db
+def test_write_between_read_and_update_is_retried():
+    student_fee = create_student_fee(installments=['1000.00'])
+    installment = Installment.objects.get(student_fee_management=student_fee)
+    reads = []
+
+    @retry_on_conflict
+    def add_late_fee(pk):
+        with transaction.atomic():
+            current = Installment.objects.get(pk=pk)
+            reads.append(current.version)
+            if len(reads) == 1:
+                # Another cashier posts a payment after this read.
+                post_payment(pk, Decimal('10.00'))
+            compare_and_swap(current, amount=current.amount + Decimal('5.00'))
+
+    add_late_fee(installment.pk)
+
+    installment.refresh_from_db()
+    student_fee = StudentFeeManagement.objects.get(pk=student_fee.pk)
+    assert reads == [0, 1]
+    assert installment.amount == Decimal('1005.00')
+    assert installment.payed_amount == Decimal('10.00')
+    assert installment.version == 2
+    assert student_fee.remaining_amount == Decimal('990.00')
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` dashboard queries.
+"""
+
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from application import dashboards
+from test_utils import create_student_fee
+
+
+@pytest.mark.django_db(transaction=True)
+def test_gather_matches_sequential_run():
+    student_fee = create_student_fee(username='asha', fees=Decimal('1000.00'), installments=['400.00'])
+    create_student_fee(username='ravi', batch=student_fee.batch_fee_management.batch)
+
+    sequential = dashboards.run(dashboards.homepage_queries())
+    concurrent = async_to_sync(dashboards.gather)(dashboards.homepage_queries())
+    assert concurrent == sequential
+    assert sequential['total_franchises'] == 1
+    assert sequential['total_students'] == 2
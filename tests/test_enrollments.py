@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` enrollment status cache.
+"""
+
+import pytest
+from common.djangoapps.student.models import CourseEnrollment
+from django.core.cache import cache
+
+from application import enrollments
+from test_utils import create_student_fee
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def students():
+    first = create_student_fee(username='asha')
+    batch = first.batch_fee_management.batch
+    second = create_student_fee(username='ravi', batch=batch)
+    return [first.user_franchise.user, second.user_franchise.user], batch.course_id
+
+
+@pytest.mark.django_db
+def test_statuses_are_filled_in_bulk_then_served_from_cache(students, django_assert_num_queries):
+    (enrolled, other), course_id = students
+    CourseEnrollment.objects.create(user=enrolled, course_id=course_id)
+    pairs = [(enrolled.pk, course_id), (other.pk, course_id)]
+
+    with django_assert_num_queries(1):
+        statuses = enrollments.enrollment_statuses(pairs)
+    with django_assert_num_queries(0):
+        assert enrollments.enrollment_statuses(pairs) == statuses
+        assert enrollments.is_enrolled(other.pk, course_id) is False
+
+    assert statuses == {(enrolled.pk, str(course_id)): True, (other.pk, str(course_id)): False}
+
+
+@pytest.mark.django_db
+def test_enrollment_changes_invalidate_after_commit(students, django_capture_on_commit_callbacks):
+    (user, _), course_id = students
+    assert not enrollments.is_enrolled(user.pk, course_id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        enrollment = CourseEnrollment.objects.create(user=user, course_id=course_id)
+    assert enrollments.is_enrolled(user.pk, course_id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        enrollment.is_active = False
+        enrollment.save()
+    assert not enrollments.is_enrolled(user.pk, course_id)
+
+
+@pytest.mark.django_db
+def test_status_read_before_a_change_does_not_overwrite_it(students, django_capture_on_commit_callbacks):
+    (user, _), course_id = students
+    pair = (user.pk, str(course_id))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        CourseEnrollment.objects.create(user=user, course_id=course_id)
+    # A reader that looked the status up just before the commit stores it afterwards.
+    enrollments.cache_statuses({pair: False})
+
+    assert enrollments.is_enrolled(user.pk, course_id)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` batch fee propagation.
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from application.fees import change_batch_fees
+from application.models import BatchFeeChange, Installment, StudentFeeManagement
+from application.views import batch_edit
+from test_utils import create_student_fee
+
+
+@pytest.mark.django_db
+def test_discount_change_moves_every_balance_in_one_update():
+    first = create_student_fee(username='a', fees=Decimal('1000.00'), installments=['500.00', '500.00'])
+    fee_management = first.batch_fee_management
+    batch = fee_management.batch
+    students = [first] + [
+        create_student_fee(username=f's{i}', installments=['1000.00'], batch=batch) for i in range(5)
+    ]
+    Installment.objects.filter(student_fee_management=first).update(payed_amount=Decimal('300.00'))
+
+    with CaptureQueriesContext(connection) as queries:
+        change = change_batch_fees(fee_management, discount=Decimal('200.00'))
+    updates = [q['sql'] for q in queries.captured_queries if 'application_studentfeemanagement' in q['sql']]
+    assert len(updates) == 1
+
+    balances = dict(StudentFeeManagement.objects.values_list('pk', 'remaining_amount'))
+    assert balances[first.pk] == Decimal('200.00')
+    assert {balances[student.pk] for student in students[1:]} == {Decimal('800.00')}
+    assert change.students_updated == 6
+    assert (change.old_discount, change.new_discount) == (Decimal('0.00'), Decimal('200.00'))
+    assert fee_management.remaining_amount == Decimal('800.00')
+
+
+@pytest.mark.django_db
+def test_fee_change_is_audited_and_noop_is_skipped():
+    student_fee = create_student_fee(fees=Decimal('1000.00'))
+    fee_management = student_fee.batch_fee_management
+
+    change = change_batch_fees(fee_management, fees=Decimal('1200.00'))
+    assert change_batch_fees(fee_management, fees=Decimal('1200.00')) is None
+
+    assert list(BatchFeeChange.objects.values_list('old_fees', 'new_fees')) == [
+        (Decimal('1000.00'), Decimal('1200.00')),
+    ]
+    assert change.students_updated == 1
+    fee_management.batch.refresh_from_db()
+    assert fee_management.batch.fees == Decimal('1200.00')
+    student_fee.refresh_from_db()
+    assert student_fee.remaining_amount == Decimal('1200.00')
+
+
+@pytest.mark.django_db
+def test_batch_edit_view_moves_balances_with_the_fees(admin_user, settings):
+    settings.APPLICATION_READ_REPLICA = None
+    student_fee = create_student_fee(fees=Decimal('1000.00'), installments=['1000.00'])
+    Installment.objects.filter(student_fee_management=student_fee).update(payed_amount=Decimal('100.00'))
+    batch = student_fee.batch_fee_management.batch
+    kwargs = {'franchise_pk': batch.franchise_id, 'batch_pk': batch.pk}
+    request = RequestFactory().post(reverse('application:batch_edit', kwargs=kwargs), {
+        'batch_no': 'B-renamed', 'fees': '1500.00', 'course': batch.course_id,
+    })
+    request.user = admin_user
+    request._messages = CookieStorage(request)  # pylint: disable=protected-access
+
+    response = batch_edit(request, **kwargs)
+
+    assert response.status_code == 302
+    batch.refresh_from_db()
+    assert (batch.batch_no, batch.fees) == ('B-renamed', Decimal('1500.00'))
+    student_fee.refresh_from_db()
+    assert student_fee.remaining_amount == Decimal('1400.00')
+    assert BatchFeeChange.objects.get().changed_by == admin_user
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` cash-flow forecast.
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from django.test import RequestFactory
+from django.urls import reverse
+
+from application.forecast import forecast, load_open_installments, on_time_ratios
+from application.models import Installment
+from application.views import cash_flow_forecast
+from test_utils import create_student_fee
+
+TODAY = date(2026, 10, 21)  # A Wednesday; forecast weeks start on Monday 2026-10-19.
+
+
+def columns(due_dates, outstanding, franchise_ids, course_codes, courses):
+    return {
+        'due_date': np.array(due_dates, dtype='datetime64[D]'),
+        'outstanding': np.array(outstanding, dtype=np.float64),
+        'franchise_id': np.array(franchise_ids, dtype=np.int64),
+        'course_code': np.array(course_codes, dtype=np.int64),
+        'courses': courses,
+    }
+
+
+def test_overdue_and_pending_amounts_land_in_weeks():
+    data = columns(
+        ['2026-09-01', '2026-10-28', '2026-10-29'],
+        [100.0, 200.0, 50.0],
+        [1, 1, 2],
+        [0, 0, 1],
+        ['course-v1:A+A+A', 'course-v1:B+B+B'],
+    )
+
+    rows = forecast(data, today=TODAY, weeks=4)
+
+    assert rows == [
+        {'week_start': '2026-10-19', 'franchise_id': 1, 'course_id': 'course-v1:A+A+A', 'expected_amount': 100.0},
+        {'week_start': '2026-10-26', 'franchise_id': 1, 'course_id': 'course-v1:A+A+A', 'expected_amount': 200.0},
+        {'week_start': '2026-10-26', 'franchise_id': 2, 'course_id': 'course-v1:B+B+B', 'expected_amount': 50.0},
+    ]
+
+
+def test_on_time_ratio_pushes_remainder_by_late_lag():
+    data = columns(['2026-10-21'], [100.0], [7], [0], ['course-v1:A+A+A'])
+
+    rows = forecast(data, today=TODAY, weeks=2, ratios={7: 0.75}, late_lag_days=7)
+
+    assert [(row['week_start'], row['expected_amount']) for row in rows] == [
+        ('2026-10-19', 75.0),
+        ('2026-10-26', 25.0),
+    ]
+
+
+def test_amounts_past_horizon_are_dropped():
+    data = columns(['2027-06-01'], [100.0], [1], [0], ['course-v1:A+A+A'])
+
+    assert not forecast(data, today=TODAY, weeks=4)
+
+
+@pytest.mark.django_db
+def test_load_open_installments_reads_outstanding_paise():
+    student_fee = create_student_fee(installments=['300.00', '200.00', '100.00'])
+    first, second, third = Installment.objects.filter(student_fee_management=student_fee).order_by('id')
+    Installment.objects.filter(pk=first.pk).update(payed_amount=Decimal('120.50'))
+    Installment.objects.filter(pk=third.pk).update(status='paid', payed_amount=Decimal('100.00'))
+
+    data = load_open_installments()
+
+    assert sorted(data['outstanding'].tolist()) == [179.5, 200.0]
+    assert data['franchise_id'].tolist() == [student_fee.user_franchise.franchise_id] * 2
+    assert data['courses'] == [str(student_fee.batch_fee_management.batch.course_id)]
+    assert data['due_date'].astype(str).tolist() == ['2025-01-01', '2025-01-01']
+
+
+@pytest.mark.django_db
+def test_on_time_ratios_count_installments_paid_by_due_date():
+    student_fee = create_student_fee(installments=['100.00'] * 4)
+    installments = list(Installment.objects.filter(student_fee_management=student_fee).order_by('id'))
+    Installment.objects.filter(pk=installments[0].pk).update(status='paid', payment_date=date(2024, 12, 30))
+    Installment.objects.filter(pk=installments[1].pk).update(status='paid', payment_date=date(2025, 1, 9))
+
+    ratios = on_time_ratios(today=date(2025, 3, 1))
+
+    assert ratios == {student_fee.user_franchise.franchise_id: 0.25}
+    assert on_time_ratios(today=date(2026, 3, 1)) == {}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query, status', [
+    ({}, 200),
+    ({'late_lag_days': '-1'}, 400),
+    ({'default_ratio': 'nan'}, 400),
+    ({'ratio_1': 'inf'}, 400),
+    ({'weeks': 'many'}, 400),
+])
+def test_forecast_view_validates_parameters(settings, admin_user, query, status):
+    settings.APPLICATION_READ_REPLICA = None
+    create_student_fee(installments=['100.00'])
+    request = RequestFactory().get(reverse('application:cash_flow_forecast'), query)
+    request.user = admin_user
+
+    response = cash_flow_forecast(request)
+
+    assert response.status_code == status
+    if status == 200:
+        assert json.loads(response.content)['forecast']
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` inline installment update endpoint.
+"""
+
+import json
+from decimal import Decimal
+
+import pytest
+from django.test import RequestFactory
+from django.urls import reverse
+
+from application import outbox
+from application.models import AuditEntry, Installment, OutboxEvent, Payment
+from application.views import update_installment
+from test_utils import create_student_fee
+
+
+@pytest.fixture(autouse=True)
+def primary_only(settings):
+    settings.APPLICATION_READ_REPLICA = None
+
+
+@pytest.fixture
+def student_fee():
+    return create_student_fee(installments=['300.00', '200.00'])
+
+
+def post(admin_user, student_fee, installment, data):
+    user_franchise = student_fee.user_franchise
+    kwargs = {
+        'franchise_pk': user_franchise.franchise_id,
+        'batch_pk': user_franchise.batch_id,
+        'user_pk': user_franchise.user_id,
+        'installment_pk': installment.pk,
+    }
+    request = RequestFactory().post(reverse('application:update_installment', kwargs=kwargs), data)
+    request.user = admin_user
+    response = update_installment(request, **kwargs)
+    return response, json.loads(response.content)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_update_records_payment_and_returns_row_and_totals(admin_user, student_fee):
+    first = student_fee.installments.order_by('pk').first()
+
+    # The view's transaction really commits here, so its audit entry is written.
+    response, body = post(admin_user, student_fee, first, {
+        'status': 'paid', 'payed_amount': '300.00', 'version': '0', 'method': 'upi',
+    })
+
+    assert response.status_code == 200
+    assert body['error'] is None
+    assert body['total_paid'] == '300.00'
+    assert body['total_pending'] == '200.00'
+    assert f'id="installment-{first.pk}"' in body['row']
+    assert '<option value="paid" selected>' in body['row']
+    first.refresh_from_db()
+    assert first.status == 'paid'
+    assert first.payment_date is not None
+    assert Payment.objects.get(installment=first).method == 'upi'
+    assert OutboxEvent.objects.filter(event_type=outbox.INSTALLMENT_PAID).count() == 1
+    entry = AuditEntry.objects.get(model='installment', object_id=first.pk)
+    assert entry.actor_id == admin_user.pk
+    assert entry.changes['status'] == ['pending', 'paid']
+
+
+@pytest.mark.django_db
+def test_stale_version_is_rejected_with_the_current_row(admin_user, student_fee):
+    first = student_fee.installments.order_by('pk').first()
+    Installment.objects.filter(pk=first.pk).update(version=3)
+
+    response, body = post(admin_user, student_fee, first, {
+        'status': 'paid', 'payed_amount': '300.00', 'version': '0',
+    })
+
+    assert response.status_code == 409
+    assert 'changed by another user' in body['error']
+    assert f'name="version_{first.pk}" value="3"' in body['row']
+    assert Decimal(str(body['total_paid'])) == 0
+    assert not Payment.objects.exists()
+    first.refresh_from_db()
+    assert first.status == 'pending'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('data, error', [
+    ({'status': 'paid', 'payed_amount': 'abc'}, 'Invalid payed amount.'),
+    ({'status': 'settled', 'payed_amount': '10.00'}, 'Invalid status value.'),
+    ({'status': 'pending', 'payed_amount': '-1'}, 'Payed amount must be greater than or equal to 0.'),
+    ({'status': 'paid', 'payed_amount': '0'}, 'Payed amount must be greater than zero to mark as paid.'),
+])
+def test_invalid_input_is_rejected(admin_user, student_fee, data, error):
+    first = student_fee.installments.order_by('pk').first()
+
+    response, body = post(admin_user, student_fee, first, {**data, 'version': '0'})
+
+    assert response.status_code == 400
+    assert body['error'] == error
+    assert not Payment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_installments_are_paid_in_order(admin_user, student_fee):
+    first, second = student_fee.installments.order_by('pk')
+    Installment.objects.filter(pk=second.pk).update(due_date='2025-02-01')
+
+    response, body = post(admin_user, student_fee, second, {
+        'status': 'paid', 'payed_amount': '200.00', 'version': '0',
+    })
+
+    assert response.status_code == 400
+    assert body['error'] == 'Payments must be marked in order.'
+    second.refresh_from_db()
+    assert second.status == 'pending'
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` homepage KPIs.
+"""
+
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+
+from application import kpis
+from application.models import Installment
+from application.payments import post_payment
+from test_utils import create_student_fee
+
+TODAY = date(2026, 10, 19)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_compute_in_two_queries(django_assert_num_queries):
+    late = create_student_fee(username='late', installments=['300.00', '200.00'])
+    current = create_student_fee(username='current', installments=['1000.00'])
+    Installment.objects.filter(student_fee_management=current).update(due_date=date(2026, 12, 1))
+    first, second = late.installments.order_by('pk')
+    post_payment(first.pk, Decimal('300.00'), payment_date=TODAY)
+    post_payment(second.pk, Decimal('50.00'), payment_date=date(2026, 10, 2))
+    post_payment(second.pk, Decimal('25.00'), payment_date=date(2026, 9, 30))
+
+    with django_assert_num_queries(2):
+        result = kpis.compute(today=TODAY)
+
+    assert result['collected_today'] == Decimal('300.00')
+    assert result['collected_month'] == Decimal('350.00')
+    assert result['outstanding'] == Decimal('1125.00')
+    assert result['overdue'] == Decimal('125.00')
+    assert result['overdue_students'] == 1
+    assert [row['outstanding'] for row in result['top_franchises']] == [Decimal('1000.00'), Decimal('125.00')]
+
+
+def test_stale_kpis_are_served_while_one_refresh_runs(monkeypatch):
+    refreshed = threading.Event()
+    calls = []
+
+    def fake_refresh():
+        calls.append(1)
+        refreshed.set()
+
+    monkeypatch.setattr(kpis, '_refresh_in_background', fake_refresh)
+    stale = {'outstanding': Decimal('1.00')}
+    cache.set(kpis.CACHE_KEY, {'computed_at': time.time() - 3600, 'kpis': stale})
+
+    assert kpis.homepage_kpis() == stale
+    assert refreshed.wait(5)
+    assert kpis.homepage_kpis() == stale
+    assert calls == [1]
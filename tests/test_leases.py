@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` job leases.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from application import leases
+from application.models import JobLease, OutboxEvent
+from application.reminders import mark_overdue
+from test_utils import create_student_fee
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Run in separate processes, each with its own connection to the same SQLite file.
+WORKER = """
+import json, os, sys, time
+
+import django
+from django.conf import settings
+
+settings.DATABASES = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': sys.argv[1], 'OPTIONS': {'timeout': 30}},
+}
+settings.DATABASE_ROUTERS = []
+django.setup()
+
+from django.db import connection
+from application import leases
+from application.models import JobLease, OutboxEvent
+from application.reminders import mark_overdue
+from test_utils import create_student_fee
+
+mode = sys.argv[2]
+if mode == 'create':
+    with connection.schema_editor() as editor:
+        editor.create_model(JobLease)
+elif mode == 'compete':
+    runs = []
+    deadline = time.time() + float(sys.argv[3])
+    while time.time() < deadline:
+        lease = leases.acquire('job', ttl=5)
+        if lease:
+            started = time.time()
+            time.sleep(0.02)
+            lease.verify()
+            runs.append([lease.token, started, time.time()])
+            lease.release()
+        time.sleep(0.005)
+    print(json.dumps(runs))
+elif mode == 'crash':
+    print(json.dumps(leases.acquire('job', ttl=1).token), flush=True)
+    os._exit(0)
+elif mode == 'take_over':
+    started = time.time()
+    while (lease := leases.acquire('job', ttl=1)) is None:
+        time.sleep(0.05)
+    print(json.dumps([lease.token, time.time() - started]))
+"""
+
+
+def start_worker(db_path, *args):
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'test_settings', 'PYTHONPATH': str(ROOT)}
+    return subprocess.Popen(
+        [sys.executable, '-c', WORKER, str(db_path), *map(str, args)],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True,
+    )
+
+
+def run_worker(db_path, *args):
+    worker = start_worker(db_path, *args)
+    output, _ = worker.communicate(timeout=60)
+    assert worker.returncode == 0
+    return json.loads(output.strip().splitlines()[-1]) if output.strip() else None
+
+
+@pytest.fixture
+def lease_db(tmp_path):
+    db_path = tmp_path / 'leases.db'
+    run_worker(db_path, 'create')
+    return db_path
+
+
+@pytest.mark.django_db
+def test_lease_is_exclusive_until_released_or_expired():
+    first = leases.acquire('job', ttl=60)
+    assert first.token == 1
+    assert leases.acquire('job', ttl=60) is None
+    assert leases.holder('job') == first.owner
+
+    first.release()
+    second = leases.acquire('job', ttl=60)
+    assert second.token == 2
+
+    JobLease.objects.filter(name='job').update(expires_at=timezone.now() - timedelta(seconds=1))
+    third = leases.acquire('job', ttl=60)
+    assert third.token == 3
+    with pytest.raises(leases.LeaseLost):
+        second.verify()
+    with pytest.raises(leases.LeaseLost):
+        second.renew()
+    third.renew()
+    third.verify()
+
+
+@pytest.mark.django_db
+def test_exclusive_command_skips_while_another_worker_holds_the_lease():
+    lease = leases.acquire('mark_overdue_installments', ttl=60, owner='other-host:1')
+    out = StringIO()
+    call_command('mark_overdue_installments', stdout=out)
+    assert 'already running on other-host:1' in out.getvalue()
+
+    lease.release()
+    out = StringIO()
+    call_command('mark_overdue_installments', stdout=out)
+    assert 'Marked 0 installments overdue' in out.getvalue()
+    assert leases.holder('mark_overdue_installments') is None
+
+
+@pytest.mark.django_db
+def test_lost_lease_rolls_back_the_step_it_checks():
+    student_fee = create_student_fee(installments=['100.00'])
+    lease = leases.acquire('mark_overdue_installments', ttl=60)
+    JobLease.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    assert leases.acquire('mark_overdue_installments', ttl=60, owner='other-host:1')
+
+    with pytest.raises(leases.LeaseLost):
+        mark_overdue(today=date(2026, 10, 19), verify=lease.verify)
+
+    assert student_fee.installments.get().status == 'pending'
+    assert not OutboxEvent.objects.exists()
+
+
+def test_only_one_process_holds_the_lease_at_a_time(lease_db):
+    workers = [start_worker(lease_db, 'compete', 2) for _ in range(4)]
+    runs = []
+    for worker in workers:
+        output, _ = worker.communicate(timeout=60)
+        assert worker.returncode == 0
+        runs.extend(json.loads(output.strip().splitlines()[-1]))
+
+    runs.sort(key=lambda run: run[1])
+    assert runs
+    assert [token for token, _, _ in runs] == list(range(1, len(runs) + 1))
+    for (_, _, ended), (_, started, _) in zip(runs, runs[1:]):
+        assert ended <= started
+
+
+def test_crashed_holder_lease_expires_and_is_fenced(lease_db):
+    crashed_token = run_worker(lease_db, 'crash')
+    token, waited = run_worker(lease_db, 'take_over')
+
+    assert token == crashed_token + 1
+    assert waited < 3
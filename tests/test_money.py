@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` integer-paise money fields.
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.db.models import F, Sum
+
+from application.models import Installment, Payment, StudentFeeManagement
+from application.money import Money, paise_of, to_paise
+from application.payments import post_payment, post_payments
+from test_utils import create_student_fee
+
+
+def test_money_rounds_to_whole_paise():
+    assert Money('10.005') == Decimal('10.01')
+    assert Money(0.1 + 0.2) == Decimal('0.30')
+    assert Money.from_paise(12345) == Decimal('123.45')
+    assert to_paise(Decimal('123.45')) == 12345
+    assert to_paise('0.015') == 2
+    assert str(Money(5)) == '5.00'
+
+
+@pytest.mark.django_db
+def test_amounts_are_stored_as_paise():
+    student_fee = create_student_fee(installments=['333.33'])
+    installment = Installment.objects.get(student_fee_management=student_fee)
+    assert isinstance(installment.amount, Money)
+    assert installment.amount == Decimal('333.33')
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT amount FROM {Installment._meta.db_table} WHERE id = %s', [installment.pk])
+        assert cursor.fetchone()[0] == 33333
+
+    assert Installment.objects.filter(amount__gte=Decimal('333.33')).exists()
+    assert not Installment.objects.filter(amount__gt=Decimal('333.33')).exists()
+    outstanding = Installment.objects.annotate(paise=paise_of(F('amount') - F('payed_amount'))).get()
+    assert outstanding.paise == 33333
+
+
+@pytest.mark.django_db
+def test_payment_totals_stay_exact():
+    student_fee = create_student_fee(fees=Decimal('1.00'), installments=['1.00'])
+    installment = Installment.objects.get(student_fee_management=student_fee)
+    StudentFeeManagement.objects.filter(pk=student_fee.pk).update(remaining_amount=Decimal('1.00'))
+
+    post_payments([{'installment_id': installment.pk, 'amount': '0.10'} for _ in range(3)])
+    post_payment(installment.pk, Decimal('0.7'))
+
+    installment.refresh_from_db()
+    student_fee.refresh_from_db()
+    assert installment.payed_amount == Decimal('1.00')
+    assert installment.status == 'paid'
+    assert student_fee.remaining_amount == Decimal('0.00')
+    assert Payment.objects.aggregate(total=Sum('amount'))['total'] == Decimal('1.00')
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` transactional outbox.
+"""
+
+import json
+import threading
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from application import outbox
+from application.models import Installment, OutboxEvent
+from application.payments import post_payment
+from application.reminders import mark_overdue
+from test_utils import create_student_fee
+
+
+class RecordingSink:
+    def __init__(self, name, fail=lambda event: False):
+        self.name = name
+        self.fail = fail
+        self.batches = []
+
+    def send(self, events):
+        if any(self.fail(event) for event in events):
+            raise ConnectionError("sink down")
+        self.batches.append(events)
+
+
+@pytest.mark.django_db
+def test_settling_payment_publishes_one_event():
+    student_fee = create_student_fee(installments=['300.00'])
+    installment = student_fee.installments.get()
+
+    post_payment(installment.pk, Decimal('100.00'), payment_date=date(2026, 1, 5))
+    assert not OutboxEvent.objects.filter(event_type=outbox.INSTALLMENT_PAID).exists()
+    post_payment(installment.pk, Decimal('200.00'), payment_date=date(2026, 1, 6))
+    post_payment(installment.pk, Decimal('10.00'), payment_date=date(2026, 1, 7))
+
+    assert OutboxEvent.objects.filter(event_type=outbox.PAYMENT_RECORDED).count() == 3
+    [event] = OutboxEvent.objects.filter(event_type=outbox.INSTALLMENT_PAID)
+    assert event.payload['installment_id'] == installment.pk
+    assert event.payload['user_id'] == student_fee.user_franchise.user_id
+    assert event.payload['status'] == 'paid'
+
+
+@pytest.mark.django_db
+def test_drain_delivers_in_order_and_marks_delivered():
+    for number in range(5):
+        outbox.publish('test.event', {'number': number})
+    sink = RecordingSink('recording')
+
+    assert outbox.drain([sink], batch_size=2) == 5
+
+    assert [len(batch) for batch in sink.batches] == [2, 2, 1]
+    assert [event['payload']['number'] for batch in sink.batches for event in batch] == [0, 1, 2, 3, 4]
+    assert not OutboxEvent.objects.filter(delivered_at__isnull=True).exists()
+    assert outbox.drain([sink]) == 0
+
+
+@pytest.mark.django_db
+def test_failing_sink_is_retried_alone():
+    outbox.publish('test.event', {'number': 1})
+    healthy, flaky = RecordingSink('healthy'), RecordingSink('flaky', fail=lambda event: True)
+
+    assert outbox.drain([healthy, flaky]) == 0
+
+    event = OutboxEvent.objects.get()
+    assert (event.delivered_at, event.delivered_to, event.attempts) == (None, ['healthy'], 1)
+    assert event.last_error == 'flaky: ConnectionError: sink down'
+    assert outbox.drain([healthy, flaky]) == 0  # not due for a retry yet
+
+    OutboxEvent.objects.update(next_attempt_at=None)
+    flaky.fail = lambda event: False
+    assert outbox.drain([healthy, flaky]) == 1
+    assert len(healthy.batches) == len(flaky.batches) == 1
+
+
+@pytest.mark.django_db
+def test_rejected_event_does_not_hold_back_the_batch():
+    for number in range(3):
+        outbox.publish('test.event', {'number': number})
+    sink = RecordingSink('recording', fail=lambda event: event['payload']['number'] == 1)
+
+    assert outbox.drain([sink], max_attempts=1) == 2
+
+    assert [event['payload']['number'] for batch in sink.batches for event in batch] == [0, 2]
+    [failed] = OutboxEvent.objects.filter(delivered_at__isnull=True)
+    assert failed.payload == {'number': 1}
+    assert failed.failed_at is not None
+    assert outbox.drain([sink]) == 0
+
+
+@pytest.mark.django_db
+def test_file_sink_appends_json_lines(tmp_path):
+    outbox.publish('test.event', {'amount': Decimal('12.50')})
+    path = tmp_path / 'events.jsonl'
+
+    outbox.drain([outbox.FileSink(str(path))])
+
+    [line] = path.read_text().splitlines()
+    assert json.loads(line)['payload'] == {'amount': '12.50'}
+
+
+@pytest.mark.django_db
+def test_http_sink_posts_batches():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):  # pylint: disable=invalid-name
+            received.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        outbox.publish('test.event', {'number': 1})
+        outbox.drain([outbox.HttpSink(f'http://127.0.0.1:{server.server_port}/events')])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    [body] = received
+    assert [event['type'] for event in body['events']] == ['test.event']
+
+
+@pytest.mark.django_db
+def test_mark_overdue_publishes_events():
+    student_fee = create_student_fee(installments=['100.00', '200.00', '300.00'])
+    late, paid, upcoming = student_fee.installments.order_by('pk')
+    Installment.objects.filter(pk=paid.pk).update(status='paid')
+    Installment.objects.filter(pk=upcoming.pk).update(due_date=date(2026, 12, 1))
+
+    assert mark_overdue(today=date(2026, 10, 19), chunk_size=1) == 1
+
+    late.refresh_from_db()
+    assert late.status == 'overdue'
+    [event] = OutboxEvent.objects.all()
+    assert (event.event_type, event.payload['installment_id']) == (outbox.INSTALLMENT_OVERDUE, late.pk)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` payment ledger.
+"""
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import ProtectedError
+from django.utils import timezone
+
+from application.models import Installment, Payment, StudentFeeManagement
+from application.payments import post_payment, post_payments
+from test_utils import create_student_fee
+
+
+@pytest.mark.django_db
+def test_partial_payments_accumulate_and_settle():
+    student_fee = create_student_fee(installments=['300.00'])
+    installment = Installment.objects.get(student_fee_management=student_fee)
+
+    post_payment(installment.pk, Decimal('100.00'))
+    installment.refresh_from_db()
+    assert installment.payed_amount == Decimal('100.00')
+    assert installment.status == 'pending'
+
+    post_payment(installment.pk, Decimal('200.00'), method='upi')
+    installment.refresh_from_db()
+    assert installment.payed_amount == Decimal('300.00')
+    assert installment.status == 'paid'
+    assert installment.payment_date is not None
+    assert installment.payments.count() == 2
+    assert StudentFeeManagement.objects.get(pk=student_fee.pk).remaining_amount == Decimal('700.00')
+
+
+@pytest.mark.django_db
+def test_idempotency_key_posts_once():
+    student_fee = create_student_fee(installments=['300.00'])
+    installment = Installment.objects.get(student_fee_management=student_fee)
+
+    first = post_payment(installment.pk, Decimal('50.00'), idempotency_key='receipt-1')
+    second = post_payment(installment.pk, Decimal('50.00'), idempotency_key='receipt-1')
+
+    assert first.pk == second.pk
+    installment.refresh_from_db()
+    assert installment.payed_amount == Decimal('50.00')
+
+
+@pytest.mark.django_db
+def test_payments_are_append_only():
+    student_fee = create_student_fee(installments=['300.00'])
+    payment = post_payment(Installment.objects.get(student_fee_management=student_fee).pk, Decimal('10.00'))
+
+    payment.amount = Decimal('20.00')
+    with pytest.raises(ValueError):
+        payment.save()
+
+
+@pytest.mark.django_db
+def test_reversal_reopens_a_paid_installment():
+    student_fee = create_student_fee(installments=['300.00'])
+    installment = Installment.objects.get(student_fee_management=student_fee)
+    post_payment(installment.pk, Decimal('300.00'))
+
+    post_payment(installment.pk, Decimal('-100.00'), method='adjustment')
+
+    installment.refresh_from_db()
+    assert installment.payed_amount == Decimal('200.00')
+    assert installment.status == 'overdue'
+    assert installment.payment_date is None
+    assert StudentFeeManagement.objects.get(pk=student_fee.pk).remaining_amount == Decimal('800.00')
+    with pytest.raises(ProtectedError):
+        installment.delete()
+
+
+@pytest.mark.django_db
+def test_unknown_installment_is_rejected_before_posting():
+    with pytest.raises(ValueError, match='Unknown installment ids: 404'):
+        post_payment(404, Decimal('10.00'))
+    with pytest.raises(ValueError, match='Unknown installment ids: 404'):
+        post_payments([{'installment_id': 404, 'amount': '10.00'}])
+    assert not Payment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_posting_skips_known_and_repeated_keys():
+    student_fee = create_student_fee(installments=['300.00', '300.00'])
+    first, second = Installment.objects.filter(student_fee_management=student_fee).order_by('id')
+    post_payment(first.pk, Decimal('10.00'), idempotency_key='r-1')
+
+    created = post_payments([
+        {'installment_id': first.pk, 'amount': '10.00', 'idempotency_key': 'r-1'},
+        {'installment_id': first.pk, 'amount': '40.00', 'idempotency_key': 'r-2'},
+        {'installment_id': second.pk, 'amount': '300.00', 'idempotency_key': 'r-3', 'method': 'cheque'},
+        {'installment_id': second.pk, 'amount': '300.00', 'idempotency_key': 'r-3'},
+    ])
+
+    assert len(created) == 2
+    assert Payment.objects.count() == 3
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.payed_amount == Decimal('50.00')
+    assert second.status == 'paid'
+    assert StudentFeeManagement.objects.get(pk=student_fee.pk).remaining_amount == Decimal('650.00')
+
+
+@pytest.mark.django_db
+def test_import_receipts_parses_payment_dates(tmp_path):
+    student_fee = create_student_fee(installments=['300.00', '300.00'])
+    first, second = Installment.objects.filter(student_fee_management=student_fee).order_by('id')
+    path = tmp_path / 'receipts.csv'
+    path.write_text(
+        'installment_id,amount,payment_date,idempotency_key\n'
+        f'{first.pk},300.00,2026-01-05,r-1\n'
+        f'{second.pk},100.00,,r-2\n'
+    )
+
+    call_command('import_receipts', str(path), stdout=StringIO())
+
+    first.refresh_from_db()
+    assert first.status == 'paid'
+    assert first.payment_date == date(2026, 1, 5)
+    assert Payment.objects.get(idempotency_key='r-1').payment_date == date(2026, 1, 5)
+    assert Payment.objects.get(idempotency_key='r-2').payment_date == timezone.now().date()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('row', ['{pk},abc,2026-01-05', '{pk},10.00,05/01/2026'])
+def test_import_receipts_rejects_bad_rows(tmp_path, row):
+    student_fee = create_student_fee(installments=['300.00'])
+    installment = Installment.objects.get(student_fee_management=student_fee)
+    path = tmp_path / 'receipts.csv'
+    path.write_text('installment_id,amount,payment_date\n' + row.format(pk=installment.pk) + '\n')
+
+    with pytest.raises(CommandError, match='line 2'):
+        call_command('import_receipts', str(path), stdout=StringIO())
+    assert not Payment.objects.exists()
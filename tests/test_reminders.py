@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` fee reminder pagination.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.http import QueryDict
+
+from application.models import Installment
+from application.reminders import InvalidReminderQuery, reminder_page
+from test_utils import create_student_fee
+
+TODAY = date(2026, 3, 31)
+
+
+def walk(query, kind='overdue', page_size=3):
+    params = QueryDict(query, mutable=True)
+    seen = []
+    while True:
+        page, cursor = reminder_page(params, kind, page_size=page_size, today=TODAY)
+        seen.extend(page)
+        if not cursor:
+            return seen
+        params['cursor'] = cursor
+
+
+@pytest.fixture
+def installments():
+    student_fee = create_student_fee(installments=['100.00'] * 8)
+    rows = list(Installment.objects.filter(student_fee_management=student_fee).order_by('id'))
+    # Pairs share a due date so ties are broken by id.
+    for index, installment in enumerate(rows):
+        installment.due_date = TODAY - timedelta(days=40 - (index // 2) * 10)
+        installment.amount = Decimal(100 + (index % 3) * 50)
+        installment.save()
+    rows[-1].due_date = TODAY + timedelta(days=2)
+    rows[-1].save()
+    return rows
+
+
+@pytest.mark.django_db
+def test_pages_cover_all_overdue_rows_in_keyset_order(installments):
+    seen = walk('')
+
+    assert [i.pk for i in seen] == [i.pk for i in installments[:7]]
+
+
+@pytest.mark.django_db
+def test_descending_amount_sort_breaks_ties_by_id(installments):
+    seen = walk('sort=-amount')
+
+    expected = sorted(installments[:7], key=lambda i: (i.amount, i.pk), reverse=True)
+    assert [i.pk for i in seen] == [i.pk for i in expected]
+
+
+@pytest.mark.django_db
+def test_each_page_is_one_query(installments, django_assert_num_queries):
+    params = QueryDict('min_days_overdue=15&min_amount=100', mutable=True)
+    with django_assert_num_queries(1):
+        page, cursor = reminder_page(params, page_size=2, today=TODAY)
+
+    assert len(page) == 2
+    assert cursor
+
+
+@pytest.mark.django_db
+def test_upcoming_window_is_configurable(installments):
+    assert walk('upcoming_days=1', kind='upcoming') == []
+    assert [i.pk for i in walk('upcoming_days=2', kind='upcoming')] == [installments[-1].pk]
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(InvalidReminderQuery):
+        reminder_page(QueryDict('cursor=nonsense'), today=TODAY)
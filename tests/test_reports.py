@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` aggregate reports.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from application.models import Installment
+from application.reports import aging_report, batch_fee_summaries
+from test_utils import create_student_fee
+
+TODAY = date(2026, 3, 31)
+
+
+@pytest.mark.django_db
+def test_aging_buckets_by_days_overdue(django_assert_num_queries):
+    student_fee = create_student_fee(installments=['100.00', '200.00', '300.00', '400.00', '500.00'])
+    days_overdue = [10, 45, 75, 120, -5]
+    for installment, days in zip(Installment.objects.filter(student_fee_management=student_fee).order_by('id'),
+                                 days_overdue):
+        installment.due_date = TODAY - timedelta(days=days)
+        installment.payed_amount = Decimal('50.00')
+        installment.save()
+
+    with django_assert_num_queries(1):
+        [row] = aging_report('franchise', today=TODAY)
+
+    assert row['aged_0_30'] == Decimal('50.00')
+    assert row['aged_31_60'] == Decimal('150.00')
+    assert row['aged_61_90'] == Decimal('250.00')
+    assert row['aged_90_plus'] == Decimal('350.00')
+    assert row['total'] == Decimal('800.00')
+
+    batch = student_fee.batch_fee_management.batch
+    [student_row] = aging_report('student', franchise_id=batch.franchise_id, batch_id=batch.pk, today=TODAY)
+    assert student_row['key'] == student_fee.user_franchise.user_id
+    assert student_row['batch_pk'] == batch.pk
+
+
+@pytest.mark.django_db
+def test_batch_fee_summary_in_one_query(django_assert_num_queries):
+    student_fee = create_student_fee(username='a', installments=['100.00', '200.00'])
+    batch = student_fee.batch_fee_management.batch
+    create_student_fee(username='b', installments=['300.00'], batch=batch)
+    first, second = Installment.objects.filter(student_fee_management=student_fee).order_by('id')
+    Installment.objects.filter(pk=first.pk).update(status='paid', payed_amount=Decimal('100.00'))
+    Installment.objects.filter(pk=second.pk).update(payed_amount=Decimal('50.00'), due_date=TODAY - timedelta(days=1))
+    Installment.objects.exclude(pk__in=[first.pk, second.pk]).update(due_date=TODAY + timedelta(days=1))
+
+    with django_assert_num_queries(1):
+        [summary] = list(batch_fee_summaries(batch.franchise_id, today=TODAY))
+
+    assert summary.student_count == 2
+    assert summary.total_collected == Decimal('150.00')
+    assert summary.total_outstanding == Decimal('450.00')
+    assert summary.overdue_count == 1
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` daily snapshot rollups.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from application.models import DailyBatchSnapshot, Installment, StudentFeeManagement
+from application.payments import post_payment
+from application.rollups import rollup_range, trend
+from test_utils import create_student_fee
+
+START = date(2026, 1, 1)
+
+
+def day(offset):
+    return START + timedelta(days=offset)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('chunk_days', [1, 2, 31])
+def test_backfill_matches_regardless_of_chunk_size(chunk_days):
+    student_fee = create_student_fee(installments=['300.00', '300.00'])
+    first, second = Installment.objects.filter(student_fee_management=student_fee).order_by('id')
+    Installment.objects.filter(pk=first.pk).update(due_date=day(1))
+    Installment.objects.filter(pk=second.pk).update(due_date=day(3))
+    post_payment(first.pk, Decimal('100.00'), payment_date=day(1))
+    post_payment(first.pk, Decimal('250.00'), payment_date=day(2))
+
+    assert rollup_range(day(0), day(4), chunk_days=chunk_days) == 5
+
+    snapshots = DailyBatchSnapshot.objects.order_by('date')
+    assert [s.collected for s in snapshots] == [0, 100, 250, 0, 0]
+    assert [s.outstanding for s in snapshots] == [600, 500, 250, 250, 250]
+    assert [s.overdue for s in snapshots] == [0, 0, 0, 0, 250]
+    assert {s.students for s in snapshots} == {1}
+
+
+@pytest.mark.django_db
+def test_rerun_replaces_snapshots_and_trend_sums_batches():
+    student_fee = create_student_fee(username='a', installments=['100.00'])
+    batch = student_fee.batch_fee_management.batch
+    create_student_fee(username='b', installments=['50.00'], batch=batch)
+
+    rollup_range(day(0), day(1))
+    rollup_range(day(0), day(1))
+
+    assert DailyBatchSnapshot.objects.count() == 2
+    rows = trend(franchise_id=batch.franchise_id)
+    assert [(row['date'], row['students'], row['outstanding']) for row in rows] == [
+        (day(0), 2, Decimal('150.00')),
+        (day(1), 2, Decimal('150.00')),
+    ]
+
+
+@pytest.mark.django_db
+def test_backfill_counts_students_from_their_registration_date():
+    student_fee = create_student_fee(username='a', installments=['100.00'])
+    batch = student_fee.batch_fee_management.batch
+    late = create_student_fee(username='b', installments=['50.00'], batch=batch)
+    StudentFeeManagement.objects.filter(pk=late.pk).update(registration_date=day(1))
+
+    rollup_range(day(0), day(2))
+
+    rows = trend(batch_id=batch.pk)
+    assert [(row['students'], row['outstanding'], row['approximate']) for row in rows] == [
+        (1, Decimal('100.00'), True),
+        (2, Decimal('150.00'), True),
+        (2, Decimal('150.00'), True),
+    ]
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` read-replica routing.
+"""
+
+import pytest
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import ResolverMatch
+
+from application.models import Franchise
+from application.routers import STICKY_COOKIE, ReplicaStickinessMiddleware, read_replica, use_replica
+
+DATABASES = ['default', 'replica']
+
+
+@read_replica
+def franchise_names(request):
+    return HttpResponse(','.join(Franchise.objects.order_by('name').values_list('name', flat=True)))
+
+
+@pytest.fixture(autouse=True)
+def replica(settings):
+    settings.APPLICATION_READ_REPLICA = 'replica'
+
+
+@pytest.fixture
+def franchises():
+    Franchise.objects.create(name='Primary', coordinator='A', contact_no='1', email='p@example.com')
+    Franchise.objects.using('replica').create(name='Replica', coordinator='B', contact_no='2', email='r@example.com')
+
+
+def test_reads_use_primary_outside_replica_block():
+    assert Franchise.objects.all().db == 'default'
+    with use_replica():
+        assert Franchise.objects.all().db == 'replica'
+    assert Franchise.objects.all().db == 'default'
+
+
+def test_other_apps_are_not_routed():
+    with use_replica():
+        assert User.objects.all().db == 'default'
+
+
+def test_writes_stay_on_primary():
+    with use_replica():
+        assert Franchise.objects.all().select_for_update().db == 'default'
+
+
+def test_replica_disabled_without_setting(settings):
+    settings.APPLICATION_READ_REPLICA = 'missing'
+    with use_replica():
+        assert Franchise.objects.all().db == 'default'
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_get_reads_from_replica(franchises):
+    response = franchise_names(RequestFactory().get('/'))
+    assert response.content == b'Replica'
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_post_reads_from_primary(franchises):
+    response = franchise_names(RequestFactory().post('/'))
+    assert response.content == b'Primary'
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_recent_writer_reads_from_primary(franchises):
+    request = RequestFactory().get('/')
+    request.COOKIES[STICKY_COOKIE] = '1'
+    assert franchise_names(request).content == b'Primary'
+
+
+def test_middleware_pins_client_after_write(settings):
+    settings.APPLICATION_REPLICA_STICKY_SECONDS = 5
+    middleware = ReplicaStickinessMiddleware(lambda request: HttpResponse())
+
+    def request(method, namespaces=('application',)):
+        request = getattr(RequestFactory(), method)('/')
+        request.resolver_match = ResolverMatch(franchise_names, (), {}, namespaces=list(namespaces))
+        return request
+
+    response = middleware(request('post'))
+    assert response.cookies[STICKY_COOKIE]['max-age'] == 5
+
+    response = middleware(request('get'))
+    assert STICKY_COOKIE not in response.cookies
+
+    response = middleware(request('post', namespaces=['admin']))
+    assert STICKY_COOKIE not in response.cookies
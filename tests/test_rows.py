@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` slim report rows.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.http import QueryDict
+
+from application import reminders, rows
+from application.management.commands.benchmark_report_rows import peak_memory
+from application.models import Installment
+from application.reminders import reminder_page
+from test_utils import create_student_fee
+
+TODAY = date(2026, 3, 31)
+
+
+@pytest.mark.django_db
+def test_reminder_page_returns_slim_rows():
+    student_fee = create_student_fee(username='asha', installments=['250.00'])
+    user = student_fee.user_franchise.user
+    user.first_name, user.last_name = 'Asha', 'Rao'
+    user.save()
+
+    page, _ = reminder_page(QueryDict(), today=TODAY)
+
+    row = page[0]
+    assert not hasattr(row, '__dict__')
+    assert row.pk == Installment.objects.get().pk
+    assert (row.student_name, row.amount, row.status_display) == ('Asha Rao', Decimal('250.00'), 'Pending')
+    assert row.batch_no == student_fee.user_franchise.batch.batch_no
+    assert row.course_id == student_fee.user_franchise.batch.course_id
+
+
+@pytest.mark.django_db
+def test_rows_take_less_memory_than_model_instances():
+    student_fee = create_student_fee(installments=['100.00'] * 200)
+    create_student_fee(username='ravi', batch=student_fee.batch_fee_management.batch, installments=['100.00'] * 200)
+    installments = reminders.reminder_queryset(QueryDict(), today=TODAY).order_by('due_date', 'pk')
+
+    count, model_peak = peak_memory(lambda: list(installments.select_related(
+        'student_fee_management__user_franchise__user', reminders.BATCH_PATH,
+    )))
+    row_count, row_peak = peak_memory(
+        lambda: rows.build(rows.ReminderRow, installments, *rows.ReminderRow.columns(reminders.BATCH_PATH))
+    )
+
+    assert count == row_count == 400
+    assert row_peak < model_peak / 2
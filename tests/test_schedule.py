@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` installment schedule engine.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from common.djangoapps.student.models import CourseEnrollment
+
+from application.models import Installment, InstallmentTemplate, StudentFeeManagement
+from application.schedule import due_dates, preview_batch, student_schedule
+from test_utils import create_student_fee
+
+
+def test_due_dates_accumulate_periods_per_student():
+    dates = due_dates([date(2026, 1, 31), date(2026, 2, 10), None], [30, 30, 15])
+
+    assert dates.dtype == np.dtype('datetime64[D]')
+    assert dates[:2].astype(str).tolist() == [
+        ['2026-03-02', '2026-04-01', '2026-04-16'],
+        ['2026-03-12', '2026-04-11', '2026-04-26'],
+    ]
+    assert np.isnat(dates[2]).all()
+
+
+def test_student_schedule_returns_dates():
+    assert student_schedule(date(2026, 1, 1), [10, 20]) == [date(2026, 1, 11), date(2026, 1, 31)]
+    assert student_schedule(date(2026, 1, 1), []) == []
+
+
+@pytest.mark.django_db
+def test_preview_batch_writes_nothing():
+    student_fee = create_student_fee(username='asha', fees=Decimal('1000.00'), installments=['600.00', '400.00'])
+    fee_management = student_fee.batch_fee_management
+    batch = fee_management.batch
+    InstallmentTemplate.objects.create(
+        batch_fee_management=fee_management, amount=Decimal('600.00'), repayment_period_days=30
+    )
+    Installment.objects.filter(
+        student_fee_management=student_fee, amount=Decimal('600.00')
+    ).update(payed_amount=Decimal('600.00'))
+    student_fee.registration_date = date(2026, 1, 1)
+    student_fee.save()
+
+    preview = preview_batch(
+        batch, fee_management, templates=[(Decimal('450.00'), 15), (Decimal('450.00'), 15)], discount=Decimal('100.00'),
+    )
+
+    assert preview['remaining_amount'] == Decimal('900.00')
+    assert preview['unscheduled'] == Decimal('0.00')
+    [student] = preview['students']
+    assert student['registration_date'] == date(2026, 1, 1)
+    assert student['current']['installments'] == 2
+    assert student['current']['paid'] == Decimal('600.00')
+    assert student['proposed']['remaining_amount'] == Decimal('300.00')
+    assert student['proposed']['schedule'] == [
+        {'due_date': date(2026, 1, 16), 'amount': Decimal('450.00')},
+        {'due_date': date(2026, 1, 31), 'amount': Decimal('450.00')},
+    ]
+    assert Installment.objects.filter(student_fee_management=student_fee).count() == 2
+    assert InstallmentTemplate.objects.get().amount == Decimal('600.00')
+
+
+@pytest.mark.django_db
+def test_registration_date_follows_enrollment():
+    student_fee = create_student_fee(username='ravi')
+    assert student_fee.registration_date is None
+
+    user = student_fee.user_franchise.user
+    enrollment = CourseEnrollment.objects.create(user=user, course_id=student_fee.batch_fee_management.batch.course_id)
+
+    student_fee.refresh_from_db()
+    assert student_fee.registration_date == enrollment.created.date()
+
+
+@pytest.mark.django_db
+def test_registration_date_ignores_later_enrollment_saves():
+    student_fee = create_student_fee(username='ravi')
+    user = student_fee.user_franchise.user
+    enrollment = CourseEnrollment.objects.create(user=user, course_id=student_fee.batch_fee_management.batch.course_id)
+    StudentFeeManagement.objects.filter(pk=student_fee.pk).update(registration_date=date(2026, 1, 1))
+
+    enrollment.mode = 'verified'
+    enrollment.save()
+
+    student_fee.refresh_from_db()
+    assert student_fee.registration_date == date(2026, 1, 1)
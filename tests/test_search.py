@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` student search.
+"""
+
+from io import StringIO
+
+import pytest
+from common.djangoapps.student.models import UserProfile
+from django.core.management import call_command
+
+from application.management.commands.benchmark_student_search import sample_queries
+from application.models import StudentSearchEntry
+from application.search import rebuild_index, search_students
+from test_utils import create_student_fee
+
+
+@pytest.mark.django_db
+def test_search_entry_follows_user_and_profile_changes():
+    user = create_student_fee(username='Asha').user_franchise.user
+    user.first_name, user.last_name = 'Asha', 'Verma'
+    user.save()
+    UserProfile.objects.create(user=user, name='Asha Verma', phone_number='+91 98765-43210')
+
+    entry = StudentSearchEntry.objects.get(user=user)
+    assert entry.username == 'asha'
+    assert entry.last_name == 'verma'
+    assert entry.phone == '919876543210'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', ['ash', 'ASHA V', 'verm', 'asha@ex', '9198765'])
+def test_search_matches_prefixes(query):
+    user = create_student_fee(username='asha').user_franchise.user
+    user.last_name = 'Verma'
+    user.save()
+    UserProfile.objects.create(user=user, name='Asha Verma', phone_number='+91 98765 43210')
+
+    assert [entry.user_id for entry in search_students(query)] == [user.pk]
+
+
+@pytest.mark.django_db
+def test_rebuild_index_drops_students_without_franchise():
+    student_fee = create_student_fee(username='ravi')
+    StudentSearchEntry.objects.all().delete()
+
+    assert rebuild_index(chunk_size=1) == 1
+    student_fee.user_franchise.delete()
+    assert not StudentSearchEntry.objects.exists()
+    assert search_students('ravi') == []
+
+
+@pytest.mark.django_db
+def test_digit_query_matches_numeric_usernames_and_loads_users():
+    user = create_student_fee(username='20231045').user_franchise.user
+    user.email = 'Roll.20231045@Example.com'
+    user.save()
+
+    entries = search_students('2023')
+    assert [entry.user_id for entry in entries] == [user.pk]
+    assert entries[0].user.email == 'Roll.20231045@Example.com'
+
+
+@pytest.mark.django_db
+def test_benchmark_samples_every_indexed_field():
+    user = create_student_fee(username='asha').user_franchise.user
+    UserProfile.objects.create(user=user, name='Asha Verma', phone_number='98765 43210')
+
+    assert sample_queries(1, seed=0) == [
+        ('username', 'ash'), ('name', 'asha'), ('email', 'asha@'), ('phone', '9876'),
+    ]
+    out = StringIO()
+    call_command('benchmark_student_search', samples=3, target_ms=60000, stdout=out)
+    assert 'all: p50' in out.getvalue()
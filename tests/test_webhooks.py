@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Tests for the `application` webhook dispatcher, against a local HTTP receiver.
+"""
+
+import hashlib
+import hmac
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.utils import timezone
+
+from application import outbox
+from application.models import OutboxEvent, WebhookDeadLetter, WebhookDelivery, WebhookEndpoint
+from application.webhooks import SIGNATURE_HEADER, ConnectionPool, dispatch, redeliver
+
+
+class StandIn:
+    """
+    Local webhook receiver answering with queued statuses, then 204.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.statuses = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                stand_in.requests.append({'port': self.client_address[1], 'headers': self.headers, 'body': body})
+                self.send_response(stand_in.statuses.pop(0) if stand_in.statuses else 204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/hooks'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def batches(self):
+        return [[event['id'] for event in json.loads(request['body'])['events']] for request in self.requests]
+
+
+def drain_and_dispatch(pool, **kwargs):
+    outbox.drain([])
+    return dispatch(pool, **kwargs)
+
+
+@pytest.fixture
+def stand_in():
+    receiver = StandIn()
+    yield receiver
+    receiver.server.shutdown()
+    receiver.server.server_close()
+
+
+@pytest.fixture
+def pool():
+    connections = ConnectionPool()
+    yield connections
+    connections.close()
+
+
+@pytest.mark.django_db
+def test_subscribed_events_are_batched_over_one_connection(stand_in, pool):
+    WebhookEndpoint.objects.create(
+        name='erp', url=stand_in.url, event_types=[outbox.PAYMENT_RECORDED], batch_size=2, secret='s3cret',
+    )
+    event_types = [outbox.PAYMENT_RECORDED] * 3 + [outbox.STUDENT_UNENROLLED]
+    ids = [outbox.publish(event_type, {}).id for event_type in event_types]
+
+    assert drain_and_dispatch(pool) == {'erp': (3, 0)}
+
+    assert stand_in.batches() == [ids[:2], ids[2:3]]
+    assert len({request['port'] for request in stand_in.requests}) == 1
+    request = stand_in.requests[0]
+    expected = hmac.new(b's3cret', request['body'], hashlib.sha256).hexdigest()
+    assert request['headers'][SIGNATURE_HEADER] == f'sha256={expected}'
+    assert not WebhookDelivery.objects.exists()
+    assert WebhookEndpoint.objects.get().claimed_until is None
+    assert drain_and_dispatch(pool) == {'erp': (0, 0)}
+
+
+@pytest.mark.django_db
+def test_failures_are_retried_with_exponential_backoff(stand_in, pool):
+    WebhookEndpoint.objects.create(name='sms', url=stand_in.url)
+    outbox.publish(outbox.STUDENT_UNENROLLED, {'user_id': 1})
+    stand_in.statuses = [503, 429, 500]
+    delays = []
+
+    assert drain_and_dispatch(pool, sleep=delays.append) == {'sms': (1, 0)}
+
+    assert delays == [1.0, 2.0, 4.0]
+    assert len(stand_in.requests) == 4
+
+
+@pytest.mark.django_db
+def test_exhausted_batch_is_dead_lettered_and_redelivered(stand_in, pool):
+    endpoint = WebhookEndpoint.objects.create(name='erp', url=stand_in.url, max_attempts=2)
+    first = outbox.publish(outbox.PAYMENT_RECORDED, {'payment_id': 1})
+    stand_in.statuses = [500, 500]
+
+    assert drain_and_dispatch(pool, sleep=lambda delay: None) == {'erp': (0, 1)}
+
+    dead_letter = WebhookDeadLetter.objects.get()
+    assert (dead_letter.attempts, dead_letter.error) == (2, 'HTTP 500')
+    assert [event['id'] for event in dead_letter.events] == [first.id]
+
+    second = outbox.publish(outbox.PAYMENT_RECORDED, {'payment_id': 2})
+    assert drain_and_dispatch(pool) == {'erp': (1, 0)}
+    assert stand_in.batches()[-1] == [second.id]
+
+    dead_letter.endpoint = endpoint
+    assert redeliver(dead_letter, pool)
+    assert WebhookDeadLetter.objects.get().redelivered_at is not None
+    assert stand_in.batches()[-1] == [first.id]
+
+
+@pytest.mark.django_db
+def test_client_errors_are_not_retried(stand_in, pool):
+    WebhookEndpoint.objects.create(name='erp', url=stand_in.url)
+    outbox.publish(outbox.PAYMENT_RECORDED, {})
+    stand_in.statuses = [400]
+
+    assert drain_and_dispatch(pool, sleep=pytest.fail) == {'erp': (0, 1)}
+    assert len(stand_in.requests) == 1
+
+
+@pytest.mark.django_db
+def test_event_committed_late_is_still_sent(stand_in, pool):
+    WebhookEndpoint.objects.create(name='erp', url=stand_in.url)
+    late = outbox.publish(outbox.PAYMENT_RECORDED, {'payment_id': 1})
+    later = outbox.publish(outbox.PAYMENT_RECORDED, {'payment_id': 2})
+    # The lower id is not visible yet, as if its transaction had not committed.
+    OutboxEvent.objects.filter(pk=late.pk).delete()
+    assert drain_and_dispatch(pool) == {'erp': (1, 0)}
+
+    OutboxEvent.objects.create(pk=late.pk, event_type=late.event_type, payload=late.payload)
+    assert drain_and_dispatch(pool) == {'erp': (1, 0)}
+
+    assert stand_in.batches() == [[later.id], [late.id]]
+
+
+@pytest.mark.django_db
+def test_claimed_endpoint_is_skipped(stand_in, pool):
+    WebhookEndpoint.objects.create(name='erp', url=stand_in.url, claimed_until=timezone.now() + timedelta(minutes=5))
+    outbox.publish(outbox.PAYMENT_RECORDED, {})
+
+    assert drain_and_dispatch(pool) == {'erp': (0, 0)}
+    assert not stand_in.requests
+    assert WebhookDelivery.objects.count() == 1